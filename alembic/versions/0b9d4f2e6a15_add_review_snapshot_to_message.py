@@ -0,0 +1,28 @@
+"""add review snapshot to message
+
+Revision ID: 0b9d4f2e6a15
+Revises: 5f1a8c3e7b64
+Create Date: 2026-10-18 15:48:20.730561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9d4f2e6a15'
+down_revision: Union[str, Sequence[str], None] = '5f1a8c3e7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('messages', sa.Column('review_snapshot', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('messages', 'review_snapshot')
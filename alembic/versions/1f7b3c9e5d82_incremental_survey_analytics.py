@@ -0,0 +1,30 @@
+"""incremental survey analytics
+
+Revision ID: 1f7b3c9e5d82
+Revises: 6a0c8e3f2b51
+Create Date: 2026-10-18 20:04:55.318260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f7b3c9e5d82'
+down_revision: Union[str, Sequence[str], None] = '6a0c8e3f2b51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # survey_analytic.content now holds running aggregates instead of the rendered
+    # report; rows in the old shape are rebuilt on the next read.
+    op.execute('DELETE FROM survey_analytic')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DELETE FROM survey_analytic')
@@ -0,0 +1,33 @@
+"""review snapshot versions
+
+Revision ID: 2a7d4f9c6b13
+Revises: 8f3a6c1d2e94
+Create Date: 2026-10-19 11:40:02.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7d4f9c6b13'
+down_revision: Union[str, Sequence[str], None] = '8f3a6c1d2e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('companies', 'services', 'surveys')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing snapshots carry no versions and are rebuilt the next time they are read.
+    for table in TABLES:
+        op.add_column(table, sa.Column('snapshot_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, 'snapshot_version')
@@ -0,0 +1,46 @@
+"""survey answer drilldown
+
+Revision ID: 3c5f8a2e6d17
+Revises: 7b2e9d4c1a60
+Create Date: 2026-10-18 22:03:17.446581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5f8a2e6d17'
+down_revision: Union[str, Sequence[str], None] = '7b2e9d4c1a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('survey_answers', sa.Column('service_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'survey_answers_service_id_fkey', 'survey_answers', 'services', ['service_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(
+        'ix_survey_answers_drilldown', 'survey_answers', ['survey_id', 'question_id', 'answered_at', 'id']
+    )
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        UPDATE survey_answers a
+        SET service_id = m.service_id
+        FROM messages m
+        WHERE m.id = a.message_id AND m.service_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_survey_answers_drilldown', table_name='survey_answers')
+    op.drop_constraint('survey_answers_service_id_fkey', 'survey_answers', type_='foreignkey')
+    op.drop_column('survey_answers', 'service_id')
@@ -0,0 +1,54 @@
+"""add campaigns
+
+Revision ID: 3c8f1d2a7b90
+Revises: ff0a75232f92
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8f1d2a7b90'
+down_revision: Union[str, Sequence[str], None] = 'ff0a75232f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    campaign_status_enum = postgresql.ENUM('pending', 'sending', 'completed', 'failed', name='campaign_status_enum')
+    campaign_status_enum.create(op.get_bind(), checkfirst=True)
+    op.create_table('campaigns',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('messageType', postgresql.ENUM('Email', 'SMS', name='message_type_enum', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='campaign_status_enum', create_type=False), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_campaigns_company_id'), 'campaigns', ['company_id'], unique=False)
+    op.add_column('messages', sa.Column('campaign_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_messages_campaign_id'), 'messages', ['campaign_id'], unique=False)
+    op.create_foreign_key('messages_campaign_id_fkey', 'messages', 'campaigns', ['campaign_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('messages_campaign_id_fkey', 'messages', type_='foreignkey')
+    op.drop_index(op.f('ix_messages_campaign_id'), table_name='messages')
+    op.drop_column('messages', 'campaign_id')
+    op.drop_index(op.f('ix_campaigns_company_id'), table_name='campaigns')
+    op.drop_table('campaigns')
+    postgresql.ENUM(name='campaign_status_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,39 @@
+"""add survey analytic deltas
+
+Revision ID: 4b8e2d6f1a93
+Revises: 9d4f7a2c8e61
+Create Date: 2026-10-19 17:04:51.218377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2d6f1a93'
+down_revision: Union[str, Sequence[str], None] = '9d4f7a2c8e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'survey_analytic_deltas',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('survey_id', sa.UUID(), nullable=False),
+        sa.Column('content', sa.JSON(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_survey_analytic_deltas_survey_id'), 'survey_analytic_deltas', ['survey_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_survey_analytic_deltas_survey_id'), table_name='survey_analytic_deltas')
+    op.drop_table('survey_analytic_deltas')
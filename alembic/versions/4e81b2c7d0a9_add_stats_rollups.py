@@ -0,0 +1,71 @@
+"""add stats rollups
+
+Revision ID: 4e81b2c7d0a9
+Revises: d3a9f61b7e05
+Create Date: 2026-10-18 18:58:40.127336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e81b2c7d0a9'
+down_revision: Union[str, Sequence[str], None] = 'd3a9f61b7e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        postgresql.ENUM('hour', 'day', name='rollup_resolution_enum').create(op.get_bind(), checkfirst=True)
+
+    op.create_table('stats_rollups',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('resolution', postgresql.ENUM('hour', 'day', name='rollup_resolution_enum', create_type=False), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('channel', postgresql.ENUM('Email', 'SMS', name='message_type_enum', create_type=False), nullable=False),
+    sa.Column('portal', sa.String(length=50), nullable=False),
+    sa.Column('sent', sa.BigInteger(), nullable=False),
+    sa.Column('clicked', sa.BigInteger(), nullable=False),
+    sa.Column('completed', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'resolution', 'bucket', 'channel', 'portal')
+    )
+
+    # The backfill uses PostgreSQL-only SQL (date_trunc, ::text casts). Elsewhere
+    # rollup-compaction re-derives the recent buckets; older history starts empty.
+    if not postgres:
+        return
+    for resolution in ('hour', 'day'):
+        op.execute(f"""
+            INSERT INTO stats_rollups (company_id, resolution, bucket, channel, portal, sent, clicked, completed)
+            SELECT company_id, '{resolution}', bucket, "messageType", portal,
+                   sum(sent), sum(clicked), sum(completed)
+            FROM (
+                SELECT company_id, date_trunc('{resolution}', send_at) AS bucket, "messageType",
+                       coalesce(portal::text, '') AS portal, 1 AS sent, 0 AS clicked, 0 AS completed
+                FROM messages WHERE company_id IS NOT NULL
+                UNION ALL
+                SELECT company_id, date_trunc('{resolution}', clicked_at), "messageType",
+                       coalesce(portal::text, ''), 0, 1, 0
+                FROM messages WHERE company_id IS NOT NULL AND clicked_at IS NOT NULL
+                UNION ALL
+                SELECT company_id, date_trunc('{resolution}', completed_at), "messageType",
+                       coalesce(portal::text, ''), 0, 0, 1
+                FROM messages WHERE company_id IS NOT NULL AND completed IS TRUE AND completed_at IS NOT NULL
+            ) AS events
+            GROUP BY company_id, bucket, "messageType", portal
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_rollups')
+    if op.get_bind().dialect.name == 'postgresql':
+        postgresql.ENUM(name='rollup_resolution_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""survey analytic refreshed_at
+
+Revision ID: 5d8b1e4f7a29
+Revises: 3c5f8a2e6d17
+Create Date: 2026-10-18 22:41:08.210377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8b1e4f7a29'
+down_revision: Union[str, Sequence[str], None] = '3c5f8a2e6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('survey_analytic', sa.Column('refreshed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('survey_analytic', 'refreshed_at')
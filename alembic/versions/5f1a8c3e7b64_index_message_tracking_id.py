@@ -0,0 +1,29 @@
+"""index message tracking_id
+
+Revision ID: 5f1a8c3e7b64
+Revises: e83f0a6c2d17
+Create Date: 2026-10-18 15:03:52.217849
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1a8c3e7b64'
+down_revision: Union[str, Sequence[str], None] = 'e83f0a6c2d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_messages_tracking_id'), 'messages', ['tracking_id'], unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_messages_tracking_id'), table_name='messages')
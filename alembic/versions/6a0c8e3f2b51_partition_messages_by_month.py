@@ -0,0 +1,104 @@
+"""partition messages by month
+
+Revision ID: 6a0c8e3f2b51
+Revises: 4e81b2c7d0a9
+Create Date: 2026-10-18 19:32:18.904771
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a0c8e3f2b51'
+down_revision: Union[str, Sequence[str], None] = '4e81b2c7d0a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = (
+    ('messages_client_id_fkey', 'clients', 'client_id', 'CASCADE'),
+    ('messages_company_id_fkey', 'companies', 'company_id', 'CASCADE'),
+    ('messages_service_id_fkey', 'services', 'service_id', 'CASCADE'),
+    ('messages_survey_id_fkey', 'surveys', 'survey_id', 'CASCADE'),
+    ('messages_template_id_fkey', 'templates', 'template_id', 'CASCADE'),
+    ('messages_campaign_id_fkey', 'campaigns', 'campaign_id', 'SET NULL'),
+)
+
+
+def _month(at: datetime, offset: int = 0) -> datetime:
+    index = at.year * 12 + at.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes(unique_tracking_id: bool) -> None:
+    op.create_index('ix_messages_tracking_id', 'messages', ['tracking_id'], unique=unique_tracking_id)
+    op.create_index('ix_messages_campaign_id', 'messages', ['campaign_id'], unique=False)
+    op.create_index('ix_messages_client_history', 'messages', ['company_id', 'client_id', 'send_at', 'id'], unique=False)
+    op.create_index(
+        'ix_messages_scheduled_send_at',
+        'messages',
+        ['send_at'],
+        unique=False,
+        postgresql_where=sa.text("delivery_status = 'scheduled'"),
+    )
+    op.execute('CREATE INDEX IF NOT EXISTS ix_messages_search_trgm ON messages USING gin (message gin_trgm_ops)')
+
+
+def _create_foreign_keys() -> None:
+    for name, table, column, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(name, 'messages', table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # A foreign key can only reference a partitioned table through a key that includes send_at.
+    op.drop_constraint('email_outbox_message_id_fkey', 'email_outbox', type_='foreignkey')
+
+    op.rename_table('messages', 'messages_legacy')
+    op.execute('CREATE TABLE messages (LIKE messages_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (send_at)')
+    op.execute('CREATE TABLE messages_default PARTITION OF messages DEFAULT')
+
+    oldest = bind.execute(sa.text('SELECT min(send_at) FROM messages_legacy')).scalar() or datetime.now()
+    month, last = _month(oldest), _month(datetime.now(), MONTHS_AHEAD)
+    while month <= last:
+        upper = _month(month, 1)
+        op.execute(
+            f"CREATE TABLE messages_p{month:%Y_%m} PARTITION OF messages "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        month = upper
+
+    op.execute('INSERT INTO messages SELECT * FROM messages_legacy')
+    op.drop_table('messages_legacy')
+
+    op.create_primary_key('messages_pkey', 'messages', ['id', 'send_at'])
+    _create_foreign_keys()
+    _create_indexes(unique_tracking_id=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.rename_table('messages', 'messages_partitioned')
+    op.execute('CREATE TABLE messages (LIKE messages_partitioned INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO messages SELECT * FROM messages_partitioned')
+    op.execute('DROP TABLE messages_partitioned CASCADE')
+
+    op.create_primary_key('messages_pkey', 'messages', ['id'])
+    _create_foreign_keys()
+    _create_indexes(unique_tracking_id=True)
+    op.create_foreign_key(
+        'email_outbox_message_id_fkey', 'email_outbox', 'messages', ['message_id'], ['id'], ondelete='CASCADE'
+    )
@@ -0,0 +1,41 @@
+"""add message tracking
+
+Revision ID: 6e1b9c3a5f28
+Revises: 2a7d4f9c6b13
+Create Date: 2026-10-19 13:05:51.207436
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b9c3a5f28'
+down_revision: Union[str, Sequence[str], None] = '2a7d4f9c6b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'message_tracking',
+        sa.Column('tracking_id', sa.UUID(), nullable=False),
+        sa.Column('message_id', sa.UUID(), nullable=False),
+        sa.Column('send_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('tracking_id'),
+    )
+    op.execute("""
+        INSERT INTO message_tracking (tracking_id, message_id, send_at)
+        SELECT tracking_id, id, send_at FROM messages WHERE tracking_id IS NOT NULL
+        ON CONFLICT (tracking_id) DO NOTHING
+    """)
+    op.drop_index('ix_messages_tracking_id', table_name='messages')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_messages_tracking_id', 'messages', ['tracking_id'])
+    op.drop_table('message_tracking')
@@ -0,0 +1,78 @@
+"""add survey answers
+
+Revision ID: 7b2e9d4c1a60
+Revises: 1f7b3c9e5d82
+Create Date: 2026-10-18 21:12:40.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9d4c1a60'
+down_revision: Union[str, Sequence[str], None] = '1f7b3c9e5d82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'survey_answers',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('message_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('survey_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('client_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('question_id', sa.String(length=255), nullable=False),
+        sa.Column('numeric_value', sa.Float(), nullable=True),
+        sa.Column('text_value', sa.String(), nullable=True),
+        sa.Column('choice_value', sa.String(length=255), nullable=True),
+        sa.Column('answered_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('message_id', 'question_id', name='uq_survey_answers_message_question'),
+    )
+    op.create_index('ix_survey_answers_survey_question_numeric', 'survey_answers', ['survey_id', 'question_id', 'numeric_value'])
+    op.create_index('ix_survey_answers_survey_question_choice', 'survey_answers', ['survey_id', 'question_id', 'choice_value'])
+    op.create_index('ix_survey_answers_survey_answered_at', 'survey_answers', ['survey_id', 'answered_at'])
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Backfill from the JSON blobs, classifying each answer by its question's type.
+    op.execute("""
+        INSERT INTO survey_answers
+            (id, message_id, survey_id, client_id, question_id, numeric_value, text_value, choice_value, answered_at)
+        SELECT
+            gen_random_uuid(), m.id, m.survey_id, m.client_id, left(kv.key, 255),
+            CASE WHEN q.type = 'rating' AND kv.value ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$' THEN kv.value::double precision END,
+            CASE WHEN q.type IS DISTINCT FROM 'choice'
+                  AND NOT (q.type = 'rating' AND kv.value ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$') THEN kv.value END,
+            CASE WHEN q.type = 'choice' THEN left(kv.value, 255) END,
+            coalesce(m.completed_at, m.send_at)
+        FROM messages m
+        JOIN surveys s ON s.id = m.survey_id
+        CROSS JOIN LATERAL json_each_text(m.survey_result) kv
+        LEFT JOIN LATERAL (
+            SELECT elem->>'type' AS type
+            FROM json_array_elements(s.content) elem
+            WHERE elem->>'id' = kv.key
+            LIMIT 1
+        ) q ON true
+        WHERE m.is_survey AND m.completed AND json_typeof(m.survey_result) = 'object'
+        ON CONFLICT (message_id, question_id) DO NOTHING
+    """)
+    # Aggregates are rebuilt from survey_answers on the next read.
+    op.execute('DELETE FROM survey_analytic')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_survey_answers_survey_answered_at', table_name='survey_answers')
+    op.drop_index('ix_survey_answers_survey_question_choice', table_name='survey_answers')
+    op.drop_index('ix_survey_answers_survey_question_numeric', table_name='survey_answers')
+    op.drop_table('survey_answers')
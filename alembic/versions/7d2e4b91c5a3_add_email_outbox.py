@@ -0,0 +1,51 @@
+"""add email outbox
+
+Revision ID: 7d2e4b91c5a3
+Revises: 3c8f1d2a7b90
+Create Date: 2026-10-18 11:04:17.552930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b91c5a3'
+down_revision: Union[str, Sequence[str], None] = '3c8f1d2a7b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    outbox_status_enum = postgresql.ENUM('pending', 'sending', 'sent', 'dead', name='outbox_status_enum')
+    outbox_status_enum.create(op.get_bind(), checkfirst=True)
+    op.create_table('email_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('sender', sa.String(length=255), nullable=False),
+    sa.Column('recipients', sa.JSON(), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('body', sa.String(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='outbox_status_enum', create_type=False), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.String(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('message_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['messages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_email_outbox_status_next_attempt_at', 'email_outbox', ['status', 'next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_email_outbox_message_id'), 'email_outbox', ['message_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_email_outbox_message_id'), table_name='email_outbox')
+    op.drop_index('ix_email_outbox_status_next_attempt_at', table_name='email_outbox')
+    op.drop_table('email_outbox')
+    postgresql.ENUM(name='outbox_status_enum').drop(op.get_bind(), checkfirst=True)
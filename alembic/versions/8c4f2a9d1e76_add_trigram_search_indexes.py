@@ -0,0 +1,51 @@
+"""add trigram search indexes
+
+Revision ID: 8c4f2a9d1e76
+Revises: b57e3d0c9a28
+Create Date: 2026-10-18 18:06:31.882410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a9d1e76'
+down_revision: Union[str, Sequence[str], None] = 'b57e3d0c9a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to service.search.search_document, otherwise the planner
+# will not match the index.
+SEARCH_INDEXES = {
+    'ix_messages_search_trgm': ('messages', "message"),
+    'ix_clients_search_trgm': (
+        'clients',
+        "coalesce(name, '') || ' ' || coalesce(surname, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, '')",
+    ),
+    'ix_services_search_trgm': ('services', "coalesce(name, '') || ' ' || coalesce(description, '')"),
+    'ix_templates_search_trgm': (
+        'templates',
+        "coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(template, '')",
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, (table, expression) in SEARCH_INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (({expression}) gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name in SEARCH_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
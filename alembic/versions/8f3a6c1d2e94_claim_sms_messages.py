@@ -0,0 +1,32 @@
+"""claim sms messages
+
+Revision ID: 8f3a6c1d2e94
+Revises: 5d8b1e4f7a29
+Create Date: 2026-10-19 09:12:44.531902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a6c1d2e94'
+down_revision: Union[str, Sequence[str], None] = '5d8b1e4f7a29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE delivery_status_enum ADD VALUE IF NOT EXISTS 'sending' AFTER 'queued'")
+    op.add_column('messages', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('messages', 'claimed_at')
+    # PostgreSQL cannot drop enum values; 'sending' stays in delivery_status_enum.
@@ -0,0 +1,35 @@
+"""add stats rebuilds
+
+Revision ID: 9d4f7a2c8e61
+Revises: 6e1b9c3a5f28
+Create Date: 2026-10-19 15:22:09.681340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f7a2c8e61'
+down_revision: Union[str, Sequence[str], None] = '6e1b9c3a5f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stats_rebuilds',
+        sa.Column('company_id', sa.UUID(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id', 'kind'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_rebuilds')
@@ -0,0 +1,38 @@
+"""add scheduled sends
+
+Revision ID: 9e27c4d8b3f1
+Revises: 0b9d4f2e6a15
+Create Date: 2026-10-18 16:40:12.488310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e27c4d8b3f1'
+down_revision: Union[str, Sequence[str], None] = '0b9d4f2e6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE delivery_status_enum ADD VALUE IF NOT EXISTS 'scheduled' BEFORE 'queued'")
+        op.execute("ALTER TYPE campaign_status_enum ADD VALUE IF NOT EXISTS 'scheduled' AFTER 'pending'")
+    op.create_index(
+        'ix_messages_scheduled_send_at',
+        'messages',
+        ['send_at'],
+        unique=False,
+        postgresql_where=sa.text("delivery_status = 'scheduled'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_scheduled_send_at', table_name='messages')
+    # PostgreSQL cannot drop enum values; 'scheduled' stays in both types.
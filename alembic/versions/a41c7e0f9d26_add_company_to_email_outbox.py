@@ -0,0 +1,30 @@
+"""add company to email outbox
+
+Revision ID: a41c7e0f9d26
+Revises: 7d2e4b91c5a3
+Create Date: 2026-10-18 12:31:55.084417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e0f9d26'
+down_revision: Union[str, Sequence[str], None] = '7d2e4b91c5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_outbox', sa.Column('company_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('email_outbox_company_id_fkey', 'email_outbox', 'companies', ['company_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('email_outbox_company_id_fkey', 'email_outbox', type_='foreignkey')
+    op.drop_column('email_outbox', 'company_id')
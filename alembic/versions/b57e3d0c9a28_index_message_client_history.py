@@ -0,0 +1,32 @@
+"""index message client history
+
+Revision ID: b57e3d0c9a28
+Revises: 2d6e8a1f4c93
+Create Date: 2026-10-18 17:48:12.604917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b57e3d0c9a28'
+down_revision: Union[str, Sequence[str], None] = '2d6e8a1f4c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_client_history', 'messages', ['company_id', 'client_id', 'send_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_client_history', table_name='messages')
@@ -0,0 +1,35 @@
+"""add delivery status to message
+
+Revision ID: c6b93e5d1f48
+Revises: a41c7e0f9d26
+Create Date: 2026-10-18 13:47:09.671532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6b93e5d1f48'
+down_revision: Union[str, Sequence[str], None] = 'a41c7e0f9d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    delivery_status_enum = postgresql.ENUM('queued', 'sent', 'failed', name='delivery_status_enum')
+    delivery_status_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column('messages', sa.Column('delivery_status', postgresql.ENUM(name='delivery_status_enum', create_type=False), nullable=True))
+    op.add_column('messages', sa.Column('delivered_at', sa.DateTime(), nullable=True))
+    op.add_column('messages', sa.Column('delivery_error', sa.String(length=1000), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('messages', 'delivery_error')
+    op.drop_column('messages', 'delivered_at')
+    op.drop_column('messages', 'delivery_status')
+    postgresql.ENUM(name='delivery_status_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,52 @@
+"""add company stats
+
+Revision ID: d3a9f61b7e05
+Revises: 8c4f2a9d1e76
+Create Date: 2026-10-18 18:31:07.553190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f61b7e05'
+down_revision: Union[str, Sequence[str], None] = '8c4f2a9d1e76'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stats',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('channel', postgresql.ENUM('Email', 'SMS', name='message_type_enum', create_type=False), nullable=False),
+    sa.Column('portal', sa.String(length=50), nullable=False),
+    sa.Column('sent', sa.BigInteger(), nullable=False),
+    sa.Column('clicked', sa.BigInteger(), nullable=False),
+    sa.Column('completed', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'channel', 'portal')
+    )
+
+    # The backfill uses PostgreSQL-only SQL (::text casts, FILTER). Elsewhere
+    # the stats-reconciliation task fills the table from messages.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        INSERT INTO stats (company_id, channel, portal, sent, clicked, completed, updated_at)
+        SELECT company_id, "messageType", coalesce(portal::text, ''),
+               count(*), count(clicked_at), count(*) FILTER (WHERE completed), now()
+        FROM messages
+        WHERE company_id IS NOT NULL
+        GROUP BY company_id, "messageType", coalesce(portal::text, '')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats')
@@ -0,0 +1,28 @@
+"""add updated_at to template
+
+Revision ID: e83f0a6c2d17
+Revises: c6b93e5d1f48
+Create Date: 2026-10-18 14:22:36.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83f0a6c2d17'
+down_revision: Union[str, Sequence[str], None] = 'c6b93e5d1f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('templates', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('templates', 'updated_at')
@@ -0,0 +1,53 @@
+import argparse
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import Campaign, Client, Message, MessageTracking
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from schemas.messages import MessageSpec
+from service.campaign import CAMPAIGN_CHUNK_SIZE, create_campaign_messages, message_spec_columns
+from utils.bench import bench_session_factory, seed_company, timed
+
+
+def benchmark(size: int, database_url: str | None = None) -> None:
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        company = seed_company(db, clients=size)
+        client_ids = list(db.scalars(select(Client.id).where(Client.company_id == company.id)))
+        spec = MessageSpec(message="Thanks for visiting, tell us how it went")
+        print(f"{size} recipients on {db.get_bind().dialect.name}")
+
+        campaign = Campaign(message=spec.message, messageType=MessageType.SMS, company_id=company.id, total=size)
+        db.add(campaign)
+        db.commit()
+        with timed("per-message add + commit", size):
+            for client_id in client_ids:
+                message = Message(
+                    **message_spec_columns(spec),
+                    id=uuid.uuid4(), tracking_id=uuid.uuid4(), send_at=datetime.now(), messageType=MessageType.SMS,
+                    delivery_status=DeliveryStatus.queued, client_id=client_id, company_id=company.id,
+                )
+                db.add(message)
+                db.add(MessageTracking(tracking_id=message.tracking_id, message_id=message.id, send_at=message.send_at))
+                db.commit()
+
+        campaign = Campaign(message=spec.message, messageType=MessageType.SMS, company_id=company.id, total=size)
+        db.add(campaign)
+        db.commit()
+        with timed(f"campaign insert ({CAMPAIGN_CHUNK_SIZE}-row chunks)", size):
+            create_campaign_messages(db, campaign, spec, client_ids)
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare campaign message inserts with creating messages one by one.")
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.recipients, args.database_url)
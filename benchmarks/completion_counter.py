@@ -0,0 +1,49 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from models import Survey
+from service.survey_analytics import count_completion
+from utils.bench import bench_session_factory, seed_company, timed
+
+
+def benchmark(submissions: int, workers: int, database_url: str | None = None) -> None:
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        survey = Survey(name="Benchmark", content=[], company_id=seed_company(db).id, completed_times=0)
+        db.add(survey)
+        db.commit()
+        survey_id = survey.id
+        print(f"{submissions} submissions on {workers} threads on {db.get_bind().dialect.name}")
+    finally:
+        db.close()
+
+    def submit(_) -> None:
+        session = session_factory()
+        try:
+            count_completion(session, survey_id)
+            session.commit()
+        finally:
+            session.close()
+
+    with timed("concurrent count_completion", submissions, "submissions"):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(submit, range(submissions)))
+
+    db = session_factory()
+    try:
+        lost = submissions - db.scalar(select(Survey.completed_times).where(Survey.id == survey_id))
+    finally:
+        db.close()
+    print(f"  lost {lost} increments")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress the survey completion counter with concurrent submissions.")
+    parser.add_argument("--submissions", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.submissions, args.workers, args.database_url)
@@ -0,0 +1,70 @@
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from models import Client, Message, MessageTracking
+from models.utils.messageType import MessageType
+from service.partitions import add_months, create_partition, month_start
+from utils.bench import bench_session_factory, seed_company, timed
+from utils.get_review_message_or_404 import get_review_message_or_404
+
+
+def benchmark(size: int, lookups: int, database_url: str | None = None) -> None:
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        now = datetime.now()
+        if db.get_bind().dialect.name == "postgresql":
+            with db.get_bind().begin() as connection:
+                for months_back in range(1, 13):
+                    create_partition(connection, add_months(month_start(now), -months_back))
+        company = seed_company(db, clients=100)
+        client_ids = list(db.scalars(select(Client.id).where(Client.company_id == company.id)))
+        rows = []
+        for i in range(size):
+            rows.append(dict(
+                id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS,
+                send_at=now - timedelta(days=365 * i / size), client_id=random.choice(client_ids), company_id=company.id,
+            ))
+            if len(rows) == 10_000 or i == size - 1:
+                db.execute(insert(Message), rows)
+                db.execute(insert(MessageTracking), [
+                    dict(tracking_id=row["tracking_id"], message_id=row["id"], send_at=row["send_at"]) for row in rows
+                ])
+                rows = []
+        db.commit()
+        links = [tuple(row) for row in db.execute(
+            select(Message.company_id, Message.client_id, Message.tracking_id).order_by(Message.id).limit(lookups)
+        )]
+        print(f"{size} messages over the last year on {db.get_bind().dialect.name}, {len(links)} lookups")
+
+        with timed("get_review_message_or_404 (message_tracking)", len(links), "lookups"):
+            for company_id, client_id, tracking_id in links:
+                get_review_message_or_404(db, company_id, client_id, tracking_id)
+                db.expunge_all()
+
+        with timed("messages.tracking_id, no index", len(links), "lookups"):
+            for _, _, tracking_id in links:
+                db.query(Message).filter_by(tracking_id=tracking_id).first()
+                db.expunge_all()
+
+        db.execute(text("CREATE INDEX ix_benchmark_tracking_id ON messages (tracking_id)"))
+        db.commit()
+        with timed("messages.tracking_id, indexed per partition", len(links), "lookups"):
+            for _, _, tracking_id in links:
+                db.query(Message).filter_by(tracking_id=tracking_id).first()
+                db.expunge_all()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time review-link lookups through message_tracking and directly on messages.")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.messages, args.lookups, args.database_url)
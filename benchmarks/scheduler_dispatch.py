@@ -0,0 +1,62 @@
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from config import SCHEDULER_BATCH_SIZE
+from models import Client, Message
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from service.scheduler import MessageScheduler
+from utils.bench import bench_session_factory, seed_company, timed
+from utils.timing_wheel import TimingWheel
+
+
+def benchmark(size: int, database_url: str | None = None) -> None:
+    wheel, now = TimingWheel(1.0, 121, start=0.0), 0.0
+    print(f"{size} timing wheel entries spread over 120 one-second slots")
+    with timed("timing wheel add", size, "entries"):
+        for i in range(size):
+            wheel.add(i, i * 120.0 / size)
+    with timed("timing wheel advance, 1s ticks", size, "entries"):
+        while len(wheel):
+            now += 1.0
+            wheel.advance(now)
+
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        company = seed_company(db, clients=min(size, 1000))
+        client_ids = list(db.scalars(select(Client.id).where(Client.company_id == company.id)))
+        send_at = datetime.now()
+        db.execute(insert(Message), [
+            dict(
+                id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS, send_at=send_at,
+                delivery_status=DeliveryStatus.scheduled, client_id=client_ids[i % len(client_ids)], company_id=company.id,
+            )
+            for i in range(size)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    scheduler = MessageScheduler(batch_size=SCHEDULER_BATCH_SIZE, session_factory=session_factory)
+    print(f"{size} scheduled SMS on {session_factory.kw['bind'].dialect.name}")
+    with timed("load into the wheel"):
+        scheduler.load()
+    loaded = len(scheduler.wheel)
+    with timed(f"claim + dispatch of {loaded} loaded", loaded, "messages"):
+        due = [key for key, _ in scheduler.wheel.advance(time.time())]
+        for start in range(0, len(due), scheduler.batch_size):
+            scheduler._dispatch(due[start:start + scheduler.batch_size])
+    print(f"  dispatched {scheduler.metrics()['dispatched']}, max lag {scheduler.metrics()['max_lag_seconds']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure timing-wheel and scheduled-send claim throughput.")
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.messages, args.database_url)
@@ -0,0 +1,52 @@
+import argparse
+
+from sqlalchemy import func, or_, select, text
+
+from models import Client
+from service.search import SEARCH_COLUMNS, apply_search
+from utils.bench import bench_session_factory, seed_company, timed
+
+
+def benchmark(size: int, database_url: str | None = None, repeat: int = 20) -> None:
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        company = seed_company(db, clients=size)
+        dialect = db.get_bind().dialect.name
+        indexed = False
+        if dialect == "postgresql":
+            try:
+                db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                # Same expression as ix_clients_search_trgm in migration 8c4f2a9d1e76.
+                db.execute(text(
+                    "CREATE INDEX ix_clients_search_trgm ON clients USING gin ((coalesce(name, '') || ' ' || "
+                    "coalesce(surname, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, '')) gin_trgm_ops)"
+                ))
+                db.execute(text("ANALYZE clients"))
+                db.commit()
+                indexed = True
+            except Exception:
+                db.rollback()
+        print(f"{size} clients on {dialect}, trigram index: {'yes' if indexed else 'no'}, {repeat} queries per term")
+
+        base = select(func.count()).select_from(Client).where(Client.company_id == company.id)
+        for term in ("client12", "example", "+48000"):
+            per_column = base.where(or_(*(column.ilike(f"%{term}%") for column in SEARCH_COLUMNS[Client])))
+            document = apply_search(base, Client, term)
+            assert db.scalar(per_column) == db.scalar(document)
+            with timed(f"{term!r}: ilike per column", repeat, "queries"):
+                for _ in range(repeat):
+                    db.scalar(per_column)
+            with timed(f"{term!r}: search document", repeat, "queries"):
+                for _ in range(repeat):
+                    db.scalar(document)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare client search through the trigram document with per-column ilike.")
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.clients, args.database_url)
@@ -0,0 +1,88 @@
+import argparse
+import uuid
+from datetime import datetime
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import insert
+
+from models import Survey, SurveyAnswer
+from service.survey_analytics import answer_columns
+from service.survey_engine import CHOICE, RATING, build_answer_columns, cross_tab, distributions, load_answer_columns
+from utils.bench import bench_session_factory, seed_company, timed
+
+
+def _loop_mean_and_counts(questions: Iterable[dict], responses: Sequence[dict]) -> dict:
+    """The per-answer Python loop the engine replaced, kept only as the benchmark baseline."""
+    result = {}
+    for question in questions:
+        key = str(question["id"])
+        if question["type"] == RATING:
+            answered = [response[key] for response in responses if key in response]
+            result[key] = sum(answered) / len(answered) if answered else None
+        else:
+            counts = {option: 0 for option in question["options"]}
+            for response in responses:
+                if key in response:
+                    counts[response[key]] += 1
+            result[key] = counts
+    return result
+
+
+def benchmark(size: int, seed: int = 0, database_url: str | None = None) -> None:
+    rng = np.random.default_rng(seed)
+    questions = [
+        {"id": "q1", "type": RATING, "max": 10},
+        {"id": "q2", "type": RATING, "max": 5},
+        {"id": "q3", "type": CHOICE, "options": ["a", "b", "c", "d"]},
+    ]
+    q1, q2 = rng.integers(0, 11, size), rng.integers(1, 6, size)
+    q3 = rng.choice(["a", "b", "c", "d"], size)
+    responses = [{"q1": int(a), "q2": int(b), "q3": str(c)} for a, b, c in zip(q1, q2, q3)]
+    print(f"{size} responses")
+
+    with timed("python loop (mean + counts only)", size, "responses"):
+        _loop_mean_and_counts(questions, responses)
+    with timed("columnar load", size, "responses"):
+        columns = build_answer_columns(questions, responses)
+    with timed("numpy distributions + cross-tab", size, "responses"):
+        distributions(columns)
+        cross_tab(columns, "q1", "q3")
+
+    session_factory = bench_session_factory(database_url)
+    db = session_factory()
+    try:
+        survey = Survey(name="Benchmark", content=questions, company_id=seed_company(db).id)
+        db.add(survey)
+        db.commit()
+        answered_at = datetime.now()
+        for start in range(0, size, 10_000):
+            rows = []
+            for response in responses[start:start + 10_000]:
+                message_id = uuid.uuid4()
+                rows.extend(
+                    dict(
+                        id=uuid.uuid4(), message_id=message_id, survey_id=survey.id, question_id=question["id"],
+                        answered_at=answered_at, **answer_columns(question["type"], response[question["id"]]),
+                    )
+                    for question in questions
+                )
+            db.execute(insert(SurveyAnswer), rows)
+        db.commit()
+        print(f"{len(questions) * size} survey_answers rows on {db.get_bind().dialect.name}")
+
+        with timed("load_answer_columns", len(questions) * size):
+            loaded = load_answer_columns(db, survey)
+        counts = {key: distribution.count for key, distribution in distributions(columns).items()}
+        assert {key: distribution.count for key, distribution in distributions(loaded).items()} == counts
+        assert cross_tab(loaded, "q1", "q3") == cross_tab(columns, "q1", "q3")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the survey analytics engine on synthetic responses.")
+    parser.add_argument("--responses", type=int, default=1_000_000)
+    parser.add_argument("--database-url", help="a throwaway database; defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    benchmark(args.responses, database_url=args.database_url)
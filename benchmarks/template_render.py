@@ -0,0 +1,49 @@
+import argparse
+import uuid
+
+from service.base_template_builder import base_template_builder, review_url_prefix
+from service.template_renderer import PLACEHOLDERS, Recipient, compile_template, template_values
+from utils.bench import timed
+
+
+def _replace_chain(text: str, values: dict[str, str]) -> str:
+    """The str.replace chain templates used to be rendered with, one pass per placeholder spelling."""
+    for placeholder, key in PLACEHOLDERS.items():
+        text = text.replace(f"{{{{{placeholder}}}}}", values[key])
+    return text
+
+
+def benchmark(size: int) -> None:
+    company_id = uuid.uuid4()
+    text = base_template_builder(company_id, "{{client}}", "{{tracking}}").replace(
+        "{{client}}/{{tracking}}", "{{review_url}}"
+    ) + "<p>{{name}} {{surname}}, {{company}}: {{service}}</p>"
+    recipients = [Recipient(uuid.uuid4(), uuid.uuid4(), f"Client {i}", "Benchmark") for i in range(size)]
+    prefix = review_url_prefix(company_id)
+    values = [
+        template_values(r.name, r.surname, "Acme", f"{prefix}{r.client_id}/{r.tracking_id}", "Haircut")
+        for r in recipients
+    ]
+    compiled = compile_template(text)
+    assert all(_replace_chain(text, v) == compiled.render(v) for v in values[:100])
+    print(f"{size} recipients, {len(text)} character template")
+
+    with timed("chained str.replace", size, "renders"):
+        for v in values:
+            _replace_chain(text, v)
+
+    with timed("CompiledTemplate.render", size, "renders"):
+        for v in values:
+            compiled.render(v)
+
+    with timed("bound per-campaign", size, "renders"):
+        bound = compiled.bind({"company": "Acme", "service": "Haircut"})
+        for v in values:
+            bound.render(v)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare compiled template rendering with chained str.replace.")
+    parser.add_argument("--recipients", type=int, default=100_000)
+    args = parser.parse_args()
+    benchmark(args.recipients)
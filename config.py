@@ -5,3 +5,56 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET = os.getenv("JWT_SECRET")
+
+EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "resend")
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "8"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "5"))
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "100"))
+EMAIL_SENDER_RATE = float(os.getenv("EMAIL_SENDER_RATE", "100"))
+EMAIL_SENDER_BURST = float(os.getenv("EMAIL_SENDER_BURST", "200"))
+EMAIL_COMPANY_RATE = float(os.getenv("EMAIL_COMPANY_RATE", "20"))
+EMAIL_COMPANY_BURST = float(os.getenv("EMAIL_COMPANY_BURST", "100"))
+
+SMS_PROVIDER = os.getenv("SMS_PROVIDER", "loopback")
+SMS_LOOPBACK_PATH = os.getenv("SMS_LOOPBACK_PATH", "sms_outbox.jsonl")
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", "100"))
+SMS_RATE = float(os.getenv("SMS_RATE", "100"))
+SMS_MAX_IN_FLIGHT = int(os.getenv("SMS_MAX_IN_FLIGHT", "4"))
+SMS_LINGER_SECONDS = float(os.getenv("SMS_LINGER_SECONDS", "0.05"))
+
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "256"))
+
+CLICK_FLUSH_INTERVAL = float(os.getenv("CLICK_FLUSH_INTERVAL", "0.25"))
+CLICK_FLUSH_SIZE = int(os.getenv("CLICK_FLUSH_SIZE", "500"))
+
+SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", "1.0"))
+SCHEDULER_LOOKAHEAD = float(os.getenv("SCHEDULER_LOOKAHEAD", "120"))
+SCHEDULER_LOAD_INTERVAL = float(os.getenv("SCHEDULER_LOAD_INTERVAL", "30"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "1000"))
+
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_EVICT_INTERVAL = float(os.getenv("IDEMPOTENCY_EVICT_INTERVAL", "300"))
+
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "86400"))
+ROLLUP_COMPACT_INTERVAL = float(os.getenv("ROLLUP_COMPACT_INTERVAL", "3600"))
+ROLLUP_COMPACT_WINDOW_HOURS = int(os.getenv("ROLLUP_COMPACT_WINDOW_HOURS", "48"))
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "24"))
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", "archive")
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "86400"))
+
+SURVEY_COUNT_RECONCILE_INTERVAL = float(os.getenv("SURVEY_COUNT_RECONCILE_INTERVAL", "86400"))
+
+SURVEY_ANALYTICS_TICK = float(os.getenv("SURVEY_ANALYTICS_TICK", "1.0"))
+SURVEY_ANALYTICS_DEBOUNCE = float(os.getenv("SURVEY_ANALYTICS_DEBOUNCE", "5"))
+SURVEY_ANALYTICS_MAX_STALENESS = float(os.getenv("SURVEY_ANALYTICS_MAX_STALENESS", "300"))
+
+# Lock files for single-flight coordination when the database has no advisory locks.
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR", "locks")
@@ -5,15 +5,58 @@ from resend import templates
 from starlette.middleware.cors import CORSMiddleware
 
 from database import Base, engine
+from service.click_buffer import click_buffer
+from service.outbox import outbox_worker
+from service.partitions import ensure_partitions
+from service.scheduler import message_scheduler
+from service.sms import sms_dispatcher
+from service.stats import compact_rollups, reconcile_stats
+from service.survey_analytics import reconcile_completion_counts
+from service.survey_refresher import survey_analytics_refresher
+from config import IDEMPOTENCY_EVICT_INTERVAL, STATS_RECONCILE_INTERVAL, ROLLUP_COMPACT_INTERVAL, \
+    PARTITION_MAINTENANCE_INTERVAL, SURVEY_COUNT_RECONCILE_INTERVAL
+from utils.idempotency import evict_expired_keys
+from utils.periodic import PeriodicTask
 
 from models import client, company, message, services, template, user
 
-from routes import auth, clients, company, service, messages, surveys, template
+from routes import auth, clients, company, service, messages, surveys, template, campaigns, metrics, stats, exports
 
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Client ReBetter API")
 
+periodic_tasks = [
+    PeriodicTask("idempotency-eviction", IDEMPOTENCY_EVICT_INTERVAL, evict_expired_keys),
+    PeriodicTask("stats-reconciliation", STATS_RECONCILE_INTERVAL, reconcile_stats),
+    PeriodicTask("rollup-compaction", ROLLUP_COMPACT_INTERVAL, compact_rollups),
+    PeriodicTask("partition-maintenance", PARTITION_MAINTENANCE_INTERVAL, ensure_partitions),
+    PeriodicTask("survey-count-reconciliation", SURVEY_COUNT_RECONCILE_INTERVAL, reconcile_completion_counts),
+]
+
+
+@app.on_event("startup")
+def start_workers():
+    ensure_partitions()
+    outbox_worker.start()
+    sms_dispatcher.start()
+    click_buffer.start()
+    message_scheduler.start()
+    survey_analytics_refresher.start()
+    for task in periodic_tasks:
+        task.start()
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    for task in periodic_tasks:
+        task.stop()
+    survey_analytics_refresher.stop()
+    message_scheduler.stop()
+    click_buffer.stop()
+    sms_dispatcher.stop()
+    outbox_worker.stop()
+
 
 origins = ["*"]
 
@@ -32,4 +75,8 @@ app.include_router(company.router)
 app.include_router(service.router)
 app.include_router(messages.router)
 app.include_router(surveys.router)
-app.include_router(template.router)
\ No newline at end of file
+app.include_router(template.router)
+app.include_router(campaigns.router)
+app.include_router(metrics.router)
+app.include_router(stats.router)
+app.include_router(exports.router)
\ No newline at end of file
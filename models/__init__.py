@@ -1,8 +1,17 @@
 from .client import Client
 from .company import Company
 from .message import Message
+from .message_tracking import MessageTracking
 from .services import Service
 from .template import Template
 from .user import User
 from .survey import Survey
-from .survey_analytic import SurveyAnalytic
\ No newline at end of file
+from .survey_analytic import SurveyAnalytic
+from .survey_answer import SurveyAnswer
+from .survey_analytic_delta import SurveyAnalyticDelta
+from .campaign import Campaign
+from .outbox import EmailOutbox
+from .idempotency_key import IdempotencyKey
+from .stats import Stats
+from .stats_rollup import StatsRollup
+from .stats_rebuild import StatsRebuild
@@ -0,0 +1,28 @@
+import uuid
+
+from sqlalchemy import Column, UUID, String, DateTime, Enum, ForeignKey, Integer, func
+from sqlalchemy.orm import relationship
+
+from database import Base
+from models.utils.campaignStatus import CampaignStatus
+from models.utils.messageType import MessageType
+
+
+class Campaign(Base):
+    __tablename__ = "campaigns"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    message = Column(String, nullable=False)
+    messageType = Column(Enum(MessageType, name="message_type_enum"), nullable=False)
+    status = Column(Enum(CampaignStatus, name="campaign_status_enum"), nullable=False, default=CampaignStatus.pending)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id", ondelete="SET NULL"), nullable=True)
+
+    company = relationship("Company", back_populates="campaigns")
+    messages = relationship("Message", back_populates="campaign")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -20,6 +20,7 @@ class Company(Base):
     tiktok = Column(String)
     znany_lekarz = Column(String)
     booksy = Column(String)
+    snapshot_version = Column(Integer, nullable=False, default=0, server_default="0")
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     owner = relationship("User", back_populates="companies")
@@ -28,3 +29,5 @@ class Company(Base):
     messages = relationship("Message", back_populates="company", cascade="all, delete-orphan")
     templates = relationship("Template", back_populates="company", cascade="all, delete-orphan")
     surveys = relationship("Survey", back_populates="company", cascade="all, delete-orphan")
+    campaigns = relationship("Campaign", back_populates="company", cascade="all, delete-orphan")
+    stats = relationship("Stats", back_populates="company", cascade="all, delete-orphan")
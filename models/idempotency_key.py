@@ -0,0 +1,13 @@
+from sqlalchemy import Column, UUID, String, DateTime, JSON, ForeignKey
+
+from database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    endpoint = Column(String(255), nullable=False)
+    response = Column(JSON, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,24 +1,45 @@
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Boolean, UUID, JSON
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Boolean, UUID, JSON, Index, text
 from sqlalchemy.orm import relationship
 
 from database import Base
+from models.utils.deliveryStatus import DeliveryStatus
 from models.utils.messageType import MessageType
 from models.utils.portalType import Portal
 from models.utils.respondType import Respond
 
 
 class Message(Base):
+    """
+    Range-partitioned by send_at month on PostgreSQL (see service.partitions),
+    which is why send_at is part of the table's primary key and why review links
+    are resolved through MessageTracking. The ORM still identifies rows by id.
+    """
     __tablename__ = "messages"
+    __table_args__ = (
+        Index(
+            "ix_messages_scheduled_send_at",
+            "send_at",
+            postgresql_where=text("delivery_status = 'scheduled'"),
+            sqlite_where=text("delivery_status = 'scheduled'"),
+        ),
+        Index("ix_messages_client_history", "company_id", "client_id", "send_at", "id"),
+        {"postgresql_partition_by": "RANGE (send_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     message = Column(String, nullable=False)
     tracking_id = Column(UUID(as_uuid=True))
-    send_at = Column(DateTime, nullable=False)
+    send_at = Column(DateTime, primary_key=True, nullable=False)
     clicked_at = Column(DateTime, nullable=True)
     messageType = Column(Enum(MessageType, name="message_type_enum"), nullable=False)
 
+    delivery_status = Column(Enum(DeliveryStatus, name="delivery_status_enum"), nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    delivery_error = Column(String(1000), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+
 
     is_feedback = Column(Boolean, nullable=True)
     feedback_question = Column(String, nullable=True)
@@ -36,6 +57,8 @@ class Message(Base):
     is_redirect = Column(Boolean, nullable=True)
     portal = Column(Enum(Portal, name="portal_enum"), nullable=True)
 
+    review_snapshot = Column(JSON(none_as_null=True), nullable=True)
+
 
     completed = Column(Boolean, nullable=True, default=False)
     completed_at = Column(DateTime, nullable=True)
@@ -46,10 +69,14 @@ class Message(Base):
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="CASCADE"), nullable=True)
     survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), nullable=True)
     template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id", ondelete="CASCADE"), nullable=True)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    __mapper_args__ = {"primary_key": [id]}
 
     client = relationship("Client", back_populates="messages")
     company = relationship("Company", back_populates="messages")
     service = relationship("Service", back_populates="messages")
     survey = relationship("Survey", back_populates="messages")
     template = relationship("Template", back_populates="messages")
+    campaign = relationship("Campaign", back_populates="messages")
 
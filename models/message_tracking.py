@@ -0,0 +1,19 @@
+from sqlalchemy import Column, UUID, DateTime
+
+from database import Base
+
+
+class MessageTracking(Base):
+    """
+    Resolves the tracking_id of a review link to its message. messages is
+    partitioned by send_at, so tracking_id cannot be unique there and a lookup
+    by it alone probes every partition; this table keeps it unique and carries
+    the partition key, so the message itself is one primary-key lookup.
+    """
+    __tablename__ = "message_tracking"
+
+    tracking_id = Column(UUID(as_uuid=True), primary_key=True)
+    # No foreign key, for the same reason as SurveyAnswer.message_id; rows are
+    # dropped together with the partition their message is archived with.
+    message_id = Column(UUID(as_uuid=True), nullable=False)
+    send_at = Column(DateTime, nullable=False)
@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy import Column, UUID, String, DateTime, Enum, ForeignKey, Integer, JSON, Index, func
+from sqlalchemy.orm import relationship
+
+from database import Base
+from models.utils.outboxStatus import OutboxStatus
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sender = Column(String(255), nullable=False)
+    recipients = Column(JSON, nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(Enum(OutboxStatus, name="outbox_status_enum"), nullable=False, default=OutboxStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(String(1000), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # No foreign key: PostgreSQL cannot reference the partitioned messages table by id alone.
+    message_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=True)
+
+    message = relationship("Message", primaryjoin="foreign(EmailOutbox.message_id) == Message.id", viewonly=True)
@@ -1,11 +1,21 @@
-from sqlalchemy import UUID, Column, ForeignKey
+from sqlalchemy import UUID, BigInteger, Column, DateTime, Enum, ForeignKey, String, func
 from sqlalchemy.orm import relationship
 
 from database import Base
-import uuid
+from models.utils.messageType import MessageType
+
 
 class Stats(Base):
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    company_id = Column(UUID(as_uuid=True), ForeignKey('companies.id', ondelete='CASCADE'), nullable=False)
+    """Running engagement counters for one company, channel and portal ("" when the message has no portal)."""
+    __tablename__ = "stats"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+    channel = Column(Enum(MessageType, name="message_type_enum"), primary_key=True)
+    portal = Column(String(50), primary_key=True, default="")
+
+    sent = Column(BigInteger, nullable=False, default=0)
+    clicked = Column(BigInteger, nullable=False, default=0)
+    completed = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    company = relationship("Company", back_populates="services")
\ No newline at end of file
+    company = relationship("Company", back_populates="stats")
@@ -0,0 +1,13 @@
+from sqlalchemy import UUID, Column, DateTime, ForeignKey, String
+
+from database import Base
+
+
+class StatsRebuild(Base):
+    """When one company's stats or rollups were last rebuilt from `messages`; `kind` is "stats" or "rollups"."""
+    __tablename__ = "stats_rebuilds"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    # Taken before the rebuild reads `messages`, so it only vouches for requests made up to that point.
+    started_at = Column(DateTime, nullable=False)
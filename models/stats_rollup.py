@@ -0,0 +1,20 @@
+from sqlalchemy import UUID, BigInteger, Column, DateTime, Enum, ForeignKey, String
+
+from database import Base
+from models.utils.messageType import MessageType
+from models.utils.rollupResolution import RollupResolution
+
+
+class StatsRollup(Base):
+    """Engagement events of one company per hourly or daily bucket, by channel and portal."""
+    __tablename__ = "stats_rollups"
+
+    company_id = Column(UUID(as_uuid=True), ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+    resolution = Column(Enum(RollupResolution, name="rollup_resolution_enum"), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    channel = Column(Enum(MessageType, name="message_type_enum"), primary_key=True)
+    portal = Column(String(50), primary_key=True, default="")
+
+    sent = Column(BigInteger, nullable=False, default=0)
+    clicked = Column(BigInteger, nullable=False, default=0)
+    completed = Column(BigInteger, nullable=False, default=0)
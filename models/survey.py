@@ -14,6 +14,7 @@ class Survey(Base):
     completed_times = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    snapshot_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # TODO: Make logic for that
     # link_end_date = Column(DateTime(timezone=True), server_default=func.now())
@@ -28,3 +29,4 @@ class Survey(Base):
     messages = relationship("Message", back_populates="survey", cascade="all, delete-orphan")
     company = relationship("Company", back_populates="surveys")
     survey_analytic = relationship("SurveyAnalytic", back_populates="survey", uselist=False, cascade="all, delete-orphan")
+    answers = relationship("SurveyAnswer", back_populates="survey", cascade="all, delete-orphan", passive_deletes=True)
@@ -15,6 +15,7 @@ class SurveyAnalytic(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=func.now(), nullable=False)
     content = Column(JSON, nullable=False)
     completed_times = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime, nullable=True)
 
     survey = relationship("Survey", back_populates="survey_analytic")
 
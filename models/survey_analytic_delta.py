@@ -0,0 +1,20 @@
+import uuid
+
+from sqlalchemy import UUID, Column, DateTime, ForeignKey, Integer, JSON
+
+from database import Base
+
+
+class SurveyAnalyticDelta(Base):
+    """
+    One submission's change to its survey's aggregates, in the same shape as
+    `survey_analytic.content`. The refresher adds pending rows into the
+    aggregates and deletes them in the same transaction.
+    """
+    __tablename__ = "survey_analytic_deltas"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False, index=True)
+    content = Column(JSON, nullable=False)
+    completed = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,31 @@
+import uuid
+
+from sqlalchemy import Column, UUID, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from database import Base
+
+
+class SurveyAnswer(Base):
+    __tablename__ = "survey_answers"
+    __table_args__ = (
+        UniqueConstraint("message_id", "question_id", name="uq_survey_answers_message_question"),
+        Index("ix_survey_answers_survey_question_numeric", "survey_id", "question_id", "numeric_value"),
+        Index("ix_survey_answers_survey_question_choice", "survey_id", "question_id", "choice_value"),
+        Index("ix_survey_answers_survey_answered_at", "survey_id", "answered_at"),
+        Index("ix_survey_answers_drilldown", "survey_id", "question_id", "answered_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # No foreign key: messages is partitioned by send_at and cannot be referenced by id alone.
+    message_id = Column(UUID(as_uuid=True), nullable=False)
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id", ondelete="CASCADE"), nullable=True)
+    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="SET NULL"), nullable=True)
+    question_id = Column(String(255), nullable=False)
+    numeric_value = Column(Float, nullable=True)
+    text_value = Column(String, nullable=True)
+    choice_value = Column(String(255), nullable=True)
+    answered_at = Column(DateTime, nullable=False)
+
+    survey = relationship("Survey", back_populates="answers")
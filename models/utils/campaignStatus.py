@@ -0,0 +1,9 @@
+import enum
+
+
+class CampaignStatus(enum.Enum):
+    pending = "pending"
+    scheduled = "scheduled"
+    sending = "sending"
+    completed = "completed"
+    failed = "failed"
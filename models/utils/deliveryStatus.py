@@ -0,0 +1,9 @@
+import enum
+
+
+class DeliveryStatus(enum.Enum):
+    scheduled = "scheduled"
+    queued = "queued"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
@@ -0,0 +1,8 @@
+import enum
+
+
+class OutboxStatus(enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    dead = "dead"
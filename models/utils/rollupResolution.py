@@ -0,0 +1,6 @@
+import enum
+
+
+class RollupResolution(enum.Enum):
+    hour = "hour"
+    day = "day"
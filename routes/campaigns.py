@@ -0,0 +1,78 @@
+import uuid
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header
+from sqlalchemy.orm import Session
+from starlette import status
+
+from database import get_db
+from models import Campaign, Service
+from models.utils.campaignStatus import CampaignStatus
+from schemas.campaigns import CampaignOutput, CreateCampaign
+from service.campaign import create_campaign_messages, deliver_campaign, resolve_campaign_clients
+from service.scheduler import message_scheduler
+from utils.get_company import validate_company_access
+from utils.idempotency import commit_idempotent, find_idempotent_response
+
+router = APIRouter(prefix="/campaigns", tags=["campaigns"])
+
+
+@router.post("/{company_id}", response_model=CampaignOutput, status_code=status.HTTP_202_ACCEPTED)
+def create_campaign(
+        company_id: uuid.UUID,
+        request: CreateCampaign,
+        background_tasks: BackgroundTasks,
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+        db: Session = Depends(get_db),
+        _: None = Depends(validate_company_access)
+):
+    replay = find_idempotent_response(db, company_id, idempotency_key, "create_campaign")
+    if replay is not None:
+        return db.query(Campaign).filter_by(id=replay["id"]).first() or replay
+
+    if request.service and not db.query(Service).filter_by(id=request.service, company_id=company_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
+
+    client_ids = resolve_campaign_clients(db, company_id, request)
+    if not client_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No clients found")
+
+    campaign = Campaign(
+        id=uuid.uuid4(),
+        message=request.message,
+        messageType=request.messageType,
+        status=CampaignStatus.scheduled if request.is_scheduled() else CampaignStatus.pending,
+        total=len(client_ids),
+        company_id=company_id,
+        template_id=request.template,
+    )
+    try:
+        db.add(campaign)
+        db.flush()
+        message_ids = create_campaign_messages(db, campaign, request, client_ids)
+        output = CampaignOutput.model_validate(campaign)
+        replay = commit_idempotent(db, company_id, idempotency_key, "create_campaign", output)
+    except Exception:
+        db.rollback()
+        raise
+    if replay is not None:
+        return db.query(Campaign).filter_by(id=replay["id"]).first() or replay
+
+    db.refresh(campaign)
+    if campaign.status == CampaignStatus.scheduled:
+        message_scheduler.schedule_many(message_ids, request.sendAt)
+    else:
+        background_tasks.add_task(deliver_campaign, campaign.id)
+    return campaign
+
+
+@router.get("/{company_id}/{campaign_id}", response_model=CampaignOutput, status_code=status.HTTP_200_OK)
+def get_campaign(
+        company_id: uuid.UUID,
+        campaign_id: uuid.UUID,
+        db: Session = Depends(get_db),
+        _: None = Depends(validate_company_access)
+):
+    campaign = db.query(Campaign).filter_by(id=campaign_id, company_id=company_id).first()
+    if not campaign:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
+    return campaign
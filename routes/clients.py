@@ -4,7 +4,6 @@ from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy.orm import Session
 
 import uuid
-from sqlalchemy import or_
 from starlette import status
 
 from database import get_db
@@ -12,6 +11,7 @@ from models.client import Client
 from utils.db_transaction import db_transaction
 from utils.get_client_or_404 import get_client_or_404
 from utils.get_company import validate_company_access
+from service.search import apply_search
 from schemas.clients import CreateClient, ClientOut, UpdateClient
 
 router = APIRouter(prefix="/clients", tags=["clients"])
@@ -34,15 +34,7 @@ def list_clients(
 ):
     query = db.query(Client).filter_by(company_id=company_id).order_by(Client.name)
 
-    if search_term:
-        query = query.filter(
-            or_(
-                Client.name.ilike(f"%{search_term}%"),
-                Client.surname.ilike(f"%{search_term}%"),
-                Client.email.ilike(f"%{search_term}%"),
-                Client.phone.ilike(f"%{search_term}%"),
-            )
-        )
+    query = apply_search(query, Client, search_term)
 
     return paginate(query, params)
 
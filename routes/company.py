@@ -11,6 +11,7 @@ from database import get_db
 from utils.security import get_current_user
 from uuid import UUID
 from schemas.company import GroupOut, GroupCreate, GroupUpdate
+from service.review_snapshot import invalidate_company_snapshots
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
 
@@ -118,6 +119,7 @@ def update_group(
     if group_update.booksy_link is not None:
         group.booksy_link = group_update.booksy_link
 
+    invalidate_company_snapshots(db, group.id)
     db.commit()
     db.refresh(group)
     return group
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from models.utils.messageType import MessageType
+from service.export import export_batches, export_query, to_csv, to_ndjson
+from utils.get_company import validate_company_access
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+EXPORT_FORMATS = {
+    "csv": (to_csv, "text/csv; charset=utf-8"),
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+}
+
+
+@router.get("/{company_id}/messages")
+def export_messages(
+        company_id: uuid.UUID,
+        format: Literal["csv", "ndjson"] = "csv",
+        start: datetime | None = None,
+        end: datetime | None = None,
+        message_type: MessageType | None = None,
+        review_type: Literal["feedback", "rating", "survey"] | None = None,
+        client_id: uuid.UUID | None = None,
+        _: None = Depends(validate_company_access)
+):
+    serialize, media_type = EXPORT_FORMATS[format]
+    query = export_query(company_id, start, end, message_type, review_type, client_id)
+    filename = f"messages-{company_id}-{datetime.now():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        serialize(export_batches(query)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,39 +1,80 @@
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
 from fastapi_pagination import Page, Params
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from starlette import status
 from fastapi_pagination.ext.sqlalchemy import paginate
 from typing_extensions import Annotated
 
 from database import get_db
-from models import Message, Service, Survey, Template, Client
+from models import Message, MessageTracking, Service, Survey, Template, Client
 from models.company import Company
 
+from models.utils.deliveryStatus import DeliveryStatus
 from models.utils.messageType import MessageType
+from utils.batch_loader import loader
+from utils.cursor import decode_cursor, encode_cursor
 from utils.get_company import validate_company_access
-from service.email import send_email
-from service.base_template_builder import base_template_builder
-from schemas.messages import CreateMessage, SendFeedbackRequest, MessageOutput, MessagesOutput, ReviewResponse, SendRatingRequest, SendSurveyRequest
+from utils.get_review_message_or_404 import get_review_message_or_404
+from utils.idempotency import commit_idempotent, find_idempotent_response
+from service.click_buffer import click_buffer
+from service.outbox import enqueue_email
+from service.review_snapshot import message_review_snapshot, snapshot_is_current
+from service.scheduler import message_scheduler
+from service.search import apply_search
+from service.stats import record_stats
+from service.survey_analytics import count_completion, record_survey_response, write_survey_answers
+from service.survey_refresher import survey_analytics_refresher
+from service.sms import OutgoingSms, sms_body, sms_dispatcher
+from service.template_renderer import render_template, template_values
+from service.base_template_builder import build_review_url
+from schemas.messages import CreateMessage, SendFeedbackRequest, MessageOutput, MessagesOutput, MessagesCursorPage, ReviewResponse, SendRatingRequest, SendSurveyRequest
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 
+def messages_output(message: Message) -> MessagesOutput:
+    return MessagesOutput(
+        id=message.id,
+        message=message.message,
+        send_at=message.send_at,
+        messageType=message.messageType.value if hasattr(message.messageType, "value") else message.messageType,
+        tracking_id=message.tracking_id,
+        clicked_at=message.clicked_at,
+        feedback_content=message.feedback_content,
+        is_feedback=message.is_feedback,
+        is_rating=message.is_rating,
+        is_survey=message.is_survey,
+        feedback_response=message.feedback_response,
+        completed=message.completed,
+        completed_at=message.completed_at,
+        delivery_status=message.delivery_status,
+    )
+
+
 @router.post("/{company_id}/{client_id}/send_single_sms", response_model=MessagesOutput)
 def create_sms_message(
     company_id: str,
     client_id: uuid.UUID,
     request: CreateMessage,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     _: None = Depends(validate_company_access)
 ):
+    replay = find_idempotent_response(db, company_id, idempotency_key, "send_single_sms")
+    if replay is not None:
+        return replay
+
     message = Message(
+        id=uuid.uuid4(),
         message=request.message,
         tracking_id=uuid.uuid4(),
-        send_at=datetime.now(),
+        send_at=request.sendAt if request.is_scheduled() else datetime.now(),
         messageType=MessageType.SMS,
+        delivery_status=DeliveryStatus.scheduled if request.is_scheduled() else DeliveryStatus.queued,
         client_id=client_id,
         company_id=company_id
     )
@@ -43,8 +84,7 @@ def create_sms_message(
     if request.platform:
         message.portal = request.platform
     if request.service:
-        db_service = db.query(Service).filter_by(id=request.service).first()
-        message.service = db_service
+        message.service = loader(db, Service).load(request.service)
     if request.type == "feedback":
         message.is_feedback = True
         message.feedback_question = request.feedbackQuestion
@@ -55,21 +95,23 @@ def create_sms_message(
         message.is_survey = True
         message.survey_id = request.surveyId
 
+    message.review_snapshot = message_review_snapshot(db, message)
     db.add(message)
-    db.commit()
-    db.refresh(message)
-
-    # TODO: Implement sending SMS
+    db.add(MessageTracking(tracking_id=message.tracking_id, message_id=message.id, send_at=message.send_at))
+    record_stats(db, company_id, MessageType.SMS, message.portal, message.send_at, sent=1)
+    output = messages_output(message)
+    replay = commit_idempotent(db, company_id, idempotency_key, "send_single_sms", output)
+    if replay is not None:
+        return replay
+
+    if message.delivery_status == DeliveryStatus.scheduled:
+        message_scheduler.schedule(message.id, message.send_at)
+    else:
+        sms_dispatcher.submit([
+            OutgoingSms(message.id, request.phone, sms_body(message.message, company_id, client_id, message.tracking_id))
+        ])
 
-    return MessagesOutput(
-        id=message.id,
-        message=message.message,
-        send_at=message.send_at,
-        messageType=message.messageType.value if hasattr(message.messageType, "value") else message.messageType,
-        responded=message.feedback_response.value if message.feedback_response else None,
-        feedback=message.feedback_content,
-        tracking_id=message.tracking_id,
-    )
+    return output
 
 
 @router.post("/{company_id}/{client_id}/send_single_email", response_model=MessagesOutput)
@@ -77,14 +119,21 @@ def create_email_message(
     company_id: str,
     client_id: uuid.UUID,
     request: CreateMessage,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     _: None = Depends(validate_company_access)
 ):
+    replay = find_idempotent_response(db, company_id, idempotency_key, "send_single_email")
+    if replay is not None:
+        return replay
+
     message = Message(
+        id=uuid.uuid4(),
         message=request.message,
         tracking_id=uuid.uuid4(),
-        send_at=datetime.now(),
+        send_at=request.sendAt if request.is_scheduled() else datetime.now(),
         messageType=MessageType.Email,
+        delivery_status=DeliveryStatus.scheduled if request.is_scheduled() else DeliveryStatus.queued,
         client_id=client_id,
         company_id=company_id,
         template_id=request.template
@@ -95,8 +144,7 @@ def create_email_message(
     if request.platform:
         message.portal = request.platform
     if request.service:
-        db_service = db.query(Service).filter_by(id=request.service).first()
-        message.service = db_service
+        message.service = loader(db, Service).load(request.service)
     if request.type == "feedback":
         message.is_feedback = True
         message.feedback_question = request.feedbackQuestion
@@ -107,30 +155,39 @@ def create_email_message(
         message.is_survey = True
         message.survey_id = request.surveyId
 
-    db.add(message)
-    db.commit()
-    db.refresh(message)
-
-    template = db.query(Template).filter_by(id=request.template).first()
-    user = db.query(Client).filter_by(id=client_id).first()
-    company = db.query(Company).filter_by(id=company_id).first()
+    template = loader(db, Template).load(request.template)
+    user = loader(db, Client).load(client_id)
+    company = loader(db, Company).load(company_id)
 
     if not template or not user or not company:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Data not found")
+    recipient = request.email or user.email
+    if not recipient:
+        raise HTTPException(status_code=422, detail="Client has no email address")
 
-    template = str(template.template).replace('{{name}}', user.name.split(" ")[0]).replace("{{company}}", company.name)
+    message.review_snapshot = message_review_snapshot(db, message, company)
+    db.add(message)
+    db.add(MessageTracking(tracking_id=message.tracking_id, message_id=message.id, send_at=message.send_at))
+    record_stats(db, company_id, MessageType.Email, message.portal, message.send_at, sent=1)
+    if message.delivery_status == DeliveryStatus.queued:
+        body = render_template(template, template_values(
+            user.name,
+            user.surname,
+            company.name,
+            build_review_url(company_id, client_id, message.tracking_id),
+            message.service.name if message.service else None,
+        ))
+        enqueue_email(db, [recipient], body, message_id=message.id, company_id=company.id)
 
-    send_email("Acme <onboarding@resend.dev>", request.email, 'test', template)
+    output = messages_output(message)
+    replay = commit_idempotent(db, company_id, idempotency_key, "send_single_email", output)
+    if replay is not None:
+        return replay
 
-    return MessagesOutput(
-        id=message.id,
-        message=message.message,
-        send_at=message.send_at,
-        messageType=message.messageType.value if hasattr(message.messageType, "value") else message.messageType,
-        responded=message.feedback_response.value if message.feedback_response else None,
-        feedback=message.feedback_content,
-        tracking_id=message.tracking_id,
-    )
+    if message.delivery_status == DeliveryStatus.scheduled:
+        message_scheduler.schedule(message.id, message.send_at)
+
+    return output
 
 
 @router.get("/{company_id}/{client_id}", response_model=Page[MessagesOutput], status_code=status.HTTP_200_OK)
@@ -144,12 +201,48 @@ def get_messages(
 ):
     query = db.query(Message).filter_by(client_id=client_id, company_id=company_id).order_by(Message.send_at.desc())
 
-    if search_term:
-        query = query.filter(Message.message.ilike(f"%{search_term}%"))
+    query = apply_search(query, Message, search_term)
 
     return paginate(query, params)
 
 
+@router.get("/{company_id}/{client_id}/history", response_model=MessagesCursorPage, status_code=status.HTTP_200_OK)
+def get_messages_history(
+    company_id: uuid.UUID,
+    client_id: uuid.UUID,
+    cursor: str | None = None,
+    size: Annotated[int, Query(ge=1, le=500)] = 50,
+    include_total: bool = False,
+    search_term: Annotated[str | None, Query(max_length=100)] = None,
+    db: Session = Depends(get_db),
+    _: None = Depends(validate_company_access)
+):
+    """
+    Newest-first message history paged by an opaque (send_at, id) cursor. Each
+    page is a range scan on ix_messages_client_history, so it costs the same
+    however deep it is; the total is only counted when asked for.
+    """
+    query = db.query(Message).filter(Message.company_id == company_id, Message.client_id == client_id)
+    query = apply_search(query, Message, search_term)
+
+    total = query.order_by(None).count() if include_total else None
+
+    if cursor:
+        send_at, message_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Message.send_at, Message.id) < tuple_(send_at, message_id))
+
+    rows = query.order_by(Message.send_at.desc(), Message.id.desc()).limit(size + 1).all()
+    items = rows[:size]
+    next_cursor = encode_cursor(items[-1].send_at, items[-1].id) if len(rows) > size else None
+
+    return MessagesCursorPage(
+        items=[messages_output(item) for item in items],
+        size=size,
+        next_cursor=next_cursor,
+        total=total,
+    )
+
+
 @router.get("/review/{company_id}/{client_id}/{tracking_id}", response_model=ReviewResponse, status_code=status.HTTP_200_OK)
 def get_review(
         company_id: uuid.UUID,
@@ -157,7 +250,7 @@ def get_review(
         tracking_id: uuid.UUID,
         db: Session = Depends(get_db),
 ):
-    message = db.query(Message).filter_by(client_id=client_id, company_id=company_id, tracking_id=tracking_id).first()
+    message = get_review_message_or_404(db, company_id, client_id, tracking_id)
 
     if message.completed:
         raise HTTPException(
@@ -165,35 +258,11 @@ def get_review(
             detail="Review already completed"
         )
 
-    if not message:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
-
-    service = db.query(Service).filter_by(id=message.service_id).first()
-    company = db.query(Company).filter_by(id=company_id).first()
-    review_link = None
-    if message.portal:
-        review_link = getattr(company, message.portal.value, None)
-
-    review = ReviewResponse(
-        service_name=service.name if service else None,
-        service_id=service.id if service else None  ,
-        company_logo=company.logo_url
-    )
-    if message.is_redirect:
-        review.is_redirect = True
-        review.portal = review_link if review_link else None
-    if message.is_feedback:
-        review.is_feedback = True
-        review.feedback_question = message.feedback_question
-    elif message.is_survey:
-        survey = db.query(Survey).filter_by(id=message.survey_id).first()
-        review.is_survey = True
-        review.survey = survey
-    elif message.is_rating:
-        review.is_rating = True
-        review.rating_question = message.rating_question
-
-    return review
+    if not snapshot_is_current(db, message):
+        message.review_snapshot = message_review_snapshot(db, message)
+        db.commit()
+
+    return ReviewResponse.model_validate(message.review_snapshot)
 
 
 @router.get("/review/{company_id}/{client_id}/{tracking_id}/ping", status_code=status.HTTP_200_OK)
@@ -203,14 +272,10 @@ def ping_click(
         tracking_id: uuid.UUID,
         db: Session = Depends(get_db),
 ):
-    message = db.query(Message).filter_by(client_id=client_id, company_id=company_id, tracking_id=tracking_id).first()
+    message = get_review_message_or_404(db, company_id, client_id, tracking_id)
     if message.clicked_at or message.completed:
         return status.HTTP_200_OK
-    if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-    message.clicked_at = datetime.now()
-    db.commit()
-    db.refresh(message)
+    click_buffer.record(message.id)
     return status.HTTP_200_OK
 
 @router.post("/review/{company_id}/{client_id}/{tracking_id}/send_feedback", status_code=status.HTTP_201_CREATED)
@@ -221,8 +286,11 @@ def send_feedback(
         feedback: SendFeedbackRequest,
         db: Session = Depends(get_db),
 ):
-    message = db.query(Message).filter_by(client_id=client_id, company_id=company_id, tracking_id=tracking_id).first()
-    message.completed_at = datetime.now()
+    message = get_review_message_or_404(db, company_id, client_id, tracking_id)
+    completed_at = datetime.now()
+    if not message.completed:
+        record_stats(db, company_id, message.messageType, message.portal, completed_at, completed=1)
+    message.completed_at = completed_at
     # TODO: implement sentiment analysis
     #message.feedback_response = Respond.positiveResponse
     message.feedback_content = feedback.feedback
@@ -239,8 +307,11 @@ def send_rating(
         rating: SendRatingRequest,
         db: Session = Depends(get_db),
 ):
-    message = db.query(Message).filter_by(client_id=client_id, company_id=company_id, tracking_id=tracking_id).first()
-    message.completed_at = datetime.now()
+    message = get_review_message_or_404(db, company_id, client_id, tracking_id)
+    completed_at = datetime.now()
+    if not message.completed:
+        record_stats(db, company_id, message.messageType, message.portal, completed_at, completed=1)
+    message.completed_at = completed_at
     message.rating = rating.rating
     message.rating_feedback = rating.feedback
     message.completed = True
@@ -256,25 +327,29 @@ def send_survey(
         survey: SendSurveyRequest,
         db: Session = Depends(get_db),
 ):
-    message = db.query(Message).filter_by(client_id=client_id, company_id=company_id, tracking_id=tracking_id, survey_id=survey.survey.survey_id).first()
-    db_survey = db.query(Survey).filter_by(id=survey.survey.survey_id).first()
-
-    if not message:
+    message = get_review_message_or_404(db, company_id, client_id, tracking_id)
+    if message.survey_id != survey.survey.survey_id:
         raise HTTPException(status_code=404, detail="Message not found")
+    db_survey = loader(db, Survey).load(survey.survey.survey_id)
+
     if not db_survey:
         raise HTTPException(status_code=404, detail="Survey not found")
 
-    if db_survey.completed_times is None:
-        db_survey.completed_times = 1
-    else:
-        db_survey.completed_times = db_survey.completed_times + 1
-
-    message.completed_at = datetime.now()
+    completed_at = datetime.now()
+    resubmitted = bool(message.completed)
+    previous = message.survey_result
+    if not resubmitted:
+        record_stats(db, company_id, message.messageType, message.portal, completed_at, completed=1)
+    message.completed_at = completed_at
     message.survey_result = survey.survey.answers
     message.completed = True
+    write_survey_answers(db, db_survey, message, survey.survey.answers, completed_at)
+    record_survey_response(db, db_survey, survey.survey.answers, previous, resubmitted)
+    if not resubmitted:
+        count_completion(db, db_survey.id)
     db.commit()
     db.refresh(message)
-    db.refresh(db_survey)
+    survey_analytics_refresher.mark(db_survey.id)
     return status.HTTP_200_OK
 
 @router.get("/review/{company_id}/{client_id}/sms_message_details/{message_id}", response_model=MessageOutput, status_code=status.HTTP_200_OK)
@@ -289,13 +364,8 @@ def sms_message_details(
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
-    service = None
-    if message.service_id:
-        service = db.query(Service).filter_by(id=message.service_id).first()
-
-    survey_obj: Survey | None = None
-    if message.is_survey:
-        survey_obj = db.query(Survey).filter_by(id=message.survey_id).first()
+    service = loader(db, Service).load(message.service_id)
+    survey_obj: Survey | None = loader(db, Survey).load(message.survey_id) if message.is_survey else None
 
     return MessageOutput(
         id=message.id,
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from starlette import status
+
+from service.click_buffer import click_buffer
+from service.email import email_dispatcher
+from service.scheduler import message_scheduler
+from service.sms import sms_dispatcher
+from service.survey_refresher import survey_analytics_refresher
+from utils.security import get_current_user
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/email", status_code=status.HTTP_200_OK)
+def email_metrics(_=Depends(get_current_user)):
+    return email_dispatcher.counters()
+
+
+@router.get("/sms", status_code=status.HTTP_200_OK)
+def sms_metrics(_=Depends(get_current_user)):
+    return {"queued": sms_dispatcher.depth()}
+
+
+@router.get("/clicks", status_code=status.HTTP_200_OK)
+def click_metrics(_=Depends(get_current_user)):
+    return click_buffer.metrics()
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+def scheduler_metrics(_=Depends(get_current_user)):
+    return message_scheduler.metrics()
+
+
+@router.get("/survey-analytics", status_code=status.HTTP_200_OK)
+def survey_analytics_metrics(_=Depends(get_current_user)):
+    return survey_analytics_refresher.metrics()
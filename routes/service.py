@@ -5,13 +5,14 @@ from fastapi.params import Depends, Query
 from fastapi_pagination import Params
 from fastapi_pagination.links import Page
 from pydantic import BaseModel
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from starlette import status
 from fastapi_pagination.ext.sqlalchemy import paginate
 from database import get_db
 from models.company import Company
 from models.services import Service
+from service.review_snapshot import invalidate_service_snapshots
+from service.search import apply_search
 from utils.security import get_current_user
 
 router = APIRouter(prefix="/services", tags=["service"])
@@ -61,13 +62,7 @@ def list_services(
 
     query = db.query(Service).filter(Service.company_id == company_id)
 
-    if search_term:
-        query = query.filter(
-            or_(
-                Service.name.ilike(f"%{search_term}%"),
-                Service.description.ilike(f"%{search_term}%"),
-            )
-        )
+    query = apply_search(query, Service, search_term)
 
     return paginate(query, params)
 
@@ -99,6 +94,7 @@ def update_client(
 
     for key, value in service_update.dict().items():
         setattr(service, key, value)
+    invalidate_service_snapshots(db, service.id)
     db.commit()
     db.refresh(service)
     return service
@@ -0,0 +1,69 @@
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from starlette import status
+
+from database import get_db
+from models.utils.messageType import MessageType
+from models.utils.portalType import Portal
+from schemas.stats import ChannelStats, CompanyStatsOutput, CompanyTimeSeriesOutput, PortalStats, TimeSeriesInterval, \
+    TimeSeriesPoint
+from service.stats import STATS_COUNTERS, TIMESERIES_MAX_POINTS, company_stats, company_timeseries, pick_interval
+from utils.get_company import validate_company_access
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/{company_id}", response_model=CompanyStatsOutput, status_code=status.HTTP_200_OK)
+def get_company_stats(
+        company_id: uuid.UUID,
+        db: Session = Depends(get_db),
+        _: None = Depends(validate_company_access)
+):
+    totals = Counter()
+    by_channel, by_portal = defaultdict(Counter), defaultdict(Counter)
+    for row in company_stats(db, company_id):
+        counts = {counter: getattr(row, counter) for counter in STATS_COUNTERS}
+        totals.update(counts)
+        by_channel[row.channel].update(counts)
+        by_portal[row.portal or None].update(counts)
+
+    return CompanyStatsOutput(
+        **totals,
+        by_channel=[ChannelStats(channel=channel, **counts) for channel, counts in by_channel.items()],
+        by_portal=[PortalStats(portal=portal, **counts) for portal, counts in by_portal.items()],
+    )
+
+
+@router.get("/{company_id}/timeseries", response_model=CompanyTimeSeriesOutput, status_code=status.HTTP_200_OK)
+def get_company_timeseries(
+        company_id: uuid.UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        interval: TimeSeriesInterval | None = None,
+        channel: MessageType | None = None,
+        portal: Portal | None = None,
+        db: Session = Depends(get_db),
+        _: None = Depends(validate_company_access)
+):
+    end = end or datetime.now()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    interval = interval or pick_interval(start, end)
+    if interval == "hour" and (end - start) > timedelta(hours=TIMESERIES_MAX_POINTS):
+        raise HTTPException(status_code=422, detail="Range too long for hourly points")
+
+    points = [
+        TimeSeriesPoint(
+            bucket=bucket,
+            **counts,
+            click_rate=counts["clicked"] / counts["sent"] if counts["sent"] else 0.0,
+            conversion=counts["completed"] / counts["sent"] if counts["sent"] else 0.0,
+        )
+        for bucket, counts in company_timeseries(db, company_id, start, end, interval, channel, portal)
+    ]
+    return CompanyTimeSeriesOutput(interval=interval, start=start, end=end, points=points)
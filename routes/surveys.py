@@ -1,19 +1,28 @@
 import uuid
+from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlalchemy import paginate
-from pydantic import BaseModel, Field
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from typing_extensions import Annotated
 from starlette import status
 
+from config import SURVEY_ANALYTICS_MAX_STALENESS
 from database import get_db
-from models import SurveyAnalytic, Message, Client
+from models import SurveyAnalytic, SurveyAnswer
 from models.survey import Survey
+from utils.cursor import decode_cursor, encode_cursor
 from utils.get_company import validate_company_access
 from utils.security import get_current_user
 from models.company import Company
-from schemas.surveys import CreateSurveyOutput, SurveyCreate, SurveyOutput, SurveyUpdate, SurveyAnalyticsData
+from schemas.surveys import CreateSurveyOutput, SurveyCreate, SurveyOutput, SurveyUpdate, SurveyAnalyticsData, \
+    SurveyAnswerPage
+from service.review_snapshot import invalidate_survey_snapshots
+from service.survey_analytics import analytics_output, answer_output, answers_query, empty_aggregates
+from service.survey_refresher import survey_analytics_refresher
+from service.survey_engine import cross_tab, distributions, shared_answer_columns
 
 router = APIRouter(prefix="/surveys", tags=["surveys"])
 
@@ -96,6 +105,7 @@ def update_survey(
     if request.content is not None:
         survey.content = request.content
 
+    invalidate_survey_snapshots(db, survey.id)
     db.commit()
     db.refresh(survey)
 
@@ -123,6 +133,11 @@ def delete_survey(
 @router.get("/{company_id}/{survey_id}/analytic", response_model=SurveyAnalyticsData, status_code=status.HTTP_200_OK)
 def get_analytics(
         survey_id: uuid.UUID,
+        detailed: bool = False,
+        cross_row: str | None = None,
+        cross_column: str | None = None,
+        answered_after: datetime | None = None,
+        answered_before: datetime | None = None,
         db: Session = Depends(get_db),
         _: None = Depends(validate_company_access)
 ):
@@ -131,99 +146,79 @@ def get_analytics(
     if survey is None:
         raise HTTPException(status_code=404, detail="Survey not found")
 
+    # Serve whatever is stored; refreshing happens in the background.
     survey_analytics = db.query(SurveyAnalytic).filter_by(survey_id=survey_id).first()
-    if survey_analytics is None or survey_analytics.completed_times != survey.completed_times:
-        analysis_id, all_users = do_analytics(survey, survey_analytics, db)
-        analysis = db.query(SurveyAnalytic).filter_by(id=analysis_id).first()
-        print(analysis.completed_times)
-        return SurveyAnalyticsData(
-            id=analysis.id,
-            survey_id=survey.id,
-            name=survey.name,
-            description=survey.description,
-            content=analysis.content,
-            completed_times=analysis.completed_times,
-            users=all_users
-        )
-    elif survey_analytics.completed_times == survey.completed_times:
-        all_users = dict()
-        messages = db.query(Message).filter_by(is_survey=True, survey_id=survey.id).all()
-        for message in messages:
-            client = db.query(Client).filter_by(id=message.client_id).first()
-            all_users.update({client.id: client.name if client.name else client.email})
-        return SurveyAnalyticsData(
-            id=survey_analytics.id,
-            survey_id=survey.id,
-            name=survey.name,
-            description=survey.description,
-            content=survey_analytics.content,
-            completed_times=survey_analytics.completed_times,
-            users=all_users
-        )
-
-class SurveyAnswer(BaseModel):
-    client_id: uuid.UUID
-    client_email: str
-    answer: str | int
-
-class SurveyAnalyticRecord(BaseModel):
-    type: str
-    label: str
-    required: bool
-    options: list[str] | None = None
-    average_rating: float | None = None
-    average_choice: dict[str, int] = Field(default_factory=dict)
-    answers: list[SurveyAnswer] = Field(default_factory=list)
-
-class SurveyAnalyticOutput(BaseModel):
-    records: list[SurveyAnalyticRecord]
-
-def do_analytics(
-        survey: Survey,
-        survey_analytics: SurveyAnalytic | None,
+    refreshed_at = survey_analytics.refreshed_at if survey_analytics else None
+    stale = survey_analytics is None or survey_analytics.completed_times != (survey.completed_times or 0)
+    if stale:
+        expired = refreshed_at is None or datetime.now() - refreshed_at > timedelta(seconds=SURVEY_ANALYTICS_MAX_STALENESS)
+        survey_analytics_refresher.mark(survey.id, force=expired)
+
+    content = analytics_output(survey, survey_analytics.content if survey_analytics else empty_aggregates(survey))
+    result = SurveyAnalyticsData(
+        survey_id=survey.id,
+        name=survey.name,
+        description=survey.description,
+        content=content.model_dump(mode="json"),
+        completed_times=survey_analytics.completed_times if survey_analytics else 0,
+        refreshed_at=refreshed_at,
+        stale=stale,
+    )
+
+    if detailed or cross_row or cross_column:
+        columns = shared_answer_columns(db, survey, answered_after, answered_before)
+        if detailed:
+            result.distributions = distributions(columns)
+        if cross_row or cross_column:
+            try:
+                result.cross_tab = cross_tab(columns, cross_row, cross_column)
+            except KeyError as exc:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Question {exc.args[0]} is not a rating or choice question"
+                )
+
+    return result
+
+
+@router.get("/{company_id}/{survey_id}/analytic/{question_id}/answers", response_model=SurveyAnswerPage, status_code=status.HTTP_200_OK)
+def get_question_answers(
+        company_id: uuid.UUID,
+        survey_id: uuid.UUID,
+        question_id: str,
+        cursor: str | None = None,
+        size: Annotated[int, Query(ge=1, le=500)] = 50,
+        choice: Annotated[list[str] | None, Query()] = None,
+        min_rating: float | None = None,
+        max_rating: float | None = None,
+        answered_after: datetime | None = None,
+        answered_before: datetime | None = None,
+        service_id: uuid.UUID | None = None,
         db: Session = Depends(get_db),
+        _: None = Depends(validate_company_access)
 ):
-    messages = db.query(Message).filter_by(is_survey=True, survey_id=survey.id).all()
-    analytic: SurveyAnalyticOutput = SurveyAnalyticOutput(total_answers=len(messages), records=[])
-    all_users = dict()
-    for s in survey.content:
-        record = SurveyAnalyticRecord(type=s.get('type'), label=s.get('label'), required=s.get('required'), options=s.get('options'))
-        ratings = 0
-        counter_rating = 0
-        if s.get('type') == 'choice':
-            options = s.get('options')
-            for option in options:
-                record.average_choice[str(option)] = 0
-
-        for message in messages:
-            if s['id'] is not None and message.survey_result is not None:
-                if s.get('type') == 'rating':
-                    counter_rating += 1
-                    ratings += message.survey_result[s['id']]
-                if s.get('type') == 'choice':
-                    record.average_choice[message.survey_result[s['id']]] += 1
-                client = db.query(Client).filter_by(id=message.client_id).first()
-                all_users.update({client.id: client.name if client.name else client.email})
-                answer = SurveyAnswer(client_id=client.id, client_email=client.name if client.name else client.email, answer=message.survey_result[s['id']])
-
-                record.answers.append(answer)
-        if ratings > 0 and counter_rating > 0:
-            record.average_rating = ratings / counter_rating
-        analytic.records.append(record)
-
-    if survey_analytics is not None:
-        survey_analytics.content = analytic.model_dump(mode="json")
-        survey_analytics.completed_times = len(messages)
-        db.add(survey_analytics)
-        db.commit()
-        return survey_analytics.id, all_users
-    else:
-        analysis = SurveyAnalytic(
-            survey_id=survey.id,
-            content=analytic.model_dump(mode="json"),
-            completed_times=len(messages),
-        )
-        db.add(analysis)
-        db.commit()
-        return analysis.id, all_users
+    """
+    Newest-first answers to one question, paged by an opaque (answered_at, id)
+    cursor over ix_survey_answers_drilldown.
+    """
+    survey = db.query(Survey).filter_by(id=survey_id, company_id=company_id).first()
 
+    if survey is None:
+        raise HTTPException(status_code=404, detail="Survey not found")
+    if not any(str(question.get("id")) == question_id for question in survey.content or []):
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    query = answers_query(survey_id, question_id, choice, min_rating, max_rating, answered_after, answered_before, service_id)
+    if cursor:
+        answered_at, answer_id = decode_cursor(cursor)
+        query = query.where(tuple_(SurveyAnswer.answered_at, SurveyAnswer.id) < tuple_(answered_at, answer_id))
+
+    rows = db.execute(query.order_by(SurveyAnswer.answered_at.desc(), SurveyAnswer.id.desc()).limit(size + 1)).all()
+    items = rows[:size]
+    next_cursor = encode_cursor(items[-1][0].answered_at, items[-1][0].id) if len(rows) > size else None
+
+    return SurveyAnswerPage(
+        items=[answer_output(answer, name, email) for answer, name, email in items],
+        size=size,
+        next_cursor=next_cursor,
+    )
@@ -5,7 +5,6 @@ from fastapi import APIRouter, HTTPException
 from fastapi.params import Depends, Query
 from fastapi_pagination import Page, Params
 from pydantic import BaseModel
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from fastapi_pagination.ext.sqlalchemy import paginate
 from starlette import status
@@ -13,6 +12,7 @@ from starlette import status
 from database import get_db
 from models import Company
 from models.template import Template
+from service.search import apply_search
 from utils.get_company import validate_company_access
 from utils.security import get_current_user
 
@@ -56,14 +56,7 @@ async def get_templates(
 ):
 
     query = db.query(Template).filter_by(company_id=company_id).order_by(Template.created_at.desc())
-    if search_term:
-        query = query.filter(
-            or_(
-                Template.name.ilike(f"%{search_term}%"),
-                Template.description.ilike(f"%{search_term}%"),
-                Template.template.ilike(f"%{search_term}%"),
-            )
-        )
+    query = apply_search(query, Template, search_term)
 
     return paginate(query, params)
 
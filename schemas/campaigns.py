@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, model_validator
+
+from models.utils.campaignStatus import CampaignStatus
+from models.utils.messageType import MessageType
+from schemas.messages import MessageSpec
+
+
+class CreateCampaign(MessageSpec):
+    messageType: MessageType
+    clientIds: list[uuid.UUID] | None = None
+    searchTerm: str | None = None
+    allClients: bool = False
+
+    @model_validator(mode="after")
+    def require_recipients(self):
+        if not self.clientIds and not self.searchTerm and not self.allClients:
+            raise ValueError("Provide clientIds, searchTerm or allClients")
+        return self
+
+
+class CampaignOutput(BaseModel):
+    id: uuid.UUID
+    status: CampaignStatus
+    messageType: MessageType
+    total: int
+    processed: int
+    failed: int
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -4,6 +4,7 @@ from typing import Optional
 from pydantic import BaseModel, field_validator, conint
 import uuid
 
+from models.utils.deliveryStatus import DeliveryStatus
 from models.utils.portalType import Portal
 from models.utils.respondType import Respond
 from schemas.common.types import ClientPhone, ClientEmail
@@ -13,10 +14,8 @@ RATING_TYPE = "rating"
 SURVEY_TYPE = "survey"
 
 
-class CreateMessage(BaseModel):
+class MessageSpec(BaseModel):
     message: str
-    phone: ClientPhone
-    email: ClientEmail | None = None
     service: uuid.UUID | None = None
     platform: Portal | None = None
     type: str = FEEDBACK_TYPE or RATING_TYPE or SURVEY_TYPE
@@ -25,6 +24,7 @@ class CreateMessage(BaseModel):
     feedbackQuestion: str | None = None
     surveyId: uuid.UUID | None = None
     template: uuid.UUID | None = None
+    sendAt: datetime | None = None
 
     @field_validator("service", mode="before")
     def empty_string_to_none(cls, v):
@@ -32,6 +32,20 @@ class CreateMessage(BaseModel):
             return None
         return v
 
+    @field_validator("sendAt")
+    def to_local_naive(cls, v):
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone().replace(tzinfo=None)
+        return v
+
+    def is_scheduled(self) -> bool:
+        return self.sendAt is not None and self.sendAt > datetime.now()
+
+
+class CreateMessage(MessageSpec):
+    phone: ClientPhone
+    email: ClientEmail | None = None
+
 
 class MessagesOutput(BaseModel):
     id: uuid.UUID
@@ -47,6 +61,14 @@ class MessagesOutput(BaseModel):
     feedback_response: Respond | None = None
     completed: bool | None = None
     completed_at: datetime | None = None
+    delivery_status: DeliveryStatus | None = None
+
+
+class MessagesCursorPage(BaseModel):
+    items: list[MessagesOutput]
+    size: int
+    next_cursor: str | None = None
+    total: int | None = None
 
 
 class SurveyResponse(BaseModel):
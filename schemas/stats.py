@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+from models.utils.messageType import MessageType
+from models.utils.portalType import Portal
+
+
+class StatsCounters(BaseModel):
+    sent: int = 0
+    clicked: int = 0
+    completed: int = 0
+
+
+class ChannelStats(StatsCounters):
+    channel: MessageType
+
+
+class PortalStats(StatsCounters):
+    portal: Portal | None = None
+
+
+class CompanyStatsOutput(StatsCounters):
+    by_channel: list[ChannelStats] = []
+    by_portal: list[PortalStats] = []
+
+
+TimeSeriesInterval = Literal["hour", "day", "week", "month"]
+
+
+class TimeSeriesPoint(StatsCounters):
+    bucket: datetime
+    click_rate: float = 0.0
+    conversion: float = 0.0
+
+
+class CompanyTimeSeriesOutput(BaseModel):
+    interval: TimeSeriesInterval
+    start: datetime
+    end: datetime
+    points: list[TimeSeriesPoint] = []
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Any
 
 
@@ -26,6 +26,53 @@ class SurveyOutput(BaseModel):
 class CreateSurveyOutput(BaseModel):
     id: uuid.UUID
 
+class SurveyAnswerOutput(BaseModel):
+    id: uuid.UUID
+    message_id: uuid.UUID
+    client_id: uuid.UUID | None = None
+    client_email: str | None = None
+    service_id: uuid.UUID | None = None
+    answered_at: datetime
+    answer: str | int | float
+
+class SurveyAnswerPage(BaseModel):
+    items: list[SurveyAnswerOutput]
+    size: int
+    next_cursor: str | None = None
+
+class SurveyAnalyticRecord(BaseModel):
+    type: str
+    label: str
+    required: bool
+    options: list[str] | None = None
+    average_rating: float | None = None
+    average_choice: dict[str, int] = Field(default_factory=dict)
+
+class SurveyAnalyticOutput(BaseModel):
+    records: list[SurveyAnalyticRecord]
+
+class RatingDistribution(BaseModel):
+    count: int
+    mean: float | None = None
+    std: float | None = None
+    median: float | None = None
+    p10: float | None = None
+    p90: float | None = None
+    nps: float | None = None
+    histogram: dict[str, int] = Field(default_factory=dict)
+
+class ChoiceDistribution(BaseModel):
+    count: int
+    counts: dict[str, int] = Field(default_factory=dict)
+    shares: dict[str, float] = Field(default_factory=dict)
+
+class CrossTab(BaseModel):
+    row_question: str
+    column_question: str
+    rows: list[str]
+    columns: list[str]
+    counts: list[list[int]]
+
 class SurveyAnalyticsData(BaseModel):
     survey_id: uuid.UUID
     name: str | None = None
@@ -34,4 +81,7 @@ class SurveyAnalyticsData(BaseModel):
     updated_at: datetime | None = None
     content: dict | None = None
     completed_times: int | None = None
-    users: dict | None = None
\ No newline at end of file
+    refreshed_at: datetime | None = None
+    stale: bool = False
+    distributions: dict[str, RatingDistribution | ChoiceDistribution] | None = None
+    cross_tab: CrossTab | None = None
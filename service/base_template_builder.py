@@ -3,13 +3,18 @@ import uuid
 
 
 
-def base_template_builder(company_id: str | uuid.UUID, client_id: str | uuid.UUID, tracking_id: str | uuid.UUID) -> str:
+def review_url_prefix(company_id: str | uuid.UUID) -> str:
     host = os.getenv("HOSTNAME")
 
-    review_url = (
-        f"{host}/invitations/review/"
-        f"{company_id}/{client_id}/{tracking_id}"
-    )
+    return f"{host}/invitations/review/{company_id}/"
+
+
+def build_review_url(company_id: str | uuid.UUID, client_id: str | uuid.UUID, tracking_id: str | uuid.UUID) -> str:
+    return f"{review_url_prefix(company_id)}{client_id}/{tracking_id}"
+
+
+def base_template_builder(company_id: str | uuid.UUID, client_id: str | uuid.UUID, tracking_id: str | uuid.UUID) -> str:
+    review_url = build_review_url(company_id, client_id, tracking_id)
 
     return f"""
     <!DOCTYPE html>
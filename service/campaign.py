@@ -0,0 +1,194 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Campaign, Client, Company, EmailOutbox, Message, MessageTracking, Service, Survey, Template
+from models.utils.campaignStatus import CampaignStatus
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from schemas.campaigns import CreateCampaign
+from schemas.messages import MessageSpec
+from service.outbox import outbox_row
+from service.review_snapshot import build_review_snapshot
+from service.search import apply_search
+from service.stats import record_stats
+from service.sms import OutgoingSms, sms_body, sms_dispatcher
+from service.template_renderer import render_many
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_CHUNK_SIZE = 1000
+
+
+def chunked(items: Sequence, size: int = CAMPAIGN_CHUNK_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def message_spec_columns(spec: MessageSpec) -> dict:
+    columns = {
+        "message": spec.message,
+        "service_id": spec.service,
+        "template_id": spec.template,
+        "portal": spec.platform,
+    }
+    if spec.isRedirect:
+        columns["is_redirect"] = True
+    if spec.type == "feedback":
+        columns["is_feedback"] = True
+        columns["feedback_question"] = spec.feedbackQuestion
+    elif spec.type == "rating":
+        columns["is_rating"] = True
+        columns["rating_question"] = spec.ratingQuestion
+    elif spec.type == "survey":
+        columns["is_survey"] = True
+        columns["survey_id"] = spec.surveyId
+    return columns
+
+
+def resolve_campaign_clients(db: Session, company_id: uuid.UUID, request: CreateCampaign) -> list[uuid.UUID]:
+    query = select(Client.id).where(Client.company_id == company_id)
+
+    query = apply_search(query, Client, request.searchTerm)
+
+    if not request.clientIds:
+        return list(db.scalars(query))
+
+    client_ids = []
+    for chunk in chunked(list(dict.fromkeys(request.clientIds))):
+        client_ids.extend(db.scalars(query.where(Client.id.in_(chunk))))
+    return client_ids
+
+
+def create_campaign_messages(db: Session, campaign: Campaign, spec: MessageSpec, client_ids: Sequence[uuid.UUID]) -> list[uuid.UUID]:
+    send_at = spec.sendAt if spec.is_scheduled() else datetime.now()
+    delivery_status = DeliveryStatus.scheduled if spec.is_scheduled() else DeliveryStatus.queued
+    columns = message_spec_columns(spec)
+    columns["review_snapshot"] = build_review_snapshot(
+        columns.get("is_redirect"),
+        columns.get("portal"),
+        columns.get("is_feedback"),
+        columns.get("feedback_question"),
+        columns.get("is_survey"),
+        columns.get("is_rating"),
+        columns.get("rating_question"),
+        db.get(Company, campaign.company_id),
+        db.get(Service, spec.service) if spec.service else None,
+        db.get(Survey, spec.surveyId) if columns.get("is_survey") and spec.surveyId else None,
+    )
+
+    message_ids = []
+    for chunk in chunked(client_ids):
+        ids, tracking_ids = [uuid.uuid4() for _ in chunk], [uuid.uuid4() for _ in chunk]
+        message_ids.extend(ids)
+        db.execute(
+            insert(Message),
+            [
+                dict(
+                    columns,
+                    id=message_id,
+                    tracking_id=tracking_id,
+                    send_at=send_at,
+                    messageType=campaign.messageType,
+                    delivery_status=delivery_status,
+                    client_id=client_id,
+                    company_id=campaign.company_id,
+                    campaign_id=campaign.id,
+                )
+                for message_id, tracking_id, client_id in zip(ids, tracking_ids, chunk)
+            ],
+        )
+        db.execute(insert(MessageTracking), [
+            dict(tracking_id=tracking_id, message_id=message_id, send_at=send_at)
+            for message_id, tracking_id in zip(ids, tracking_ids)
+        ])
+    record_stats(db, campaign.company_id, campaign.messageType, columns.get("portal"), send_at, sent=len(client_ids))
+    return message_ids
+
+
+def deliver_campaign(campaign_id: uuid.UUID) -> None:
+    db = SessionLocal()
+    try:
+        campaign = db.get(Campaign, campaign_id)
+        if campaign is None:
+            return
+        company = db.get(Company, campaign.company_id)
+        template = db.get(Template, campaign.template_id) if campaign.template_id else None
+        service_name = db.scalar(
+            select(Service.name)
+            .join(Message, Message.service_id == Service.id)
+            .where(Message.campaign_id == campaign_id)
+            .limit(1)
+        )
+
+        campaign.status = CampaignStatus.sending
+        db.commit()
+
+        query = (
+            select(
+                Message.id, Message.message, Message.tracking_id, Message.client_id,
+                Client.name, Client.surname, Client.email, Client.phone,
+            )
+            .join(Client, Client.id == Message.client_id)
+            .where(Message.campaign_id == campaign_id)
+            .order_by(Message.id)
+            .limit(CAMPAIGN_CHUNK_SIZE)
+        )
+        last_id = None
+        while True:
+            page = query.where(Message.id > last_id) if last_id is not None else query
+            recipients = db.execute(page).all()
+            if not recipients:
+                break
+
+            if campaign.messageType == MessageType.SMS:
+                deliverable = [recipient for recipient in recipients if recipient.phone]
+            else:
+                deliverable = [recipient for recipient in recipients if recipient.email] if template is not None else []
+            delivered_ids = {recipient.id for recipient in deliverable}
+            undeliverable = [recipient.id for recipient in recipients if recipient.id not in delivered_ids]
+            if undeliverable:
+                db.execute(
+                    update(Message)
+                    .where(Message.id.in_(undeliverable))
+                    .values(delivery_status=DeliveryStatus.failed, delivery_error="Missing template or recipient address")
+                    .execution_options(synchronize_session=False)
+                )
+
+            sms = []
+            if campaign.messageType == MessageType.SMS:
+                sms = [
+                    OutgoingSms(r.id, r.phone, sms_body(r.message, campaign.company_id, r.client_id, r.tracking_id))
+                    for r in deliverable
+                ]
+            elif deliverable:
+                db.execute(insert(EmailOutbox), [
+                    outbox_row([recipient.email], body, message_id=recipient.id, company_id=company.id)
+                    for recipient, body in render_many(template, deliverable, company.id, company.name, service_name)
+                ])
+
+            campaign.processed += len(recipients)
+            campaign.failed += len(undeliverable)
+            db.commit()
+            sms_dispatcher.submit(sms)
+            last_id = recipients[-1].id
+
+        campaign.status = CampaignStatus.completed
+        campaign.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception:
+        logger.exception("Campaign %s: delivery aborted", campaign_id)
+        db.rollback()
+        campaign = db.get(Campaign, campaign_id)
+        if campaign is not None:
+            campaign.status = CampaignStatus.failed
+            campaign.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
+
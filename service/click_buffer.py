@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from collections import Counter, defaultdict
+
+from sqlalchemy import bindparam, or_, select, update
+
+from config import CLICK_FLUSH_INTERVAL, CLICK_FLUSH_SIZE
+from database import SessionLocal
+from models import Message
+from service.stats import event_key, record_stats_many
+
+logger = logging.getLogger(__name__)
+
+messages_table = Message.__table__
+
+UNCLICKED = (
+    messages_table.c.clicked_at.is_(None),
+    or_(messages_table.c.completed.is_(None), messages_table.c.completed.is_(False)),
+)
+
+CLICK_UPDATE = (
+    update(messages_table)
+    .where(messages_table.c.id == bindparam("message_id"), *UNCLICKED)
+    .values(clicked_at=bindparam("clicked_at"))
+)
+
+
+class ClickBuffer:
+    """
+    Collects link opens in memory and writes them in one executemany UPDATE
+    every `flush_interval` seconds or once `max_events` clicks are waiting.
+    """
+
+    def __init__(self, flush_interval: float = CLICK_FLUSH_INTERVAL, max_events: int = CLICK_FLUSH_SIZE, session_factory=SessionLocal):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.session_factory = session_factory
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._flushes = 0
+        self._flushed_events = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    def record(self, message_id: uuid.UUID, clicked_at: datetime | None = None) -> None:
+        with self._lock:
+            self._pending.setdefault(message_id, clicked_at or datetime.now())
+            full = len(self._pending) >= self.max_events
+        if full:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="click-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Click buffer flush failed")
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                # Lock the rows that are still unclicked so a first click is counted exactly once,
+                # even if another node flushes a click for the same message concurrently.
+                first_clicks = db.execute(
+                    select(messages_table.c.id, messages_table.c.company_id, messages_table.c.messageType, messages_table.c.portal)
+                    .where(messages_table.c.id.in_(list(batch)), *UNCLICKED)
+                    .order_by(messages_table.c.id)
+                    .with_for_update()
+                ).all()
+                if first_clicks:
+                    db.execute(CLICK_UPDATE, [{"message_id": row.id, "clicked_at": batch[row.id]} for row in first_clicks])
+                    deltas = defaultdict(Counter)
+                    for row in first_clicks:
+                        if row.company_id is not None:
+                            deltas[event_key(row.company_id, row.messageType, row.portal, batch[row.id])]["clicked"] += 1
+                    record_stats_many(db, deltas)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    for message_id, clicked_at in batch.items():
+                        self._pending.setdefault(message_id, clicked_at)
+                raise
+            finally:
+                db.close()
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._flushes += 1
+                self._flushed_events += len(batch)
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            return len(batch)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "depth": len(self._pending),
+                "flushes": self._flushes,
+                "flushed_events": self._flushed_events,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "max_flush_ms": round(self._max_flush_ms, 3),
+            }
+
+
+click_buffer = ClickBuffer()
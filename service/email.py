@@ -1,17 +1,217 @@
-from typing import List
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import List, Protocol
 
 import resend
 import os
 
+from config import EMAIL_PROVIDER, EMAIL_BATCH_SIZE, EMAIL_SENDER_RATE, EMAIL_SENDER_BURST, EMAIL_COMPANY_RATE, \
+    EMAIL_COMPANY_BURST
+from utils.rate_limit import RateLimiter
+
 resend.api_key = os.getenv('RESEND_API_KEY')
 
-def send_email(from_mail: str, to_mail: List[str], subject: str, body: str):
-    params: resend.Emails.SendParams = {
+DEFAULT_SENDER = "Acme <onboarding@resend.dev>"
+DEFAULT_SUBJECT = "test"
+
+
+class ProviderThrottled(Exception):
+    pass
+
+
+class EmailProvider(Protocol):
+    def send(self, from_mail: str, to_mail: List[str], subject: str, body: str) -> dict: ...
+
+    def send_batch(self, emails: List[dict]) -> List[dict]: ...
+
+
+def _params(from_mail: str, to_mail: List[str], subject: str, body: str) -> dict:
+    return {
       "from": from_mail,
       "to": to_mail,
       "subject": subject,
       "html": body
     }
 
-    email = resend.Emails.send(params)
-    return email
\ No newline at end of file
+
+class ResendProvider:
+    def send(self, from_mail: str, to_mail: List[str], subject: str, body: str) -> dict:
+        params: resend.Emails.SendParams = _params(from_mail, to_mail, subject, body)
+        return resend.Emails.send(params)
+
+    def send_batch(self, emails: List[dict]) -> List[dict]:
+        try:
+            return resend.Batch.send(emails)
+        except resend.exceptions.ResendError as exc:
+            if getattr(exc, "code", None) == 429:
+                raise ProviderThrottled(str(exc)) from exc
+            raise
+
+
+class FakeEmailProvider:
+    """In-memory provider for local runs and offline throughput measurements."""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, max_calls_per_second: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_calls_per_second = max_calls_per_second
+        self.sent: list[dict] = []
+        self.calls = 0
+        self.throttled = 0
+        self._window_start = time.monotonic()
+        self._window_calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            if self.max_calls_per_second:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_calls = 0
+                self._window_calls += 1
+                if self._window_calls > self.max_calls_per_second:
+                    self.throttled += 1
+                    raise ProviderThrottled("Fake provider rate limit exceeded")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Fake provider failure")
+
+    def _record(self, params: dict) -> dict:
+        with self._lock:
+            email = {"id": f"fake-{len(self.sent)}", "from": params["from"], "to": params["to"], "subject": params["subject"]}
+            self.sent.append(email)
+        return email
+
+    def send(self, from_mail: str, to_mail: List[str], subject: str, body: str) -> dict:
+        self._call()
+        return self._record(_params(from_mail, to_mail, subject, body))
+
+    def send_batch(self, emails: List[dict]) -> List[dict]:
+        self._call()
+        return [self._record(params) for params in emails]
+
+
+_provider: EmailProvider | None = None
+
+
+def get_email_provider() -> EmailProvider:
+    global _provider
+    if _provider is None:
+        _provider = FakeEmailProvider() if EMAIL_PROVIDER == "fake" else ResendProvider()
+    return _provider
+
+
+def set_email_provider(provider: EmailProvider) -> None:
+    global _provider
+    _provider = provider
+
+
+def send_email(from_mail: str, to_mail: List[str], subject: str, body: str):
+    return get_email_provider().send(from_mail, to_mail, subject, body)
+
+
+@dataclass
+class OutgoingEmail:
+    id: uuid.UUID
+    sender: str
+    recipients: List[str]
+    subject: str
+    body: str
+    company_id: uuid.UUID | None = None
+
+
+@dataclass
+class DispatchResult:
+    sent: list[uuid.UUID] = field(default_factory=list)
+    throttled: list[uuid.UUID] = field(default_factory=list)
+    failed: dict[uuid.UUID, str] = field(default_factory=dict)
+
+
+class EmailDispatcher:
+    """Groups outgoing emails into provider batch calls, limited per sender and per company."""
+
+    def __init__(
+            self,
+            provider: EmailProvider | None = None,
+            batch_size: int = EMAIL_BATCH_SIZE,
+            sender_limiter: RateLimiter | None = None,
+            company_limiter: RateLimiter | None = None,
+    ):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.sender_limiter = sender_limiter or RateLimiter(EMAIL_SENDER_RATE, EMAIL_SENDER_BURST)
+        self.company_limiter = company_limiter or RateLimiter(EMAIL_COMPANY_RATE, EMAIL_COMPANY_BURST)
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return {key: self._counters[key] for key in ("queued", "sent", "throttled", "failed", "batches")}
+
+    def _count(self, **amounts: int) -> None:
+        with self._lock:
+            self._counters.update(amounts)
+
+    def _admit(self, sender: str, company_id: uuid.UUID | None, amount: int) -> int:
+        granted = self.sender_limiter.take(sender, amount)
+        if company_id is not None and granted:
+            company_granted = self.company_limiter.take(company_id, granted)
+            self.sender_limiter.refund(sender, granted - company_granted)
+            granted = company_granted
+        return granted
+
+    def _batches(self, emails: List[OutgoingEmail], result: DispatchResult) -> list[list[OutgoingEmail]]:
+        groups: dict[tuple, list[OutgoingEmail]] = defaultdict(list)
+        for email in emails:
+            groups[(email.sender, email.company_id)].append(email)
+
+        batches = []
+        for (sender, company_id), group in groups.items():
+            granted = self._admit(sender, company_id, len(group))
+            result.throttled.extend(email.id for email in group[granted:])
+            admitted = group[:granted]
+            batches.extend(admitted[i:i + self.batch_size] for i in range(0, len(admitted), self.batch_size))
+        return batches
+
+    def _send_batch(self, batch: list[OutgoingEmail]) -> tuple[list[OutgoingEmail], str | None, bool]:
+        provider = self.provider or get_email_provider()
+        try:
+            provider.send_batch([_params(e.sender, e.recipients, e.subject, e.body) for e in batch])
+            return batch, None, False
+        except ProviderThrottled as exc:
+            return batch, str(exc), True
+        except Exception as exc:
+            return batch, str(exc) or exc.__class__.__name__, False
+
+    def dispatch(self, emails: List[OutgoingEmail], executor: Executor | None = None) -> DispatchResult:
+        result = DispatchResult()
+        self._count(queued=len(emails))
+
+        batches = self._batches(emails, result)
+        outcomes = executor.map(self._send_batch, batches) if executor else map(self._send_batch, batches)
+        for batch, error, throttled in outcomes:
+            if error is None:
+                result.sent.extend(email.id for email in batch)
+            elif throttled:
+                result.throttled.extend(email.id for email in batch)
+            else:
+                result.failed.update((email.id, error) for email in batch)
+
+        self._count(
+            sent=len(result.sent),
+            throttled=len(result.throttled),
+            failed=len(result.failed),
+            batches=len(batches),
+        )
+        return result
+
+
+email_dispatcher = EmailDispatcher()
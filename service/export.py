@@ -0,0 +1,130 @@
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import select
+
+from config import EXPORT_BATCH_SIZE
+from database import SessionLocal
+from models import Client, Message
+from models.utils.messageType import MessageType
+
+EXPORT_COLUMNS = (
+    Message.id,
+    Message.tracking_id,
+    Message.client_id,
+    Client.name.label("client_name"),
+    Client.surname.label("client_surname"),
+    Client.email.label("client_email"),
+    Client.phone.label("client_phone"),
+    Message.messageType,
+    Message.message,
+    Message.send_at,
+    Message.delivery_status,
+    Message.delivered_at,
+    Message.clicked_at,
+    Message.portal,
+    Message.completed,
+    Message.completed_at,
+    Message.is_feedback,
+    Message.feedback_question,
+    Message.feedback_response,
+    Message.feedback_content,
+    Message.is_rating,
+    Message.rating_question,
+    Message.rating,
+    Message.rating_feedback,
+    Message.is_survey,
+    Message.survey_id,
+    Message.survey_result,
+    Message.campaign_id,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+REVIEW_TYPE_COLUMNS = {
+    "feedback": Message.is_feedback,
+    "rating": Message.is_rating,
+    "survey": Message.is_survey,
+}
+
+
+def export_query(
+        company_id: uuid.UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        message_type: MessageType | None = None,
+        review_type: str | None = None,
+        client_id: uuid.UUID | None = None,
+):
+    query = (
+        select(*EXPORT_COLUMNS)
+        .join(Client, Client.id == Message.client_id)
+        .where(Message.company_id == company_id)
+        .order_by(Message.send_at, Message.id)
+    )
+    if start is not None:
+        query = query.where(Message.send_at >= start)
+    if end is not None:
+        query = query.where(Message.send_at < end)
+    if message_type is not None:
+        query = query.where(Message.messageType == message_type)
+    if review_type is not None:
+        query = query.where(REVIEW_TYPE_COLUMNS[review_type].is_(True))
+    if client_id is not None:
+        query = query.where(Message.client_id == client_id)
+    return query
+
+
+def export_batches(query, batch_size: int = EXPORT_BATCH_SIZE, session_factory=SessionLocal) -> Iterator[list]:
+    """
+    Stream plain rows through a server-side cursor, `batch_size` at a time.
+    Selecting columns rather than entities keeps rows out of the identity map,
+    so memory stays flat however many rows are exported. The session is owned
+    by the generator because the response body outlives the request's session.
+    """
+    db = session_factory()
+    try:
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def to_ndjson(batches: Iterator[list]) -> Iterator[str]:
+    for batch in batches:
+        yield "".join(
+            json.dumps({field: _plain(value) for field, value in zip(EXPORT_FIELDS, row)}, ensure_ascii=False, default=str) + "\n"
+            for row in batch
+        )
+
+
+def to_csv(batches: Iterator[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([
+                json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else _plain(value)
+                for value in row
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,208 @@
+import logging
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from config import OUTBOX_WORKERS, OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_MAX_ATTEMPTS, OUTBOX_BACKOFF_SECONDS
+from database import SessionLocal
+from models.message import Message
+from models.outbox import EmailOutbox
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.outboxStatus import OutboxStatus
+from service.email import DEFAULT_SENDER, DEFAULT_SUBJECT, EmailDispatcher, OutgoingEmail, email_dispatcher
+
+logger = logging.getLogger(__name__)
+
+# A row left in `sending` longer than this belongs to a worker that died mid-batch.
+OUTBOX_LEASE = timedelta(minutes=5)
+OUTBOX_THROTTLE_DELAY = timedelta(seconds=1)
+
+
+def enqueue_email(
+        db: Session,
+        to_mail: List[str],
+        body: str,
+        message_id: uuid.UUID | None = None,
+        company_id: uuid.UUID | None = None,
+        subject: str = DEFAULT_SUBJECT,
+        from_mail: str = DEFAULT_SENDER,
+) -> EmailOutbox:
+    entry = EmailOutbox(
+        id=uuid.uuid4(),
+        sender=from_mail,
+        recipients=to_mail,
+        subject=subject,
+        body=body,
+        status=OutboxStatus.pending,
+        attempts=0,
+        next_attempt_at=datetime.now(),
+        message_id=message_id,
+        company_id=company_id,
+    )
+    db.add(entry)
+    return entry
+
+
+def outbox_row(
+        to_mail: List[str],
+        body: str,
+        message_id: uuid.UUID | None = None,
+        company_id: uuid.UUID | None = None,
+        subject: str = DEFAULT_SUBJECT,
+        from_mail: str = DEFAULT_SENDER,
+) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "sender": from_mail,
+        "recipients": to_mail,
+        "subject": subject,
+        "body": body,
+        "status": OutboxStatus.pending,
+        "attempts": 0,
+        "next_attempt_at": datetime.now(),
+        "message_id": message_id,
+        "company_id": company_id,
+    }
+
+
+def backoff_delay(attempts: int, base: float = OUTBOX_BACKOFF_SECONDS) -> timedelta:
+    return timedelta(seconds=base * 2 ** (attempts - 1) * random.uniform(0.8, 1.2))
+
+
+class OutboxWorker:
+    def __init__(
+            self,
+            dispatcher: EmailDispatcher | None = None,
+            workers: int = OUTBOX_WORKERS,
+            batch_size: int = OUTBOX_BATCH_SIZE,
+            poll_interval: float = OUTBOX_POLL_INTERVAL,
+            max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+            session_factory=SessionLocal,
+    ):
+        self.dispatcher = dispatcher or email_dispatcher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox")
+        self._thread = threading.Thread(target=self._run, name="outbox-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                drained = self.drain_once()
+            except Exception:
+                logger.exception("Outbox drain failed")
+                drained = 0
+            if drained < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def drain_once(self) -> int:
+        db = self.session_factory()
+        try:
+            batch = self._claim(db)
+            if not batch:
+                return 0
+            attempts_by_id = {entry["id"]: entry.pop("attempts") for entry in batch}
+            message_ids = {entry["id"]: entry.pop("message_id") for entry in batch}
+            result = self.dispatcher.dispatch([OutgoingEmail(**entry) for entry in batch], executor=self._executor)
+
+            now = datetime.now()
+            if result.sent:
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(result.sent))
+                    .values(status=OutboxStatus.sent, sent_at=now, locked_at=None, last_error=None)
+                )
+                self._record_delivery(db, [message_ids[entry_id] for entry_id in result.sent], DeliveryStatus.sent, now)
+            if result.throttled:
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(result.throttled))
+                    .values(status=OutboxStatus.pending, locked_at=None, next_attempt_at=now + OUTBOX_THROTTLE_DELAY)
+                )
+            for entry_id, error in result.failed.items():
+                attempts = attempts_by_id[entry_id] + 1
+                values = {"attempts": attempts, "last_error": error[:1000], "locked_at": None}
+                if attempts >= self.max_attempts:
+                    values["status"] = OutboxStatus.dead
+                    logger.error("Outbox entry %s moved to dead letter: %s", entry_id, error)
+                    self._record_delivery(db, [message_ids[entry_id]], DeliveryStatus.failed, now, error)
+                else:
+                    values["status"] = OutboxStatus.pending
+                    values["next_attempt_at"] = now + backoff_delay(attempts)
+                db.execute(update(EmailOutbox).where(EmailOutbox.id == entry_id).values(**values))
+
+            db.commit()
+            return len(batch)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _record_delivery(db: Session, message_ids: list, delivery_status: DeliveryStatus, now: datetime, error: str | None = None) -> None:
+        message_ids = [message_id for message_id in message_ids if message_id is not None]
+        if not message_ids:
+            return
+        values = {"delivery_status": delivery_status, "delivery_error": error[:1000] if error else None}
+        if delivery_status == DeliveryStatus.sent:
+            values["delivered_at"] = now
+        db.execute(
+            update(Message)
+            .where(Message.id.in_(message_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _claim(self, db: Session) -> list[dict]:
+        now = datetime.now()
+        rows = db.execute(
+            select(
+                EmailOutbox.id, EmailOutbox.sender, EmailOutbox.recipients, EmailOutbox.subject,
+                EmailOutbox.body, EmailOutbox.company_id, EmailOutbox.message_id, EmailOutbox.attempts,
+            )
+            .where(
+                or_(
+                    and_(EmailOutbox.status == OutboxStatus.pending, EmailOutbox.next_attempt_at <= now),
+                    and_(EmailOutbox.status == OutboxStatus.sending, EmailOutbox.locked_at < now - OUTBOX_LEASE),
+                )
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).mappings().all()
+        if rows:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([row["id"] for row in rows]))
+                .values(status=OutboxStatus.sending, locked_at=now)
+            )
+        db.commit()
+        return [dict(row) for row in rows]
+
+
+outbox_worker = OutboxWorker()
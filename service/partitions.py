@@ -0,0 +1,169 @@
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config import PARTITION_MONTHS_AHEAD, PARTITION_RETENTION_MONTHS, PARTITION_ARCHIVE_DIR
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT = "messages"
+DEFAULT_PARTITION = "messages_default"
+PARTITION_NAME = re.compile(r"^messages_p(\d{4})_(\d{2})$")
+
+
+def month_start(at: datetime) -> datetime:
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def _is_partitioned(connection) -> bool:
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+        {"name": PARENT},
+    ).scalar()
+
+
+def create_partition(connection, month: datetime) -> bool:
+    """
+    Create the partition for `month`. Rows that already landed in the default
+    partition for that month are moved into it before it is attached, since
+    PostgreSQL refuses to attach a range the default partition still holds.
+    """
+    name = partition_name(month)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    bounds = {"lower": month, "upper": add_months(month, 1)}
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    connection.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE send_at >= :lower AND send_at < :upper"),
+        bounds,
+    )
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE send_at >= :lower AND send_at < :upper"), bounds)
+    connection.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['lower']:%Y-%m-%d}') TO ('{bounds['upper']:%Y-%m-%d}')"
+    ))
+    return True
+
+
+def ensure_partitions(bind: Engine = engine, months_ahead: int = PARTITION_MONTHS_AHEAD) -> list[str]:
+    """Make sure the current month and the next `months_ahead` months have partitions."""
+    if bind.dialect.name != "postgresql":
+        return []
+    created = []
+    with bind.begin() as connection:
+        if not _is_partitioned(connection):
+            return []
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+    current = month_start(datetime.now())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        with bind.begin() as connection:
+            if create_partition(connection, month):
+                created.append(partition_name(month))
+    if created:
+        logger.info("Created message partitions %s", ", ".join(created))
+    return created
+
+
+def list_partitions(connection) -> list[tuple[str, datetime]]:
+    names = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:name)"
+    ), {"name": PARENT}).scalars()
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _copy_out(cursor, statement: str, file) -> None:
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(statement, file)
+        return
+    with cursor.copy(statement) as copy:
+        for data in copy:
+            file.write(bytes(data))
+
+
+def archive_partition(bind: Engine, name: str, directory: str) -> str:
+    """Detach one partition, dump it to a gzip-compressed CSV file and drop it along with its tracking rows."""
+    with bind.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    raw = bind.raw_connection()
+    try:
+        with gzip.open(partial, "wb") as file:
+            _copy_out(raw.cursor(), f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", file)
+        raw.commit()
+    finally:
+        raw.close()
+    with open(partial, "rb") as file:
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+
+    match = PARTITION_NAME.match(name)
+    month = datetime(int(match.group(1)), int(match.group(2)), 1)
+    with bind.begin() as connection:
+        connection.execute(text(f"DROP TABLE {name}"))
+        connection.execute(
+            text("DELETE FROM message_tracking WHERE send_at >= :lower AND send_at < :upper"),
+            {"lower": month, "upper": add_months(month, 1)},
+        )
+    return path
+
+
+def archive_partitions(
+        bind: Engine = engine,
+        retention_months: int = PARTITION_RETENTION_MONTHS,
+        directory: str = PARTITION_ARCHIVE_DIR,
+) -> list[str]:
+    """Archive every monthly partition that ends before the retention window."""
+    if bind.dialect.name != "postgresql":
+        return []
+    cutoff = add_months(month_start(datetime.now()), -retention_months)
+    with bind.connect() as connection:
+        expired = [name for name, month in list_partitions(connection) if add_months(month, 1) <= cutoff]
+    archived = []
+    for name in expired:
+        archived.append(archive_partition(bind, name, directory))
+        logger.info("Archived message partition %s to %s", name, archived[-1])
+    return archived
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions of the messages table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create partitions for the coming months")
+    ensure.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="detach, dump and drop partitions older than the retention window")
+    archive.add_argument("--retention-months", type=int, default=PARTITION_RETENTION_MONTHS)
+    archive.add_argument("--dir", default=PARTITION_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "ensure":
+        print("\n".join(ensure_partitions(months_ahead=args.months_ahead)) or "Nothing to create")
+    else:
+        print("\n".join(archive_partitions(retention_months=args.retention_months, directory=args.dir)) or "Nothing to archive")
@@ -0,0 +1,107 @@
+import uuid
+
+from sqlalchemy import null, select, update
+from sqlalchemy.orm import Session
+
+from models import Company, Message, Service, Survey
+from schemas.messages import ReviewResponse
+from utils.batch_loader import loader
+
+# Snapshots record the snapshot_version of the company, service and survey
+# they were built from; a snapshot whose versions no longer match is rebuilt
+# on read, so editing one of them is a single-row UPDATE rather than a
+# rewrite of every message that references it.
+SNAPSHOT_VERSIONS = "versions"
+
+
+def build_review_snapshot(
+        is_redirect: bool | None,
+        portal,
+        is_feedback: bool | None,
+        feedback_question: str | None,
+        is_survey: bool | None,
+        is_rating: bool | None,
+        rating_question: str | None,
+        company: Company,
+        service: Service | None = None,
+        survey: Survey | None = None,
+) -> dict:
+    review_link = getattr(company, portal.value, None) if portal else None
+
+    review = ReviewResponse(
+        service_name=service.name if service else None,
+        service_id=service.id if service else None,
+        company_logo=company.logo_url
+    )
+    if is_redirect:
+        review.is_redirect = True
+        review.portal = review_link if review_link else None
+    if is_feedback:
+        review.is_feedback = True
+        review.feedback_question = feedback_question
+    elif is_survey:
+        review.is_survey = True
+        review.survey = survey
+    elif is_rating:
+        review.is_rating = True
+        review.rating_question = rating_question
+
+    snapshot = review.model_dump(mode="json")
+    snapshot[SNAPSHOT_VERSIONS] = [
+        company.snapshot_version or 0,
+        (service.snapshot_version or 0) if service else None,
+        (survey.snapshot_version or 0) if survey else None,
+    ]
+    return snapshot
+
+
+def message_review_snapshot(db: Session, message: Message, company: Company | None = None) -> dict:
+    company = company or loader(db, Company).load(message.company_id)
+    service = message.service or loader(db, Service).load(message.service_id)
+    survey = loader(db, Survey).load(message.survey_id) if message.is_survey else None
+    return build_review_snapshot(
+        message.is_redirect,
+        message.portal,
+        message.is_feedback,
+        message.feedback_question,
+        message.is_survey,
+        message.is_rating,
+        message.rating_question,
+        company,
+        service,
+        survey,
+    )
+
+
+def snapshot_is_current(db: Session, message: Message) -> bool:
+    """One primary-key lookup per referenced row, read in a single round trip."""
+    if message.review_snapshot is None:
+        return False
+    versions = db.execute(select(
+        select(Company.snapshot_version).where(Company.id == message.company_id).scalar_subquery(),
+        select(Service.snapshot_version).where(Service.id == message.service_id).scalar_subquery(),
+        select(Survey.snapshot_version).where(Survey.id == message.survey_id).scalar_subquery()
+        if message.is_survey else null(),
+    )).one()
+    return message.review_snapshot.get(SNAPSHOT_VERSIONS) == list(versions)
+
+
+def _invalidate(db: Session, model, entity_id: uuid.UUID) -> None:
+    db.execute(
+        update(model)
+        .where(model.id == entity_id)
+        .values(snapshot_version=model.snapshot_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def invalidate_company_snapshots(db: Session, company_id: uuid.UUID) -> None:
+    _invalidate(db, Company, company_id)
+
+
+def invalidate_service_snapshots(db: Session, service_id: uuid.UUID) -> None:
+    _invalidate(db, Service, service_id)
+
+
+def invalidate_survey_snapshots(db: Session, survey_id: uuid.UUID) -> None:
+    _invalidate(db, Survey, survey_id)
@@ -0,0 +1,226 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from config import SCHEDULER_TICK, SCHEDULER_LOOKAHEAD, SCHEDULER_LOAD_INTERVAL, SCHEDULER_BATCH_SIZE
+from database import SessionLocal
+from models import Campaign, Client, Company, EmailOutbox, Message, Service, Template
+from models.utils.campaignStatus import CampaignStatus
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from service.outbox import outbox_row
+from service.sms import OutgoingSms, sms_body, sms_dispatcher
+from service.template_renderer import render_many
+from utils.batch_loader import loader
+from utils.timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+
+def _update_campaigns(db: Session, processed: Counter, failed: Counter) -> None:
+    for campaign_id, count in processed.items():
+        db.execute(
+            update(Campaign)
+            .where(Campaign.id == campaign_id)
+            .values(processed=Campaign.processed + count, failed=Campaign.failed + failed[campaign_id])
+        )
+    if processed:
+        db.execute(
+            update(Campaign)
+            .where(Campaign.id.in_(list(processed)), Campaign.processed >= Campaign.total)
+            .values(status=CampaignStatus.completed, finished_at=datetime.now())
+        )
+
+
+def dispatch_scheduled_messages(db: Session, message_ids: Sequence[uuid.UUID]) -> list[tuple[uuid.UUID, datetime]]:
+    """
+    Claim due messages and hand them to their delivery pipeline. The claim is a
+    conditional UPDATE, so when several workers race for the same message only
+    one of them gets it back.
+    """
+    claimed = db.execute(
+        update(Message)
+        .where(Message.id.in_(message_ids), Message.delivery_status == DeliveryStatus.scheduled)
+        .values(delivery_status=DeliveryStatus.queued)
+        .returning(Message.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not claimed:
+        db.commit()
+        return []
+
+    rows = db.execute(
+        select(
+            Message.id, Message.message, Message.messageType, Message.tracking_id, Message.send_at,
+            Message.client_id, Message.company_id, Message.template_id, Message.service_id, Message.campaign_id,
+            Client.name, Client.surname, Client.email, Client.phone,
+        )
+        .join(Client, Client.id == Message.client_id)
+        .where(Message.id.in_(claimed))
+    ).all()
+
+    emails = defaultdict(list)
+    sms, failed_ids = [], set()
+    for row in rows:
+        if row.messageType == MessageType.SMS:
+            sms.append(OutgoingSms(row.id, row.phone, sms_body(row.message, row.company_id, row.client_id, row.tracking_id)))
+        elif row.template_id and row.email:
+            emails[(row.company_id, row.template_id, row.service_id)].append(row)
+        else:
+            failed_ids.add(row.id)
+
+    companies = loader(db, Company).prime(key[0] for key in emails)
+    templates = loader(db, Template).prime(key[1] for key in emails)
+    services = loader(db, Service).prime(key[2] for key in emails)
+    outbox = []
+    for (company_id, template_id, service_id), recipients in emails.items():
+        company = companies.load(company_id)
+        template = templates.load(template_id)
+        service = services.load(service_id)
+        if company is None or template is None:
+            failed_ids.update(recipient.id for recipient in recipients)
+            continue
+        outbox.extend(
+            outbox_row([recipient.email], body, message_id=recipient.id, company_id=company_id)
+            for recipient, body in render_many(template, recipients, company_id, company.name, service.name if service else None)
+        )
+    if outbox:
+        db.execute(insert(EmailOutbox), outbox)
+    if failed_ids:
+        db.execute(
+            update(Message)
+            .where(Message.id.in_(failed_ids))
+            .values(delivery_status=DeliveryStatus.failed, delivery_error="Missing template or recipient address")
+            .execution_options(synchronize_session=False)
+        )
+
+    _update_campaigns(
+        db,
+        Counter(row.campaign_id for row in rows if row.campaign_id),
+        Counter(row.campaign_id for row in rows if row.campaign_id and row.id in failed_ids),
+    )
+    db.commit()
+    sms_dispatcher.submit(sms)
+    return [(row.id, row.send_at) for row in rows]
+
+
+class MessageScheduler:
+    """
+    Keeps messages due within `lookahead` seconds in an in-memory timing wheel.
+    The table is only queried every `load_interval` seconds, through the
+    partial index on scheduled send_at, instead of being polled every tick.
+    """
+
+    def __init__(
+            self,
+            tick: float = SCHEDULER_TICK,
+            lookahead: float = SCHEDULER_LOOKAHEAD,
+            load_interval: float = SCHEDULER_LOAD_INTERVAL,
+            batch_size: int = SCHEDULER_BATCH_SIZE,
+            session_factory=SessionLocal,
+    ):
+        self.tick = tick
+        self.lookahead = lookahead
+        self.load_interval = load_interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.wheel = TimingWheel(tick, max(1, math.ceil(lookahead / tick)) + 1)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._dispatched = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="message-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def schedule(self, message_id: uuid.UUID, send_at: datetime) -> None:
+        self.schedule_many([message_id], send_at)
+
+    def schedule_many(self, message_ids: Sequence[uuid.UUID], send_at: datetime) -> None:
+        """Put messages due within the lookahead straight into the wheel; later ones are picked up by `load`."""
+        if send_at <= datetime.now() + timedelta(seconds=self.lookahead):
+            for message_id in message_ids:
+                self.wheel.add(message_id, send_at.timestamp())
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "pending_in_wheel": len(self.wheel),
+                "dispatched": self._dispatched,
+                "last_lag_seconds": round(self._last_lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+            }
+
+    def _run(self) -> None:
+        next_load = 0.0
+        while not self._stop.is_set():
+            now = time.time()
+            try:
+                if now >= next_load:
+                    self.load()
+                    next_load = now + self.load_interval
+                due = [key for key, _ in self.wheel.advance(now)]
+                for start in range(0, len(due), self.batch_size):
+                    self._dispatch(due[start:start + self.batch_size])
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            self._stop.wait(self.tick)
+
+    def load(self) -> int:
+        horizon = datetime.now() + timedelta(seconds=self.lookahead)
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(Message.id, Message.send_at)
+                .where(Message.delivery_status == DeliveryStatus.scheduled, Message.send_at <= horizon)
+                .order_by(Message.send_at)
+                .limit(self.batch_size * 50)
+            ).all()
+        finally:
+            db.close()
+        for row in rows:
+            if row.id not in self.wheel:
+                self.wheel.add(row.id, row.send_at.timestamp())
+        return len(rows)
+
+    def _dispatch(self, message_ids: list[uuid.UUID]) -> None:
+        db = self.session_factory()
+        try:
+            dispatched = dispatch_scheduled_messages(db, message_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if not dispatched:
+            return
+        now = datetime.now()
+        lags = [(now - send_at).total_seconds() for _, send_at in dispatched]
+        with self._lock:
+            self._dispatched += len(dispatched)
+            self._last_lag = max(lags)
+            self._max_lag = max(self._max_lag, self._last_lag)
+
+
+message_scheduler = MessageScheduler()
+
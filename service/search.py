@@ -0,0 +1,44 @@
+from sqlalchemy import ColumnElement, func, literal_column
+
+from models import Client, Message, Service, Template
+
+# Each searchable model is matched against one text document built from these
+# columns. Migration 8c4f2a9d1e76 creates a pg_trgm GIN index on exactly the
+# same expression, so on PostgreSQL `ILIKE '%term%'` is answered from the index
+# instead of a sequential scan. SQLite has no trigram support and evaluates the
+# same predicate by scanning, which is fine for the small test databases.
+SEARCH_COLUMNS = {
+    Message: (Message.message,),
+    Client: (Client.name, Client.surname, Client.email, Client.phone),
+    Service: (Service.name, Service.description),
+    Template: (Template.name, Template.description, Template.template),
+}
+
+LIKE_ESCAPE = "\\"
+
+
+def search_document(model) -> ColumnElement:
+    columns = SEARCH_COLUMNS[model]
+    if len(columns) == 1:
+        return columns[0]
+    document = func.coalesce(columns[0], literal_column("''"))
+    for column in columns[1:]:
+        document = document.concat(literal_column("' '")).concat(func.coalesce(column, literal_column("''")))
+    return document
+
+
+def like_pattern(term: str) -> str:
+    escaped = term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", f"{LIKE_ESCAPE}%").replace("_", f"{LIKE_ESCAPE}_")
+    return f"%{escaped}%"
+
+
+def search_filter(model, term: str) -> ColumnElement:
+    return search_document(model).ilike(like_pattern(term.strip()), escape=LIKE_ESCAPE)
+
+
+def apply_search(query, model, term: str | None):
+    """Narrow a `Query` or `Select` to rows of `model` containing `term`."""
+    if not term or not term.strip():
+        return query
+    return query.where(search_filter(model, term))
+
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Protocol, Sequence
+
+from sqlalchemy import and_, or_, select, update
+
+from config import SMS_PROVIDER, SMS_LOOPBACK_PATH, SMS_BATCH_SIZE, SMS_RATE, SMS_MAX_IN_FLIGHT, SMS_LINGER_SECONDS
+from database import SessionLocal
+from models import Client, Message
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from service.base_template_builder import build_review_url
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Younger queued messages may still be sitting in another node's in-memory queue,
+# and a message claimed this long ago belongs to a node that died mid-send.
+SMS_RECOVERY_AGE = timedelta(minutes=10)
+
+
+@dataclass
+class OutgoingSms:
+    message_id: uuid.UUID
+    phone: str
+    body: str
+    claimed: bool = False
+
+
+def sms_body(message: str, company_id, client_id, tracking_id) -> str:
+    return f"{message} {build_review_url(company_id, client_id, tracking_id)}"
+
+
+class SmsProvider(Protocol):
+    def send_batch(self, messages: List[OutgoingSms]) -> List[str | None]:
+        """Send a batch and return one error (or None on success) per message."""
+        ...
+
+
+class LoopbackSmsProvider:
+    """Appends every SMS to a JSON-lines file instead of calling a gateway."""
+
+    def __init__(self, path: str = SMS_LOOPBACK_PATH, latency: float = 0.0):
+        self.path = path
+        self.latency = latency
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[OutgoingSms]) -> List[str | None]:
+        if self.latency:
+            time.sleep(self.latency)
+        lines = "".join(
+            json.dumps({
+                "message_id": str(sms.message_id), "phone": sms.phone, "body": sms.body, "sent_at": datetime.now().isoformat(),
+            }) + "\n"
+            for sms in messages
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+        return [None] * len(messages)
+
+
+def get_sms_provider() -> SmsProvider:
+    if SMS_PROVIDER == "loopback":
+        return LoopbackSmsProvider()
+    raise ValueError(f"Unknown SMS provider: {SMS_PROVIDER}")
+
+
+def claim_sms(message_ids: Sequence[uuid.UUID], session_factory=SessionLocal) -> set[uuid.UUID]:
+    """
+    Move queued messages to `sending` with a conditional UPDATE; only the ids
+    returned here may be handed to the provider, so a message that sits in
+    several nodes' queues is still sent once.
+    """
+    if not message_ids:
+        return set()
+    db = session_factory()
+    try:
+        claimed = db.execute(
+            update(Message)
+            .where(Message.id.in_(message_ids), Message.delivery_status == DeliveryStatus.queued)
+            .values(delivery_status=DeliveryStatus.sending, claimed_at=datetime.now())
+            .returning(Message.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return set(claimed)
+    finally:
+        db.close()
+
+
+def record_delivery(results: Sequence[tuple[uuid.UUID, str | None]], session_factory=SessionLocal) -> None:
+    now = datetime.now()
+    sent_ids = [message_id for message_id, error in results if error is None]
+    db = session_factory()
+    try:
+        if sent_ids:
+            db.execute(
+                update(Message)
+                .where(Message.id.in_(sent_ids))
+                .values(delivery_status=DeliveryStatus.sent, delivered_at=now, delivery_error=None)
+            )
+        for message_id, error in results:
+            if error is not None:
+                db.execute(
+                    update(Message)
+                    .where(Message.id == message_id)
+                    .values(delivery_status=DeliveryStatus.failed, delivery_error=error[:1000])
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+class SmsDispatcher:
+    """
+    Batches SMS on an asyncio loop running in a background thread, so sync
+    request handlers only pay for a thread-safe enqueue.
+    """
+
+    def __init__(
+            self,
+            provider: SmsProvider | None = None,
+            batch_size: int = SMS_BATCH_SIZE,
+            rate: float = SMS_RATE,
+            max_in_flight: int = SMS_MAX_IN_FLIGHT,
+            linger: float = SMS_LINGER_SECONDS,
+            session_factory=SessionLocal,
+    ):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.bucket = TokenBucket(rate, max(rate, batch_size)) if rate > 0 else None
+        self.max_in_flight = max_in_flight
+        self.linger = linger
+        self.session_factory = session_factory
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._consumer: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.provider = self.provider or get_sms_provider()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="sms-dispatcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self.recover()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(timeout)
+        finally:
+            # Stopped from outside the coroutine: stopping inside it would end the loop
+            # before the future above is resolved.
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, messages: Sequence[OutgoingSms]) -> None:
+        if self._loop is None or not messages:
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, list(messages))
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def recover(self) -> None:
+        """
+        Claim and re-submit SMS left behind by a node that went down: queued
+        ones old enough not to be in a live node's queue, and ones whose
+        claim is older than SMS_RECOVERY_AGE. The claim is a conditional
+        UPDATE, so when several nodes start together each message goes to one.
+        """
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            claimed = db.execute(
+                update(Message)
+                .where(
+                    Message.messageType == MessageType.SMS,
+                    or_(
+                        and_(Message.delivery_status == DeliveryStatus.queued, Message.send_at < now - SMS_RECOVERY_AGE),
+                        and_(Message.delivery_status == DeliveryStatus.sending, Message.claimed_at < now - SMS_RECOVERY_AGE),
+                    ),
+                )
+                .values(delivery_status=DeliveryStatus.sending, claimed_at=now)
+                .returning(Message.id, Message.message, Message.company_id, Message.client_id, Message.tracking_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            phones = dict(db.execute(
+                select(Client.id, Client.phone).where(Client.id.in_({row.client_id for row in claimed}))
+            ).all()) if claimed else {}
+            db.commit()
+        finally:
+            db.close()
+        self.submit([
+            OutgoingSms(
+                row.id, phones.get(row.client_id), sms_body(row.message, row.company_id, row.client_id, row.tracking_id),
+                claimed=True,
+            )
+            for row in claimed
+        ])
+
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._consumer = self._loop.create_task(self._consume())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    def _enqueue(self, messages: List[OutgoingSms]) -> None:
+        for sms in messages:
+            self._queue.put_nowait(sms)
+
+    async def _next_batch(self) -> List[OutgoingSms]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _throttle(self, amount: int) -> None:
+        if self.bucket is None:
+            return
+        while True:
+            granted = self.bucket.take(amount)
+            if granted == amount:
+                return
+            self.bucket.refund(granted)
+            await asyncio.sleep(max(self.bucket.wait_time(amount), 0.01))
+
+    async def _consume(self) -> None:
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        pending: set[asyncio.Task] = set()
+        while True:
+            try:
+                batch = await self._next_batch()
+            except asyncio.CancelledError:
+                break
+            await self._throttle(len(batch))
+            await in_flight.acquire()
+            task = self._loop.create_task(self._deliver(batch))
+            pending.add(task)
+
+            def release(done: asyncio.Task) -> None:
+                pending.discard(done)
+                in_flight.release()
+
+            task.add_done_callback(release)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _deliver(self, batch: List[OutgoingSms]) -> None:
+        try:
+            await self._send(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _send(self, batch: List[OutgoingSms]) -> None:
+        unclaimed = [sms.message_id for sms in batch if not sms.claimed]
+        try:
+            claimed = await self._loop.run_in_executor(None, claim_sms, unclaimed, self.session_factory)
+        except Exception:
+            # Left queued; recovery picks them up once they are old enough.
+            logger.exception("Claiming SMS batch of %s failed", len(batch))
+            return
+        batch = list({sms.message_id: sms for sms in batch if sms.claimed or sms.message_id in claimed}.values())
+        if not batch:
+            return
+        try:
+            errors = await self._loop.run_in_executor(None, self.provider.send_batch, batch)
+        except Exception as exc:
+            logger.exception("SMS batch of %s failed", len(batch))
+            errors = [str(exc) or exc.__class__.__name__] * len(batch)
+        results = [(sms.message_id, error) for sms, error in zip(batch, errors)]
+        try:
+            await self._loop.run_in_executor(None, record_delivery, results, self.session_factory)
+        except Exception:
+            logger.exception("Recording SMS delivery status failed")
+
+    async def _drain(self) -> None:
+        # join() also waits for batches already taken off the queue, which task_done() only
+        # marks once they were sent and recorded; cancelling before that would drop them.
+        await self._queue.join()
+        self._consumer.cancel()
+        await asyncio.gather(self._consumer, return_exceptions=True)
+
+
+sms_dispatcher = SmsDispatcher()
@@ -0,0 +1,299 @@
+import logging
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import case, delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import ROLLUP_COMPACT_WINDOW_HOURS
+from database import SessionLocal
+from models import Message, Stats, StatsRebuild, StatsRollup
+from models.utils.messageType import MessageType
+from models.utils.portalType import Portal
+from models.utils.rollupResolution import RollupResolution
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+STATS_COUNTERS = ("sent", "clicked", "completed")
+ROLLUP_RESOLUTIONS = (RollupResolution.hour, RollupResolution.day)
+
+STATS_KEY = ("company_id", "channel", "portal")
+ROLLUP_KEY = ("company_id", "resolution", "bucket", "channel", "portal")
+
+# Every worker runs the reconciliation jobs; rebuilds of one company's rows take turns across processes.
+rebuild_flight = SingleFlight("company-stats", across_processes=True)
+
+
+def stats_key(company_id, channel: MessageType, portal: Portal | str | None) -> tuple:
+    portal = portal.value if isinstance(portal, Portal) else portal
+    return uuid.UUID(str(company_id)), channel, portal or ""
+
+
+def event_key(company_id, channel: MessageType, portal: Portal | str | None, at: datetime) -> tuple:
+    return *stats_key(company_id, channel, portal), truncate(at, RollupResolution.hour)
+
+
+def truncate(at: datetime, resolution: RollupResolution) -> datetime:
+    if resolution == RollupResolution.day:
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def _sort_key(key: tuple) -> tuple:
+    return tuple(part.value if hasattr(part, "value") else str(part) for part in key)
+
+
+def _upsert(db: Session, model, key: tuple[str, ...], deltas: dict[tuple, Counter], accumulate: bool) -> None:
+    """Rows are written in key order so concurrent writers lock them in the same order."""
+    rows = [
+        {**dict(zip(key, values)), **{counter: counts.get(counter, 0) for counter in STATS_COUNTERS}}
+        for values, counts in sorted(deltas.items(), key=lambda item: _sort_key(item[0]))
+        if not accumulate or any(counts.values())
+    ]
+    if not rows:
+        return
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = insert(model)
+    updates = {
+        counter: getattr(model, counter) + getattr(statement.excluded, counter) if accumulate
+        else getattr(statement.excluded, counter)
+        for counter in STATS_COUNTERS
+    }
+    if hasattr(model, "updated_at"):
+        updates["updated_at"] = func.now()
+    db.execute(
+        statement.on_conflict_do_update(index_elements=[getattr(model, column) for column in key], set_=updates),
+        rows,
+    )
+
+
+def record_stats_many(db: Session, deltas: dict[tuple, Counter]) -> None:
+    """
+    Add counter deltas, keyed by `event_key`, inside the caller's transaction.
+    Both the running totals and the hourly and daily rollups are updated.
+    """
+    totals, rollups = defaultdict(Counter), defaultdict(Counter)
+    for (company_id, channel, portal, hour), counts in deltas.items():
+        totals[(company_id, channel, portal)].update(counts)
+        for resolution in ROLLUP_RESOLUTIONS:
+            rollups[(company_id, resolution, truncate(hour, resolution), channel, portal)].update(counts)
+    _upsert(db, Stats, STATS_KEY, totals, accumulate=True)
+    _upsert(db, StatsRollup, ROLLUP_KEY, rollups, accumulate=True)
+
+
+def record_stats(
+        db: Session,
+        company_id,
+        channel: MessageType,
+        portal: Portal | str | None,
+        at: datetime | None = None,
+        **counters: int,
+) -> None:
+    record_stats_many(db, {event_key(company_id, channel, portal, at or datetime.now()): Counter(counters)})
+
+
+def company_stats(db: Session, company_id: uuid.UUID) -> list[Stats]:
+    return db.query(Stats).filter(Stats.company_id == company_id).all()
+
+
+def rebuild_company_stats(db: Session, company_id: uuid.UUID) -> None:
+    """
+    Recompute one company's counters from `messages`. Its existing rows are
+    locked first, so increments racing with the rebuild wait and are applied
+    on top of the recomputed values instead of being overwritten.
+    """
+    db.execute(select(Stats.portal).where(Stats.company_id == company_id).with_for_update()).all()
+    aggregates = db.execute(
+        select(
+            Message.messageType,
+            Message.portal,
+            func.count(),
+            func.count(Message.clicked_at),
+            func.sum(case((Message.completed.is_(True), 1), else_=0)),
+        )
+        .where(Message.company_id == company_id)
+        .group_by(Message.messageType, Message.portal)
+    ).all()
+
+    rows = defaultdict(Counter)
+    for channel, portal, sent, clicked, completed in aggregates:
+        rows[stats_key(company_id, channel, portal)].update(sent=sent, clicked=clicked, completed=completed or 0)
+
+    stale = delete(Stats).where(Stats.company_id == company_id)
+    if rows:
+        stale = stale.where(tuple_(Stats.channel, Stats.portal).not_in([(channel, portal) for _, channel, portal in rows]))
+        _upsert(db, Stats, STATS_KEY, rows, accumulate=False)
+    db.execute(stale.execution_options(synchronize_session=False))
+
+
+def _bucket(db: Session, column, resolution: RollupResolution):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(resolution.value, column)
+    return func.strftime("%Y-%m-%d 00:00:00" if resolution == RollupResolution.day else "%Y-%m-%d %H:00:00", column)
+
+
+def rebuild_company_rollups(db: Session, company_id: uuid.UUID, since: datetime) -> None:
+    """
+    Recompute one company's rollups for buckets starting at `since` (rounded
+    down to a day so daily buckets stay whole) from the timestamps on `messages`.
+    """
+    since = truncate(since, RollupResolution.day)
+    window = (StatsRollup.company_id == company_id, StatsRollup.bucket >= since)
+    db.execute(select(StatsRollup.bucket).where(*window).with_for_update()).all()
+
+    events = (
+        ("sent", Message.send_at, ()),
+        ("clicked", Message.clicked_at, ()),
+        ("completed", Message.completed_at, (Message.completed.is_(True),)),
+    )
+    rows = defaultdict(Counter)
+    for counter, column, conditions in events:
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket = _bucket(db, column, resolution)
+            aggregates = db.execute(
+                select(bucket, Message.messageType, Message.portal, func.count())
+                .where(Message.company_id == company_id, column >= since, *conditions)
+                .group_by(bucket, Message.messageType, Message.portal)
+            ).all()
+            for at, channel, portal, count in aggregates:
+                at = at if isinstance(at, datetime) else datetime.fromisoformat(at)
+                company, channel, portal = stats_key(company_id, channel, portal)
+                rows[(company, resolution, at, channel, portal)][counter] += count
+
+    db.execute(delete(StatsRollup).where(*window).execution_options(synchronize_session=False))
+    _upsert(db, StatsRollup, ROLLUP_KEY, rows, accumulate=False)
+
+
+def _each_company(
+        session_factory,
+        company_ids: Iterable[uuid.UUID] | None,
+        rebuild,
+        label: str,
+        requested_at: datetime | None = None,
+) -> int:
+    """
+    Rebuild each company under `rebuild_flight`. A pass that waited for
+    another worker's rebuild of the same company skips it when that rebuild
+    started after this pass was requested, since it already saw every change.
+    """
+    requested_at = requested_at or datetime.now()
+    db = session_factory()
+    try:
+        if company_ids is None:
+            company_ids = db.scalars(
+                select(Message.company_id).where(Message.company_id.is_not(None))
+                .union(select(Stats.company_id))
+            ).all()
+        def commit_rebuild(company_id: uuid.UUID) -> bool:
+            last = db.get(StatsRebuild, (company_id, label), populate_existing=True)
+            if last is not None and last.started_at >= requested_at:
+                db.rollback()
+                return False
+            started_at = datetime.now()
+            rebuild(db, company_id)
+            db.merge(StatsRebuild(company_id=company_id, kind=label, started_at=started_at))
+            db.commit()
+            return True
+
+        rebuilt = 0
+        for company_id in company_ids:
+            try:
+                rebuilt += rebuild_flight.do(f"{label}:{company_id}", lambda: commit_rebuild(company_id))
+            except Exception:
+                db.rollback()
+                logger.exception("Rebuilding %s for company %s failed", label, company_id)
+        return rebuilt
+    finally:
+        db.close()
+
+
+def reconcile_stats(session_factory=SessionLocal, company_ids: Iterable[uuid.UUID] | None = None) -> int:
+    """Rebuild counters for every company that has messages or counters, one transaction per company; returns how many were rebuilt."""
+    return _each_company(session_factory, company_ids, rebuild_company_stats, "stats")
+
+
+def compact_rollups(
+        session_factory=SessionLocal,
+        window_hours: int = ROLLUP_COMPACT_WINDOW_HOURS,
+        company_ids: Iterable[uuid.UUID] | None = None,
+) -> int:
+    """Re-derive the most recent rollup buckets from `messages`, correcting any increments that were lost."""
+    since = datetime.now() - timedelta(hours=window_hours)
+    return _each_company(
+        session_factory,
+        company_ids,
+        lambda db, company_id: rebuild_company_rollups(db, company_id, since),
+        "rollups",
+    )
+
+
+TIMESERIES_INTERVALS = ("hour", "day", "week", "month")
+TIMESERIES_MAX_POINTS = 2000
+
+
+def pick_interval(start: datetime, end: datetime) -> str:
+    span = end - start
+    if span <= timedelta(days=2):
+        return "hour"
+    if span <= timedelta(days=120):
+        return "day"
+    if span <= timedelta(days=730):
+        return "week"
+    return "month"
+
+
+def downsample(bucket: datetime, interval: str) -> datetime:
+    if interval == "hour":
+        return bucket
+    day = truncate(bucket, RollupResolution.day)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def company_timeseries(
+        db: Session,
+        company_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+        interval: str,
+        channel: MessageType | None = None,
+        portal: Portal | None = None,
+) -> list[tuple[datetime, Counter]]:
+    """
+    Read the funnel between `start` and `end` from the rollups. Hourly points
+    come from hourly buckets; everything coarser is summed from daily buckets,
+    so a year-long range reads at most a few hundred rows per channel and portal.
+    """
+    resolution = RollupResolution.hour if interval == "hour" else RollupResolution.day
+    query = (
+        select(
+            StatsRollup.bucket,
+            func.sum(StatsRollup.sent),
+            func.sum(StatsRollup.clicked),
+            func.sum(StatsRollup.completed),
+        )
+        .where(
+            StatsRollup.company_id == company_id,
+            StatsRollup.resolution == resolution,
+            StatsRollup.bucket >= truncate(start, resolution),
+            StatsRollup.bucket < end,
+        )
+        .group_by(StatsRollup.bucket)
+        .order_by(StatsRollup.bucket)
+    )
+    if channel is not None:
+        query = query.where(StatsRollup.channel == channel)
+    if portal is not None:
+        query = query.where(StatsRollup.portal == portal.value)
+
+    points: dict[datetime, Counter] = {}
+    for bucket, sent, clicked, completed in db.execute(query):
+        points.setdefault(downsample(bucket, interval), Counter()).update(sent=int(sent), clicked=int(clicked), completed=int(completed))
+    return list(points.items())
@@ -0,0 +1,318 @@
+import argparse
+import copy
+import math
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Client, Message, Survey, SurveyAnalytic, SurveyAnalyticDelta, SurveyAnswer
+from schemas.surveys import SurveyAnalyticOutput, SurveyAnalyticRecord, SurveyAnswerOutput
+
+RATING = "rating"
+CHOICE = "choice"
+
+
+def _questions(survey: Survey) -> list[dict]:
+    return [question for question in survey.content or [] if question.get("id") is not None]
+
+
+def empty_aggregates(survey: Survey) -> dict:
+    aggregates = {}
+    for question in _questions(survey):
+        entry = {"answered": 0}
+        if question.get("type") == RATING:
+            entry.update(rating_sum=0, rating_count=0)
+        elif question.get("type") == CHOICE:
+            entry["choices"] = {str(option): 0 for option in question.get("options") or []}
+        aggregates[str(question["id"])] = entry
+    return aggregates
+
+
+def answer_columns(question_type: str | None, value) -> dict:
+    """Split one answer into the survey_answers value column that matches its question type."""
+    values = {"numeric_value": None, "text_value": None, "choice_value": None}
+    if question_type == RATING:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = math.nan
+        if math.isfinite(number):
+            values["numeric_value"] = number
+        else:
+            values["text_value"] = None if value is None else str(value)
+    elif question_type == CHOICE:
+        values["choice_value"] = None if value is None else str(value)[:255]
+    else:
+        values["text_value"] = None if value is None else str(value)
+    return values
+
+
+def write_survey_answers(db: Session, survey: Survey, message: Message, answers: dict | None, answered_at: datetime) -> None:
+    """Replace the message's rows in survey_answers with `answers`."""
+    db.execute(delete(SurveyAnswer).where(SurveyAnswer.message_id == message.id))
+    types = {str(question["id"]): question.get("type") for question in _questions(survey)}
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "message_id": message.id,
+            "survey_id": survey.id,
+            "client_id": message.client_id,
+            "service_id": message.service_id,
+            "question_id": str(key)[:255],
+            "answered_at": answered_at,
+            **answer_columns(types.get(str(key)), value),
+        }
+        for key, value in (answers or {}).items()
+    ]
+    if rows:
+        db.execute(insert(SurveyAnswer), rows)
+
+
+def fold_answers(survey: Survey, aggregates: dict, answers: dict | None, sign: int = 1) -> dict:
+    """
+    Add one response to the running aggregates, counted the way
+    rebuild_survey_analytics counts its survey_answers rows, or take it back
+    out with `sign=-1`.
+    """
+    types = {str(question["id"]): question.get("type") for question in _questions(survey)}
+    for key, value in (answers or {}).items():
+        key = str(key)[:255]
+        values = answer_columns(types.get(key), value)
+        entry = aggregates.setdefault(key, {"answered": 0})
+        entry["answered"] += sign
+        if values["numeric_value"] is not None:
+            entry["rating_sum"] = entry.get("rating_sum", 0) + sign * values["numeric_value"]
+            entry["rating_count"] = entry.get("rating_count", 0) + sign
+        if values["choice_value"] is not None:
+            choices = entry.setdefault("choices", {})
+            choices[values["choice_value"]] = choices.get(values["choice_value"], 0) + sign
+    return aggregates
+
+
+def merge_aggregates(aggregates: dict, delta: dict) -> dict:
+    for key, change in delta.items():
+        entry = aggregates.setdefault(key, {"answered": 0})
+        for name, amount in change.items():
+            if name == "choices":
+                choices = entry.setdefault("choices", {})
+                for choice, count in amount.items():
+                    choices[choice] = choices.get(choice, 0) + count
+            else:
+                entry[name] = entry.get(name, 0) + amount
+    return aggregates
+
+
+def record_survey_response(db: Session, survey: Survey, answers: dict | None, previous: dict | None = None, resubmitted: bool = False) -> None:
+    """
+    Queue one response's change to the aggregates for the refresher. It only
+    inserts, so concurrent submissions never wait on the analytic row. A
+    resubmission takes the `previous` answers back out instead of counting
+    as another completion.
+    """
+    content = fold_answers(survey, {}, previous, sign=-1) if resubmitted else {}
+    db.add(SurveyAnalyticDelta(
+        survey_id=survey.id,
+        content=fold_answers(survey, content, answers),
+        completed=0 if resubmitted else 1,
+        created_at=datetime.now(),
+    ))
+
+
+def fold_survey_analytics(db: Session, survey: Survey) -> SurveyAnalytic:
+    """
+    Add the responses queued since the last refresh to the stored aggregates
+    and drop their deltas. Only survey_analytic_deltas is read; a survey
+    without an analytic row yet is built from survey_answers once.
+    """
+    analytic = db.query(SurveyAnalytic).filter_by(survey_id=survey.id).with_for_update().populate_existing().first()
+    if analytic is None:
+        return rebuild_survey_analytics(db, survey)
+    # Taken before reading, so refreshed_at only vouches for deltas committed by then.
+    refreshed_at = datetime.now()
+    deltas = db.execute(
+        select(SurveyAnalyticDelta.id, SurveyAnalyticDelta.content, SurveyAnalyticDelta.completed)
+        .where(SurveyAnalyticDelta.survey_id == survey.id)
+    ).all()
+    aggregates = copy.deepcopy(analytic.content or {})
+    for delta in deltas:
+        merge_aggregates(aggregates, delta.content)
+    analytic.content = aggregates
+    analytic.completed_times = (analytic.completed_times or 0) + sum(delta.completed for delta in deltas)
+    analytic.refreshed_at = refreshed_at
+    if deltas:
+        db.execute(delete(SurveyAnalyticDelta).where(SurveyAnalyticDelta.id.in_([delta.id for delta in deltas])))
+    return analytic
+
+
+def rebuild_survey_analytics(db: Session, survey: Survey) -> SurveyAnalytic:
+    """
+    Recompute the aggregates from survey_answers with two GROUP BY queries,
+    for repair and for a survey's first refresh. Queued deltas are dropped
+    since the rebuild already counts their answers. The survey row is locked
+    first, so a first submission, which increments it last, either committed
+    before the rebuild or keeps its delta for the next fold.
+    """
+    completed = db.scalar(
+        select(func.coalesce(Survey.completed_times, 0)).where(Survey.id == survey.id).with_for_update()
+    )
+    refreshed_at = datetime.now()
+    db.execute(delete(SurveyAnalyticDelta).where(SurveyAnalyticDelta.survey_id == survey.id))
+    aggregates = empty_aggregates(survey)
+    types = {str(question["id"]): question.get("type") for question in _questions(survey)}
+    answered = db.execute(
+        select(SurveyAnswer.question_id, func.count(), func.sum(SurveyAnswer.numeric_value), func.count(SurveyAnswer.numeric_value))
+        .where(SurveyAnswer.survey_id == survey.id)
+        .group_by(SurveyAnswer.question_id)
+    ).all()
+    for question_id, count, rating_sum, rating_count in answered:
+        entry = aggregates.setdefault(question_id, {"answered": 0})
+        entry["answered"] = count
+        if types.get(question_id) == RATING:
+            entry.update(rating_sum=float(rating_sum or 0), rating_count=rating_count)
+    choices = db.execute(
+        select(SurveyAnswer.question_id, SurveyAnswer.choice_value, func.count())
+        .where(SurveyAnswer.survey_id == survey.id, SurveyAnswer.choice_value.is_not(None))
+        .group_by(SurveyAnswer.question_id, SurveyAnswer.choice_value)
+    ).all()
+    for question_id, choice, count in choices:
+        aggregates.setdefault(question_id, {"answered": 0}).setdefault("choices", {})[choice] = count
+
+    analytic = db.query(SurveyAnalytic).filter_by(survey_id=survey.id).with_for_update().first()
+    if analytic is None:
+        analytic = SurveyAnalytic(survey_id=survey.id)
+        db.add(analytic)
+    analytic.content = aggregates
+    analytic.completed_times = completed
+    analytic.refreshed_at = refreshed_at
+    return analytic
+
+
+def analytics_output(survey: Survey, aggregates: dict | None) -> SurveyAnalyticOutput:
+    """Turn stored aggregates into the analytics payload; individual answers are paged separately."""
+    aggregates = aggregates or {}
+    records = {}
+    for question in _questions(survey):
+        entry = aggregates.get(str(question["id"]), {})
+        record = SurveyAnalyticRecord(
+            type=question.get("type"),
+            label=question.get("label"),
+            required=question.get("required"),
+            options=question.get("options"),
+        )
+        if entry.get("rating_count"):
+            record.average_rating = entry["rating_sum"] / entry["rating_count"]
+        if question.get("type") == CHOICE:
+            record.average_choice = dict(entry.get("choices", {}))
+        records[str(question["id"])] = record
+
+    return SurveyAnalyticOutput(records=list(records.values()))
+
+
+def answers_query(
+        survey_id: uuid.UUID,
+        question_id: str,
+        choices: list[str] | None = None,
+        min_rating: float | None = None,
+        max_rating: float | None = None,
+        answered_after: datetime | None = None,
+        answered_before: datetime | None = None,
+        service_id: uuid.UUID | None = None,
+):
+    """One question's answers with their respondents, filtered on survey_answers' indexed columns."""
+    query = (
+        select(SurveyAnswer, Client.name, Client.email)
+        .outerjoin(Client, Client.id == SurveyAnswer.client_id)
+        .where(SurveyAnswer.survey_id == survey_id, SurveyAnswer.question_id == question_id)
+    )
+    if choices:
+        query = query.where(SurveyAnswer.choice_value.in_(choices))
+    if min_rating is not None:
+        query = query.where(SurveyAnswer.numeric_value >= min_rating)
+    if max_rating is not None:
+        query = query.where(SurveyAnswer.numeric_value <= max_rating)
+    if answered_after is not None:
+        query = query.where(SurveyAnswer.answered_at >= answered_after)
+    if answered_before is not None:
+        query = query.where(SurveyAnswer.answered_at < answered_before)
+    if service_id is not None:
+        query = query.where(SurveyAnswer.service_id == service_id)
+    return query
+
+
+def answer_output(answer: SurveyAnswer, name: str | None, email: str | None) -> SurveyAnswerOutput:
+    value = next(value for value in (answer.choice_value, answer.numeric_value, answer.text_value, "") if value is not None)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return SurveyAnswerOutput(
+        id=answer.id,
+        message_id=answer.message_id,
+        client_id=answer.client_id,
+        client_email=name if name else email,
+        service_id=answer.service_id,
+        answered_at=answer.answered_at,
+        answer=value,
+    )
+
+
+def count_completion(db: Session, survey_id: uuid.UUID) -> None:
+    """
+    Add one completion as a single SQL-side increment, so concurrent
+    submissions never overwrite each other's read-modify-write. Call it last
+    in the transaction to keep the survey row lock short.
+    """
+    db.execute(
+        update(Survey)
+        .where(Survey.id == survey_id)
+        .values(completed_times=func.coalesce(Survey.completed_times, 0) + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_completion_counts(session_factory=SessionLocal, survey_ids: list[uuid.UUID] | None = None) -> int:
+    """Reset surveys.completed_times to the number of completed survey messages; returns how many were off."""
+    completed = (
+        select(func.count())
+        .select_from(Message)
+        .where(Message.survey_id == Survey.id, Message.is_survey.is_(True), Message.completed.is_(True))
+        .correlate(Survey)
+        .scalar_subquery()
+    )
+    query = update(Survey).where(Survey.completed_times.is_distinct_from(completed)).values(completed_times=completed)
+    if survey_ids:
+        query = query.where(Survey.id.in_(survey_ids))
+    db = session_factory()
+    try:
+        corrected = db.execute(query.execution_options(synchronize_session=False)).rowcount
+        db.commit()
+        return corrected
+    finally:
+        db.close()
+
+
+def rebuild_all_survey_analytics(session_factory=SessionLocal, survey_ids: list[uuid.UUID] | None = None) -> int:
+    db = session_factory()
+    try:
+        query = db.query(Survey)
+        if survey_ids:
+            query = query.filter(Survey.id.in_(survey_ids))
+        rebuilt = 0
+        for survey in query.all():
+            rebuild_survey_analytics(db, survey)
+            db.commit()
+            rebuilt += 1
+        return rebuilt
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild survey analytics from completed responses.")
+    parser.add_argument("survey_ids", nargs="*", type=uuid.UUID, help="surveys to rebuild (default: all)")
+    parser.add_argument("--counts-only", action="store_true", help="only reconcile surveys.completed_times")
+    args = parser.parse_args()
+    print(f"Reconciled completion counts for {reconcile_completion_counts(survey_ids=args.survey_ids)} surveys")
+    if not args.counts_only:
+        print(f"Rebuilt analytics for {rebuild_all_survey_analytics(survey_ids=args.survey_ids)} surveys")
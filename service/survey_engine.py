@@ -0,0 +1,204 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Survey, SurveyAnswer
+from schemas.surveys import ChoiceDistribution, CrossTab, RatingDistribution
+from utils.single_flight import SingleFlight
+
+RATING = "rating"
+CHOICE = "choice"
+MISSING = -1
+
+columns_flight = SingleFlight("survey-answer-columns")
+
+
+@dataclass
+class AnswerColumns:
+    """
+    A survey's answers in columnar form: one float array per rating question
+    (NaN where unanswered) and one int array of option codes per choice
+    question (MISSING where unanswered), all aligned by response.
+    """
+    size: int = 0
+    ratings: dict[str, np.ndarray] = field(default_factory=dict)
+    choices: dict[str, np.ndarray] = field(default_factory=dict)
+    categories: dict[str, list[str]] = field(default_factory=dict)
+    scales: dict[str, float | None] = field(default_factory=dict)
+
+
+def _rating(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def build_answer_columns(questions: Sequence[dict], responses: Sequence[dict | None]) -> AnswerColumns:
+    columns = AnswerColumns(size=len(responses))
+    responses = [response or {} for response in responses]
+    for question in questions:
+        if question.get("id") is None:
+            continue
+        key = str(question["id"])
+        if question.get("type") == RATING:
+            columns.ratings[key] = np.fromiter((_rating(r.get(key)) for r in responses), dtype=np.float64, count=len(responses))
+            columns.scales[key] = question.get("max")
+        elif question.get("type") == CHOICE:
+            categories = [str(option) for option in question.get("options") or []]
+            codes = {category: code for code, category in enumerate(categories)}
+            values = np.full(len(responses), MISSING, dtype=np.int64)
+            for row, response in enumerate(responses):
+                if key not in response:
+                    continue
+                value = str(response[key])
+                if value not in codes:
+                    codes[value] = len(categories)
+                    categories.append(value)
+                values[row] = codes[value]
+            columns.choices[key] = values
+            columns.categories[key] = categories
+    return columns
+
+
+def load_answer_columns(
+        db: Session,
+        survey: Survey,
+        answered_after: datetime | None = None,
+        answered_before: datetime | None = None,
+        batch_size: int = 5000,
+) -> AnswerColumns:
+    """
+    Read the survey's rows from survey_answers, which the (survey_id,
+    question_id, ...) indexes serve directly, and scatter them into columns.
+    """
+    query = (
+        select(SurveyAnswer.message_id, SurveyAnswer.question_id, SurveyAnswer.numeric_value, SurveyAnswer.choice_value)
+        .where(SurveyAnswer.survey_id == survey.id)
+    )
+    if answered_after is not None:
+        query = query.where(SurveyAnswer.answered_at >= answered_after)
+    if answered_before is not None:
+        query = query.where(SurveyAnswer.answered_at < answered_before)
+
+    positions: dict = {}
+    answers: dict[str, tuple[list[int], list]] = defaultdict(lambda: ([], []))
+    for row in db.execute(query.execution_options(yield_per=batch_size)):
+        rows, values = answers[row.question_id]
+        rows.append(positions.setdefault(row.message_id, len(positions)))
+        values.append(row.choice_value if row.choice_value is not None else row.numeric_value)
+
+    columns = AnswerColumns(size=len(positions))
+    for question in survey.content or []:
+        if question.get("id") is None:
+            continue
+        key = str(question["id"])
+        rows, values = answers.get(key, ([], []))
+        rows = np.array(rows, dtype=np.int64)
+        if question.get("type") == RATING:
+            columns.ratings[key] = np.full(columns.size, math.nan)
+            # Answers stored before the question became a rating may only have choice_value.
+            columns.ratings[key][rows] = np.fromiter((_rating(value) for value in values), dtype=np.float64, count=len(values))
+            columns.scales[key] = question.get("max")
+        elif question.get("type") == CHOICE:
+            categories = [str(option) for option in question.get("options") or []]
+            codes = {category: code for code, category in enumerate(categories)}
+            # Answers stored before the question became a choice only have numeric_value.
+            values = [None if value is None else str(value) for value in values]
+            for value in values:
+                if value is not None and value not in codes:
+                    codes[value] = len(categories)
+                    categories.append(value)
+            columns.choices[key] = np.full(columns.size, MISSING, dtype=np.int64)
+            columns.choices[key][rows] = [codes.get(value, MISSING) for value in values]
+            columns.categories[key] = categories
+    return columns
+
+
+def shared_answer_columns(
+        db: Session,
+        survey: Survey,
+        answered_after: datetime | None = None,
+        answered_before: datetime | None = None,
+) -> AnswerColumns:
+    """load_answer_columns, with concurrent requests for the same survey and range sharing one load."""
+    return columns_flight.do(
+        f"{survey.id}:{answered_after}:{answered_before}",
+        lambda: load_answer_columns(db, survey, answered_after, answered_before),
+    )
+
+
+def rating_distribution(values: np.ndarray, scale: float | None = None) -> RatingDistribution:
+    answered = values[~np.isnan(values)]
+    if answered.size == 0:
+        return RatingDistribution(count=0)
+    median, p10, p90 = np.percentile(answered, [50, 10, 90])
+    scores, counts = np.unique(np.rint(answered).astype(np.int64), return_counts=True)
+    distribution = RatingDistribution(
+        count=int(answered.size),
+        mean=float(answered.mean()),
+        std=float(answered.std()),
+        median=float(median),
+        p10=float(p10),
+        p90=float(p90),
+        histogram={str(score): int(count) for score, count in zip(scores, counts)},
+    )
+    if (scale or answered.max()) >= 10 and answered.min() >= 0:
+        promoters = np.count_nonzero(answered >= 9)
+        detractors = np.count_nonzero(answered <= 6)
+        distribution.nps = float((promoters - detractors) * 100 / answered.size)
+    return distribution
+
+
+def choice_distribution(codes: np.ndarray, categories: list[str]) -> ChoiceDistribution:
+    answered = codes[codes != MISSING]
+    counts = np.bincount(answered, minlength=len(categories)) if answered.size else np.zeros(len(categories), dtype=np.int64)
+    shares = counts / answered.size if answered.size else np.zeros(len(categories))
+    return ChoiceDistribution(
+        count=int(answered.size),
+        counts={category: int(count) for category, count in zip(categories, counts)},
+        shares={category: float(share) for category, share in zip(categories, shares)},
+    )
+
+
+def _categorical(columns: AnswerColumns, key: str) -> tuple[np.ndarray, list[str]]:
+    if key in columns.choices:
+        return columns.choices[key], columns.categories[key]
+    if key in columns.ratings:
+        values = columns.ratings[key]
+        answered = ~np.isnan(values)
+        scores = np.rint(values[answered]).astype(np.int64)
+        levels = np.unique(scores)
+        codes = np.full(values.shape, MISSING, dtype=np.int64)
+        codes[answered] = np.searchsorted(levels, scores)
+        return codes, [str(level) for level in levels]
+    raise KeyError(key)
+
+
+def cross_tab(columns: AnswerColumns, row_key: str, column_key: str) -> CrossTab:
+    """Count responses for every pair of answers to two questions; responses missing either are skipped."""
+    rows, row_labels = _categorical(columns, row_key)
+    cols, column_labels = _categorical(columns, column_key)
+    both = (rows != MISSING) & (cols != MISSING)
+    cells = len(row_labels) * len(column_labels)
+    counts = np.bincount(rows[both] * len(column_labels) + cols[both], minlength=cells) if cells else np.zeros(0, dtype=np.int64)
+    return CrossTab(
+        row_question=row_key,
+        column_question=column_key,
+        rows=row_labels,
+        columns=column_labels,
+        counts=counts.reshape(len(row_labels), len(column_labels)).tolist(),
+    )
+
+
+def distributions(columns: AnswerColumns) -> dict[str, RatingDistribution | ChoiceDistribution]:
+    result = {key: rating_distribution(values, columns.scales.get(key)) for key, values in columns.ratings.items()}
+    result.update({key: choice_distribution(codes, columns.categories[key]) for key, codes in columns.choices.items()})
+    return result
+
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from config import SURVEY_ANALYTICS_TICK, SURVEY_ANALYTICS_DEBOUNCE, SURVEY_ANALYTICS_MAX_STALENESS
+from database import SessionLocal
+from models import Survey, SurveyAnalytic
+from service.survey_analytics import fold_survey_analytics
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+analytics_flight = SingleFlight("survey-analytics", across_processes=True)
+
+
+class SurveyAnalyticsRefresher:
+    """
+    Folds new responses into SurveyAnalytic rows off the request path. A
+    survey marked dirty is refreshed once no new mark has arrived for
+    `debounce` seconds, or at the latest `max_staleness` seconds after it
+    first became dirty, so a survey that keeps receiving responses is still
+    refreshed regularly.
+    """
+
+    def __init__(
+            self,
+            tick: float = SURVEY_ANALYTICS_TICK,
+            debounce: float = SURVEY_ANALYTICS_DEBOUNCE,
+            max_staleness: float = SURVEY_ANALYTICS_MAX_STALENESS,
+            session_factory=SessionLocal,
+    ):
+        self.tick = tick
+        self.debounce = debounce
+        self.max_staleness = max_staleness
+        self.session_factory = session_factory
+        # survey id -> (first marked, last marked), monotonic seconds
+        self._dirty: dict[uuid.UUID, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refreshed = 0
+
+    def mark(self, survey_id: uuid.UUID, force: bool = False) -> None:
+        """Schedule a refresh; `force` skips the debounce and refreshes on the next tick."""
+        now = time.monotonic()
+        with self._lock:
+            first, _ = self._dirty.get(survey_id, (now, now))
+            self._dirty[survey_id] = (now - self.max_staleness if force else first, now)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="survey-analytics-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"dirty_surveys": len(self._dirty), "refreshed": self._refreshed}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_due()
+            except Exception:
+                logger.exception("Survey analytics refresh failed")
+            self._stop.wait(self.tick)
+
+    def refresh_due(self) -> int:
+        now, requested_at = time.monotonic(), datetime.now()
+        with self._lock:
+            due = [
+                survey_id for survey_id, (first, last) in self._dirty.items()
+                if now - last >= self.debounce or now - first >= self.max_staleness
+            ]
+            for survey_id in due:
+                del self._dirty[survey_id]
+        refreshed = sum(self.refresh(survey_id, requested_at) for survey_id in due)
+        with self._lock:
+            self._refreshed += refreshed
+        return refreshed
+
+    def refresh(self, survey_id: uuid.UUID, requested_at: datetime | None = None) -> bool:
+        """Fold one survey's new responses unless another worker already did so after `requested_at`."""
+        requested_at = requested_at or datetime.now()
+        try:
+            return analytics_flight.do(str(survey_id), lambda: self._fold(survey_id, requested_at))
+        except Exception:
+            logger.exception("Refreshing analytics for survey %s failed", survey_id)
+            self.mark(survey_id)
+            return False
+
+    def _fold(self, survey_id: uuid.UUID, requested_at: datetime) -> bool:
+        db = self.session_factory()
+        try:
+            survey = db.get(Survey, survey_id)
+            if survey is None:
+                return False
+            refreshed_at = db.query(SurveyAnalytic.refreshed_at).filter_by(survey_id=survey_id).scalar()
+            if refreshed_at is not None and refreshed_at >= requested_at:
+                return False
+            fold_survey_analytics(db, survey)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+survey_analytics_refresher = SurveyAnalyticsRefresher()
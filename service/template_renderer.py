@@ -0,0 +1,163 @@
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Hashable, Iterable, Iterator, NamedTuple
+
+from config import TEMPLATE_CACHE_SIZE
+from service.base_template_builder import review_url_prefix
+
+PLACEHOLDER_REGEX = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+
+# Both the English placeholders used in saved templates and the Polish ones
+# emitted by base_template_builder resolve to the same values.
+PLACEHOLDERS = {
+    "name": "name",
+    "imię": "name",
+    "surname": "surname",
+    "nazwisko": "surname",
+    "company": "company",
+    "nazwa_firmy": "company",
+    "review_url": "review_url",
+    "link": "review_url",
+    "service": "service",
+    "usługa": "service",
+}
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """`statics` always has exactly one more element than `keys`."""
+    statics: tuple[str, ...]
+    keys: tuple[str, ...]
+
+    def render(self, values: dict[str, str]) -> str:
+        parts = [self.statics[0]]
+        for key, static in zip(self.keys, self.statics[1:]):
+            parts.append(values.get(key) or "")
+            parts.append(static)
+        return "".join(parts)
+
+    def bind(self, values: dict[str, str]) -> "CompiledTemplate":
+        """Fold placeholders that are the same for every recipient into the static segments."""
+        statics, keys = [[self.statics[0]]], []
+        for key, static in zip(self.keys, self.statics[1:]):
+            if key in values:
+                statics[-1].extend((values[key] or "", static))
+            else:
+                keys.append(key)
+                statics.append([static])
+        return CompiledTemplate(tuple("".join(parts) for parts in statics), tuple(keys))
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    statics, keys, position = [], [], 0
+    for match in PLACEHOLDER_REGEX.finditer(text):
+        key = PLACEHOLDERS.get(match.group(1))
+        if key is None:
+            continue
+        statics.append(text[position:match.start()])
+        keys.append(key)
+        position = match.end()
+    statics.append(text[position:])
+    return CompiledTemplate(tuple(statics), tuple(keys))
+
+
+class TemplateCache:
+    def __init__(self, maxsize: int = TEMPLATE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CompiledTemplate] = OrderedDict()
+        self._versions: dict[uuid.UUID, Hashable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_id: uuid.UUID, modified_at: datetime | None, text: str) -> CompiledTemplate:
+        key = (template_id, modified_at)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = compile_template(text)
+
+        with self._lock:
+            stale = self._versions.get(template_id)
+            if stale is not None and stale != key:
+                self._entries.pop(stale, None)
+            self._entries[key] = compiled
+            self._versions[template_id] = key
+            while len(self._entries) > self.maxsize:
+                evicted_key, _ = self._entries.popitem(last=False)
+                if self._versions.get(evicted_key[0]) == evicted_key:
+                    del self._versions[evicted_key[0]]
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+template_cache = TemplateCache()
+
+
+def get_compiled_template(template) -> CompiledTemplate:
+    return template_cache.get(template.id, template.updated_at or template.created_at, str(template.template))
+
+
+def template_values(
+        client_name: str | None,
+        client_surname: str | None,
+        company_name: str | None,
+        review_url: str | None = None,
+        service_name: str | None = None,
+) -> dict[str, str]:
+    return {
+        "name": client_name.split(" ")[0] if client_name else "",
+        "surname": client_surname or "",
+        "company": company_name or "",
+        "review_url": review_url or "",
+        "service": service_name or "",
+    }
+
+
+def render_template(template, values: dict[str, str]) -> str:
+    return get_compiled_template(template).render(values)
+
+
+class Recipient(NamedTuple):
+    client_id: uuid.UUID
+    tracking_id: uuid.UUID
+    name: str | None = None
+    surname: str | None = None
+    email: str | None = None
+    message_id: uuid.UUID | None = None
+
+
+def render_many(
+        template,
+        recipients: Iterable,
+        company_id: uuid.UUID,
+        company_name: str | None,
+        service_name: str | None = None,
+) -> Iterator[tuple]:
+    """
+    Lazily render one template for many recipients. Recipients can be
+    `Recipient` tuples or any rows with the same attribute names; each is
+    yielded back together with its personalized body.
+    """
+    compiled = get_compiled_template(template).bind({"company": company_name or "", "service": service_name or ""})
+    prefix = review_url_prefix(company_id)
+    for recipient in recipients:
+        yield recipient, compiled.render({
+            "name": recipient.name.split(" ")[0] if recipient.name else "",
+            "surname": recipient.surname or "",
+            "review_url": f"{prefix}{recipient.client_id}/{recipient.tracking_id}",
+        })
+
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+os.environ.setdefault("JWT_SECRET", "test")
+
+
+@pytest.fixture
+def session_factory():
+    """A fresh schema per test (SQLite unless DATABASE_URL says otherwise), built the way main.py builds it."""
+    import models  # noqa: F401 - registers every table on Base.metadata
+    from database import Base, SessionLocal, engine
+    from service.partitions import ensure_partitions
+
+    Base.metadata.create_all(bind=engine)
+    ensure_partitions(bind=engine)
+    yield SessionLocal
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def company(db):
+    from models import Company, User
+
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    company = Company(id=uuid.uuid4(), name="Acme", owner_id=user.id)
+    db.add_all([user, company])
+    db.commit()
+    return company
+
+
+@pytest.fixture
+def client(db, company):
+    from models import Client
+
+    client = Client(id=uuid.uuid4(), name="Jan Kowalski", surname="Kowalski", email="jan@example.com", phone="+48100200300", company_id=company.id)
+    db.add(client)
+    db.commit()
+    return client
@@ -0,0 +1,44 @@
+import uuid
+
+from models import Campaign, Client, Message
+from models.utils.campaignStatus import CampaignStatus
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from schemas.messages import MessageSpec
+from service import campaign as campaign_service
+
+
+def test_sms_campaign_sends_to_phones_and_fails_clients_without_one(db, company, client, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(campaign_service.sms_dispatcher, "submit", submitted.extend)
+    no_phone = Client(id=uuid.uuid4(), name="Anna", surname="Nowak", email="anna@example.com", company_id=company.id)
+    db.add(no_phone)
+    campaign = Campaign(message="Hi", messageType=MessageType.SMS, company_id=company.id, total=2)
+    db.add(campaign)
+    db.commit()
+    campaign_service.create_campaign_messages(db, campaign, MessageSpec(message="Hi"), [client.id, no_phone.id])
+    db.commit()
+
+    campaign_service.deliver_campaign(campaign.id)
+
+    db.expire_all()
+    assert [sms.phone for sms in submitted] == [client.phone]
+    statuses = {m.client_id: m.delivery_status for m in db.query(Message).filter_by(campaign_id=campaign.id)}
+    assert statuses == {client.id: DeliveryStatus.queued, no_phone.id: DeliveryStatus.failed}
+    campaign = db.get(Campaign, campaign.id)
+    assert (campaign.status, campaign.processed, campaign.failed) == (CampaignStatus.completed, 2, 1)
+
+
+def test_email_campaign_without_template_fails_every_recipient(db, company, client, monkeypatch):
+    monkeypatch.setattr(campaign_service.sms_dispatcher, "submit", lambda messages: None)
+    campaign = Campaign(message="Hi", messageType=MessageType.Email, company_id=company.id, total=1)
+    db.add(campaign)
+    db.commit()
+    campaign_service.create_campaign_messages(db, campaign, MessageSpec(message="Hi"), [client.id])
+    db.commit()
+
+    campaign_service.deliver_campaign(campaign.id)
+
+    db.expire_all()
+    assert db.query(Message).filter_by(campaign_id=campaign.id).one().delivery_status == DeliveryStatus.failed
+    assert db.get(Campaign, campaign.id).failed == 1
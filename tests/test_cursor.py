@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_without_padding():
+    send_at, message_id = datetime(2026, 10, 18, 12, 30, 45, 123456), uuid.uuid4()
+
+    cursor = encode_cursor(send_at, message_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (send_at, message_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(datetime.now(), uuid.uuid4())[:-4], "WzEsMl0"])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
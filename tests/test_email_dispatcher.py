@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+
+from models.outbox import EmailOutbox
+from models.utils.outboxStatus import OutboxStatus
+from routes import metrics
+from service.email import EmailDispatcher, FakeEmailProvider, OutgoingEmail
+from service.outbox import OutboxWorker, enqueue_email
+from utils import rate_limit
+from utils.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def emails(count: int, sender: str = "shop@example.com", company_id: uuid.UUID | None = None) -> list[OutgoingEmail]:
+    return [
+        OutgoingEmail(uuid.uuid4(), sender, [f"client{i}@example.com"], "Hi", "Hi", company_id)
+        for i in range(count)
+    ]
+
+
+def unlimited(provider, **kwargs) -> EmailDispatcher:
+    return EmailDispatcher(provider, sender_limiter=RateLimiter(0), company_limiter=RateLimiter(0), **kwargs)
+
+
+def test_batches_are_capped_at_batch_size(clock):
+    provider = FakeEmailProvider()
+    dispatcher = unlimited(provider, batch_size=3)
+
+    result = dispatcher.dispatch(emails(7))
+
+    assert len(result.sent) == 7
+    assert provider.calls == 3
+    assert dispatcher.counters()["batches"] == 3
+
+
+def test_company_does_not_spend_another_companys_bucket(clock):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    dispatcher = EmailDispatcher(
+        FakeEmailProvider(), batch_size=10, sender_limiter=RateLimiter(0), company_limiter=RateLimiter(1, 2),
+    )
+    first_emails, second_emails = emails(5, company_id=first), emails(2, company_id=second)
+
+    result = dispatcher.dispatch(first_emails + second_emails)
+
+    assert sorted(result.sent) == sorted([email.id for email in first_emails[:2] + second_emails])
+    assert sorted(result.throttled) == sorted(email.id for email in first_emails[2:])
+
+
+def test_provider_rate_limit_is_counted_and_requeued(clock, db, company, session_factory):
+    entry_ids = [enqueue_email(db, ["jan@example.com"], "Hi", company_id=company.id).id for _ in range(3)]
+    db.commit()
+    dispatcher = unlimited(FakeEmailProvider(max_calls_per_second=1), batch_size=1)
+
+    OutboxWorker(dispatcher, workers=1, session_factory=session_factory).drain_once()
+
+    assert dispatcher.counters()["throttled"] == 2
+    db.expire_all()
+    entries = [db.get(EmailOutbox, entry_id) for entry_id in entry_ids]
+    assert sorted(entry.status.value for entry in entries) == sorted(
+        [OutboxStatus.sent.value, OutboxStatus.pending.value, OutboxStatus.pending.value]
+    )
+    assert all(entry.attempts == 0 for entry in entries)
+
+
+def test_email_metrics_report_dispatcher_counters(clock, monkeypatch):
+    provider = FakeEmailProvider(max_calls_per_second=2)
+    dispatcher = unlimited(provider, batch_size=2)
+    monkeypatch.setattr(metrics, "email_dispatcher", dispatcher)
+
+    dispatcher.dispatch(emails(5))
+    provider.failure_rate = 1.0
+    provider.max_calls_per_second = 0
+    dispatcher.dispatch(emails(1))
+
+    assert metrics.email_metrics(None) == {"queued": 6, "sent": 4, "throttled": 1, "failed": 1, "batches": 4}
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from models.idempotency_key import IdempotencyKey
+from utils.idempotency import commit_idempotent, find_idempotent_response
+
+
+class Output(BaseModel):
+    value: int
+
+
+def test_losing_request_replays_winner(session_factory, company):
+    company_id = company.id
+    first, second = session_factory(), session_factory()
+    try:
+        assert find_idempotent_response(first, company_id, "key", "send") is None
+        assert find_idempotent_response(second, company_id, "key", "send") is None
+        assert commit_idempotent(first, company_id, "key", "send", Output(value=1)) is None
+        assert commit_idempotent(second, company_id, "key", "send", Output(value=2)) == {"value": 1}
+        assert find_idempotent_response(second, company_id, "key", "send") == {"value": 1}
+    finally:
+        first.close()
+        second.close()
+
+
+def test_live_key_of_another_endpoint_is_not_overwritten(db, company):
+    company_id = company.id
+    commit_idempotent(db, company_id, "key", "send_sms", Output(value=1))
+    with pytest.raises(HTTPException) as error:
+        commit_idempotent(db, company_id, "key", "send_email", Output(value=2))
+    assert error.value.status_code == 422
+    assert find_idempotent_response(db, company_id, "key", "send_sms") == {"value": 1}
+
+
+def test_expired_key_is_replaced(db, company):
+    company_id = company.id
+    db.add(IdempotencyKey(
+        company_id=company_id, key="key", endpoint="send", response={"value": 1},
+        expires_at=datetime.now() - timedelta(seconds=1),
+    ))
+    db.commit()
+    assert find_idempotent_response(db, company_id, "key", "send") is None
+    assert commit_idempotent(db, company_id, "key", "send", Output(value=2)) is None
+    assert find_idempotent_response(db, company_id, "key", "send") == {"value": 2}
@@ -0,0 +1,117 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from models import Message
+from models.outbox import EmailOutbox
+from models.template import Template
+from models.utils.outboxStatus import OutboxStatus
+from routes.messages import create_email_message
+from schemas.messages import CreateMessage
+from service.email import EmailDispatcher, FakeEmailProvider
+from service.outbox import OUTBOX_LEASE, OutboxWorker, enqueue_email
+from utils.rate_limit import RateLimiter
+
+
+def outbox_worker(session_factory, provider, max_attempts: int = 3) -> OutboxWorker:
+    dispatcher = EmailDispatcher(provider, sender_limiter=RateLimiter(0), company_limiter=RateLimiter(0))
+    return OutboxWorker(dispatcher, workers=2, poll_interval=0.01, max_attempts=max_attempts, session_factory=session_factory)
+
+
+def queued_email(db, company) -> uuid.UUID:
+    entry = enqueue_email(db, ["jan@example.com"], "Hi", company_id=company.id)
+    db.commit()
+    return entry.id
+
+
+def test_failure_advances_attempts_and_next_attempt(db, company, session_factory):
+    entry_id = queued_email(db, company)
+    worker = outbox_worker(session_factory, FakeEmailProvider(failure_rate=1.0))
+
+    before = datetime.now()
+    assert worker.drain_once() == 1
+
+    entry = db.get(EmailOutbox, entry_id)
+    assert entry.status == OutboxStatus.pending
+    assert entry.attempts == 1
+    assert entry.next_attempt_at > before
+    assert entry.locked_at is None
+    assert entry.last_error == "Fake provider failure"
+    assert worker.drain_once() == 0
+
+
+def test_entry_is_dead_lettered_after_max_attempts(db, company, session_factory):
+    entry_id = queued_email(db, company)
+    worker = outbox_worker(session_factory, FakeEmailProvider(failure_rate=1.0), max_attempts=2)
+
+    for attempts, expected in ((1, OutboxStatus.pending), (2, OutboxStatus.dead)):
+        db.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime.now() - timedelta(seconds=1)})
+        db.commit()
+        assert worker.drain_once() == 1
+        db.expire_all()
+        entry = db.get(EmailOutbox, entry_id)
+        assert (entry.attempts, entry.status) == (attempts, expected)
+
+    db.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime.now() - timedelta(seconds=1)})
+    db.commit()
+    assert worker.drain_once() == 0
+
+
+def test_entry_claimed_longer_than_the_lease_is_claimed_again(db, company, session_factory):
+    stale, live = queued_email(db, company), queued_email(db, company)
+    now = datetime.now()
+    db.query(EmailOutbox).filter(EmailOutbox.id == stale).update(
+        {EmailOutbox.status: OutboxStatus.sending, EmailOutbox.locked_at: now - OUTBOX_LEASE - timedelta(seconds=1)}
+    )
+    db.query(EmailOutbox).filter(EmailOutbox.id == live).update(
+        {EmailOutbox.status: OutboxStatus.sending, EmailOutbox.locked_at: now - timedelta(minutes=1)}
+    )
+    db.commit()
+    provider = FakeEmailProvider()
+
+    assert outbox_worker(session_factory, provider).drain_once() == 1
+
+    db.expire_all()
+    assert db.get(EmailOutbox, stale).status == OutboxStatus.sent
+    assert db.get(EmailOutbox, live).status == OutboxStatus.sending
+    assert len(provider.sent) == 1
+
+
+def test_worker_can_be_started_again_after_stop(db, company, session_factory):
+    provider = FakeEmailProvider()
+    worker = outbox_worker(session_factory, provider)
+    worker.start()
+    worker.stop()
+
+    entry_id = queued_email(db, company)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not provider.sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+
+    db.expire_all()
+    assert db.get(EmailOutbox, entry_id).status == OutboxStatus.sent
+
+
+def test_email_to_client_without_address_is_rejected_before_the_message(db, company, client):
+    client.email = None
+    template = Template(id=uuid.uuid4(), name="Default", template="{{ message }}", company_id=company.id)
+    db.add(template)
+    db.commit()
+
+    with pytest.raises(HTTPException) as error:
+        create_email_message(
+            company.id, client.id, CreateMessage(message="Hi", phone=client.phone, template=template.id),
+            idempotency_key=None, db=db, _=None,
+        )
+
+    assert error.value.status_code == 422
+    db.rollback()
+    assert db.query(Message).count() == 0
+    assert db.query(EmailOutbox).count() == 0
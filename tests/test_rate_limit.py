@@ -0,0 +1,67 @@
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_starts_full_and_grants_at_most_what_it_holds(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+
+    assert bucket.take(3) == 3
+    assert bucket.take(3) == 2
+    assert bucket.take(1) == 0
+
+
+def test_bucket_refills_at_rate_up_to_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.take(5)
+
+    clock[0] += 0.25
+    assert bucket.take(5) == 2
+    clock[0] += 60
+    assert bucket.take(10) == 5
+
+
+def test_wait_time_reports_when_tokens_will_be_available(clock):
+    bucket = TokenBucket(rate=4, capacity=4)
+    bucket.take(4)
+
+    assert bucket.wait_time(2) == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert bucket.wait_time(2) == 0.0
+
+
+def test_refund_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    bucket.take(1)
+    bucket.refund(5)
+
+    assert bucket.take(10) == 3
+
+
+def test_capacity_defaults_to_one_second_of_rate(clock):
+    assert TokenBucket(rate=20).take(100) == 20
+    assert TokenBucket(rate=0.5).take(100) == 1
+
+
+def test_limiter_keeps_one_bucket_per_key(clock):
+    limiter = RateLimiter(rate=2, capacity=2)
+
+    assert limiter.take("a", 5) == 2
+    assert limiter.take("b", 5) == 2
+    limiter.refund("a", 1)
+    assert limiter.take("a", 5) == 1
+
+
+def test_non_positive_rate_disables_limiting(clock):
+    limiter = RateLimiter(rate=0)
+
+    assert limiter.bucket("a") is None
+    assert limiter.take("a", 1000) == 1000
@@ -0,0 +1,35 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from models import Campaign, Message
+from models.utils.messageType import MessageType
+from schemas.messages import MessageSpec
+from service.campaign import create_campaign_messages
+from utils.get_review_message_or_404 import get_review_message_or_404
+
+
+@pytest.fixture
+def message(db, company, client):
+    campaign = Campaign(message="Hi", messageType=MessageType.SMS, company_id=company.id, total=1)
+    db.add(campaign)
+    db.flush()
+    [message_id] = create_campaign_messages(db, campaign, MessageSpec(message="Hi"), [client.id])
+    db.commit()
+    return db.get(Message, message_id)
+
+
+def test_review_link_resolves_through_message_tracking(db, company, client, message):
+    assert get_review_message_or_404(db, company.id, client.id, message.tracking_id) is message
+
+
+@pytest.mark.parametrize("wrong", ["company", "client", "tracking"])
+def test_review_link_with_a_wrong_part_is_a_404(db, company, client, message, wrong):
+    ids = {"company": company.id, "client": client.id, "tracking": message.tracking_id}
+    ids[wrong] = uuid.uuid4()
+
+    with pytest.raises(HTTPException) as error:
+        get_review_message_or_404(db, ids["company"], ids["client"], ids["tracking"])
+
+    assert error.value.status_code == 404
@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime
+
+from models import Message, Service
+from models.utils.messageType import MessageType
+from service.review_snapshot import (
+    invalidate_company_snapshots,
+    invalidate_service_snapshots,
+    message_review_snapshot,
+    snapshot_is_current,
+)
+
+
+def snapshotted_message(db, company, client, service=None):
+    message = Message(
+        id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS, send_at=datetime.now(),
+        client_id=client.id, company_id=company.id, service_id=service.id if service else None, is_rating=True,
+        rating_question="How was it?",
+    )
+    db.add(message)
+    db.flush()
+    message.review_snapshot = message_review_snapshot(db, message)
+    db.commit()
+    return message
+
+
+def test_snapshot_is_current_until_its_company_changes(db, company, client):
+    message = snapshotted_message(db, company, client)
+    assert snapshot_is_current(db, message)
+
+    invalidate_company_snapshots(db, company.id)
+    db.commit()
+
+    assert not snapshot_is_current(db, message)
+    message.review_snapshot = message_review_snapshot(db, message)
+    db.commit()
+    assert snapshot_is_current(db, message)
+
+
+def test_service_edit_only_touches_the_service_row(db, company, client):
+    service = Service(id=uuid.uuid4(), name="Haircut", description="", company_id=company.id)
+    db.add(service)
+    db.commit()
+    message = snapshotted_message(db, company, client, service)
+    other = snapshotted_message(db, company, client)
+    snapshot = dict(message.review_snapshot)
+
+    invalidate_service_snapshots(db, service.id)
+    db.commit()
+    db.expire_all()
+
+    assert db.get(Message, message.id).review_snapshot == snapshot
+    assert not snapshot_is_current(db, db.get(Message, message.id))
+    assert snapshot_is_current(db, db.get(Message, other.id))
+
+
+def test_snapshots_without_versions_are_rebuilt(db, company, client):
+    message = snapshotted_message(db, company, client)
+    message.review_snapshot = {"is_rating": True, "rating_question": "How was it?"}
+    db.commit()
+
+    assert not snapshot_is_current(db, message)
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime, timedelta
+
+from models import Message, Template
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from service import scheduler as scheduler_service
+from service.scheduler import MessageScheduler, dispatch_scheduled_messages
+
+
+def scheduled_email(db, client, company_id, template_id):
+    message = Message(
+        id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.Email,
+        send_at=datetime.now(), delivery_status=DeliveryStatus.scheduled, client_id=client.id,
+        company_id=company_id, template_id=template_id,
+    )
+    db.add(message)
+    db.commit()
+    return message
+
+
+def test_dispatch_fails_messages_whose_company_is_gone(db, company, client, monkeypatch):
+    monkeypatch.setattr(scheduler_service.sms_dispatcher, "submit", lambda messages: None)
+    template = Template(id=uuid.uuid4(), name="t", template="Hi {{name}}", company_id=company.id)
+    db.add(template)
+    db.commit()
+    orphan = scheduled_email(db, client, None, template.id)
+    delivered = scheduled_email(db, client, company.id, template.id)
+
+    dispatch_scheduled_messages(db, [orphan.id, delivered.id])
+
+    db.expire_all()
+    assert db.get(Message, orphan.id).delivery_status == DeliveryStatus.failed
+    assert db.get(Message, delivered.id).delivery_status == DeliveryStatus.queued
+
+
+def test_schedule_many_only_wheels_messages_within_the_lookahead(session_factory):
+    scheduler = MessageScheduler(lookahead=60, session_factory=session_factory)
+    soon, later = uuid.uuid4(), uuid.uuid4()
+
+    scheduler.schedule_many([soon], datetime.now() + timedelta(seconds=30))
+    scheduler.schedule_many([later], datetime.now() + timedelta(hours=1))
+
+    assert soon in scheduler.wheel
+    assert later not in scheduler.wheel
@@ -0,0 +1,22 @@
+import uuid
+
+from sqlalchemy import select
+
+from models import Client
+from service.search import apply_search, like_pattern
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern("50%_off\\") == "%50\\%\\_off\\\\%"
+
+
+def test_apply_search_matches_any_column_case_insensitively(db, company, client):
+    other = Client(id=uuid.uuid4(), name="Anna", surname="Nowak", email="a_n@example.com", company_id=company.id)
+    db.add(other)
+    db.commit()
+    query = select(Client.id).where(Client.company_id == company.id)
+
+    assert set(db.scalars(apply_search(query, Client, "KOWAL"))) == {client.id}
+    assert set(db.scalars(apply_search(query, Client, "a_n@"))) == {other.id}
+    assert set(db.scalars(apply_search(query, Client, "%"))) == set()
+    assert set(db.scalars(apply_search(query, Client, "  "))) == {client.id, other.id}
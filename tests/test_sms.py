@@ -0,0 +1,72 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from models import Message
+from models.utils.deliveryStatus import DeliveryStatus
+from models.utils.messageType import MessageType
+from service.sms import OutgoingSms, SmsDispatcher
+
+
+class RecordingProvider:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent: list[uuid.UUID] = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.extend(sms.message_id for sms in messages)
+        return [None] * len(messages)
+
+
+def queued_sms(db, client, count: int, send_at: datetime) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(count)]
+    db.add_all(
+        Message(
+            id=message_id, message="Hi", tracking_id=uuid.uuid4(), send_at=send_at, messageType=MessageType.SMS,
+            delivery_status=DeliveryStatus.queued, client_id=client.id, company_id=client.company_id,
+        )
+        for message_id in ids
+    )
+    db.commit()
+    return ids
+
+
+def test_recovery_on_several_nodes_sends_each_message_once(db, client, session_factory):
+    ids = queued_sms(db, client, 20, datetime.now() - timedelta(hours=1))
+    providers = [RecordingProvider(), RecordingProvider()]
+    nodes = [SmsDispatcher(provider, rate=0, linger=0.01, session_factory=session_factory) for provider in providers]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.stop()
+
+    sent = providers[0].sent + providers[1].sent
+    assert sorted(sent) == sorted(ids)
+    db.expire_all()
+    assert {message.delivery_status for message in db.query(Message)} == {DeliveryStatus.sent}
+
+
+def test_message_in_two_queues_is_sent_once(db, client, session_factory):
+    [message_id] = queued_sms(db, client, 1, datetime.now())
+    provider = RecordingProvider()
+    node = SmsDispatcher(provider, rate=0, linger=0.01, session_factory=session_factory)
+    node.start()
+    node.submit([OutgoingSms(message_id, client.phone, "Hi"), OutgoingSms(message_id, client.phone, "Hi")])
+    node.stop()
+    assert provider.sent == [message_id]
+
+
+def test_stop_delivers_batches_already_taken_off_the_queue(db, client, session_factory):
+    ids = queued_sms(db, client, 5, datetime.now())
+    provider = RecordingProvider(latency=0.1)
+    node = SmsDispatcher(provider, batch_size=1, rate=0, max_in_flight=1, linger=0.0, session_factory=session_factory)
+    node.start()
+    node.submit([OutgoingSms(message_id, client.phone, "Hi") for message_id in ids])
+    time.sleep(0.05)
+    node.stop()
+    assert sorted(provider.sent) == sorted(ids)
@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime
+
+from models import Message, Stats
+from models.utils.messageType import MessageType
+from service import stats as stats_service
+from service.stats import reconcile_stats
+
+
+def add_messages(db, company, client, count):
+    db.add_all([
+        Message(
+            id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS,
+            send_at=datetime.now(), client_id=client.id, company_id=company.id,
+        )
+        for _ in range(count)
+    ])
+    db.commit()
+
+
+def sent(db, company):
+    db.expire_all()
+    return db.query(Stats.sent).filter_by(company_id=company.id).scalar()
+
+
+def test_reconcile_rebuilds_counters_from_messages(session_factory, db, company, client):
+    add_messages(db, company, client, 3)
+
+    assert reconcile_stats(session_factory) == 1
+    assert sent(db, company) == 3
+
+
+def test_pass_requested_before_a_finished_rebuild_skips_it(session_factory, db, company, client):
+    add_messages(db, company, client, 2)
+    requested_at = datetime.now()
+    reconcile_stats(session_factory, [company.id])
+
+    skipped = stats_service._each_company(
+        session_factory, [company.id], stats_service.rebuild_company_stats, "stats", requested_at
+    )
+    assert skipped == 0
+
+    add_messages(db, company, client, 1)
+    assert reconcile_stats(session_factory, [company.id]) == 1
+    assert sent(db, company) == 3
+
+
+def test_pass_requested_while_a_rebuild_runs_still_rebuilds(session_factory, company, client):
+    requested = []
+
+    def rebuild(db, company_id):
+        stats_service.rebuild_company_stats(db, company_id)
+        requested.append(datetime.now())
+
+    assert stats_service._each_company(session_factory, [company.id], rebuild, "stats") == 1
+    assert stats_service._each_company(session_factory, [company.id], rebuild, "stats", requested[0]) == 1
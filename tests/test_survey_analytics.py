@@ -0,0 +1,116 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from models import Message, MessageTracking, Survey, SurveyAnalytic, SurveyAnalyticDelta
+from models.utils.messageType import MessageType
+from routes.messages import send_survey
+from schemas.messages import CompletedSurveyRequest, SendSurveyRequest
+from service.survey_analytics import CHOICE, RATING, answer_columns, rebuild_survey_analytics
+from service.survey_refresher import SurveyAnalyticsRefresher
+
+
+@pytest.mark.parametrize("value, numeric", [(7, 7.0), ("8.5", 8.5), (" 3 ", 3.0)])
+def test_ratings_go_to_numeric_value(value, numeric):
+    assert answer_columns(RATING, value) == {"numeric_value": numeric, "text_value": None, "choice_value": None}
+
+
+def test_unparseable_ratings_are_kept_as_text():
+    assert answer_columns(RATING, "n/a") == {"numeric_value": None, "text_value": "n/a", "choice_value": None}
+    assert answer_columns(RATING, "NaN") == {"numeric_value": None, "text_value": "NaN", "choice_value": None}
+    assert answer_columns(RATING, "inf") == {"numeric_value": None, "text_value": "inf", "choice_value": None}
+    assert answer_columns(RATING, None) == {"numeric_value": None, "text_value": None, "choice_value": None}
+
+
+def test_choices_are_stored_as_truncated_strings():
+    assert answer_columns(CHOICE, 3)["choice_value"] == "3"
+    assert answer_columns(CHOICE, "x" * 300)["choice_value"] == "x" * 255
+    assert answer_columns(CHOICE, None) == {"numeric_value": None, "text_value": None, "choice_value": None}
+
+
+@pytest.mark.parametrize("question_type", ["text", None])
+def test_other_answers_are_text(question_type):
+    assert answer_columns(question_type, ["a", "b"]) == {"numeric_value": None, "text_value": "['a', 'b']", "choice_value": None}
+
+
+QUESTIONS = [
+    {"id": "score", "type": RATING, "max": 10},
+    {"id": "channel", "type": CHOICE, "options": ["web", "phone"]},
+]
+
+
+@pytest.fixture
+def survey(db, company):
+    survey = Survey(id=uuid.uuid4(), name="NPS", content=QUESTIONS, company_id=company.id, completed_times=0)
+    db.add(survey)
+    db.commit()
+    return survey
+
+
+def survey_message(db, client, survey) -> Message:
+    message = Message(
+        id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS, send_at=datetime.now(),
+        client_id=client.id, company_id=client.company_id, is_survey=True, survey_id=survey.id,
+    )
+    db.add_all([message, MessageTracking(tracking_id=message.tracking_id, message_id=message.id, send_at=message.send_at)])
+    db.commit()
+    return message
+
+
+def submit(db, client, survey, message, answers) -> None:
+    request = SendSurveyRequest(survey=CompletedSurveyRequest(survey_id=survey.id, answers=answers))
+    send_survey(client.company_id, client.id, message.tracking_id, request, db)
+
+
+def stored_aggregates(db, survey) -> tuple[dict, int]:
+    db.expire_all()
+    analytic = db.query(SurveyAnalytic).filter_by(survey_id=survey.id).one()
+    return analytic.content, analytic.completed_times
+
+
+def test_refresh_folds_only_the_new_responses(db, client, survey, session_factory):
+    refresher = SurveyAnalyticsRefresher(session_factory=session_factory)
+    submit(db, client, survey, survey_message(db, client, survey), {"score": 9, "channel": "web"})
+    assert refresher.refresh(survey.id)
+
+    for score, channel in ((10, "web"), (3, "phone"), ("n/a", "carrier pigeon")):
+        submit(db, client, survey, survey_message(db, client, survey), {"score": score, "channel": channel})
+    statements = []
+    bind = session_factory.kw["bind"]
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        assert refresher.refresh(survey.id)
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    assert not any("survey_answers" in statement for statement in statements)
+    assert db.query(SurveyAnalyticDelta).count() == 0
+    folded = stored_aggregates(db, survey)
+    assert folded[0]["score"] == {"answered": 4, "rating_sum": 22, "rating_count": 3}
+    assert folded[0]["channel"]["choices"] == {"web": 2, "phone": 1, "carrier pigeon": 1}
+    assert folded[1] == 4
+
+    rebuild_survey_analytics(db, db.get(Survey, survey.id))
+    db.commit()
+    assert stored_aggregates(db, survey) == folded
+
+
+def test_resubmission_replaces_the_previous_answers(db, client, survey, session_factory):
+    refresher = SurveyAnalyticsRefresher(session_factory=session_factory)
+    message = survey_message(db, client, survey)
+    submit(db, client, survey, message, {"score": 9, "channel": "web"})
+    assert refresher.refresh(survey.id)
+
+    submit(db, client, survey, message, {"score": 4, "channel": "phone"})
+    assert refresher.refresh(survey.id)
+
+    content, completed = stored_aggregates(db, survey)
+    assert content["score"] == {"answered": 1, "rating_sum": 4, "rating_count": 1}
+    assert content["channel"]["choices"] == {"web": 0, "phone": 1}
+    assert completed == 1
@@ -0,0 +1,139 @@
+import math
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from models import Message, Survey
+from models.utils.messageType import MessageType
+from service.survey_analytics import write_survey_answers
+from service.survey_engine import (
+    MISSING,
+    build_answer_columns,
+    choice_distribution,
+    cross_tab,
+    distributions,
+    load_answer_columns,
+    rating_distribution,
+)
+
+QUESTIONS = [
+    {"id": "score", "type": "rating", "max": 10},
+    {"id": "channel", "type": "choice", "options": ["web", "phone"]},
+    {"id": "comment", "type": "text"},
+]
+RESPONSES = [
+    {"score": 10, "channel": "web", "comment": "great"},
+    {"score": "9", "channel": "phone"},
+    {"score": 3, "channel": "carrier pigeon"},
+    {"score": "n/a", "comment": "skipped the choice"},
+    {"channel": "web"},
+    None,
+]
+
+
+@pytest.fixture
+def survey(db, company, client):
+    survey = Survey(id=uuid.uuid4(), name="NPS", content=QUESTIONS, company_id=company.id)
+    db.add(survey)
+    db.commit()
+    answered_at = datetime(2026, 10, 1, 12)
+    for offset, response in enumerate(RESPONSES):
+        if response is None:
+            continue
+        message = Message(
+            id=uuid.uuid4(), tracking_id=uuid.uuid4(), message="Hi", messageType=MessageType.SMS,
+            send_at=datetime.now(), client_id=client.id, company_id=company.id, is_survey=True, survey_id=survey.id,
+        )
+        db.add(message)
+        db.flush()
+        write_survey_answers(db, survey, message, response, answered_at + timedelta(hours=offset))
+    db.commit()
+    return survey
+
+
+def test_unanswered_and_unparseable_ratings_are_nan():
+    columns = build_answer_columns(QUESTIONS, RESPONSES)
+
+    scores = columns.ratings["score"]
+    assert scores[:3].tolist() == [10.0, 9.0, 3.0]
+    assert np.isnan(scores[3:]).all()
+    assert "comment" not in columns.ratings and "comment" not in columns.choices
+
+
+def test_unanswered_choices_are_missing_and_unknown_values_get_a_category():
+    columns = build_answer_columns(QUESTIONS, RESPONSES)
+
+    assert columns.categories["channel"] == ["web", "phone", "carrier pigeon"]
+    assert columns.choices["channel"].tolist() == [0, 1, 2, MISSING, 0, MISSING]
+
+
+def test_distributions_skip_unanswered():
+    result = distributions(build_answer_columns(QUESTIONS, RESPONSES))
+
+    score, channel = result["score"], result["channel"]
+    assert score.count == 3
+    assert score.mean == pytest.approx(22 / 3)
+    assert score.histogram == {"3": 1, "9": 1, "10": 1}
+    assert score.nps == pytest.approx((2 - 1) * 100 / 3)
+    assert channel.count == 4
+    assert channel.counts == {"web": 2, "phone": 1, "carrier pigeon": 1}
+    assert channel.shares["web"] == pytest.approx(0.5)
+
+
+def test_distributions_of_nothing_answered():
+    assert rating_distribution(np.array([math.nan, math.nan])).count == 0
+    empty = choice_distribution(np.array([MISSING, MISSING]), ["a", "b"])
+    assert (empty.count, empty.counts, empty.shares) == (0, {"a": 0, "b": 0}, {"a": 0.0, "b": 0.0})
+
+
+def test_cross_tab_skips_responses_missing_either_answer():
+    table = cross_tab(build_answer_columns(QUESTIONS, RESPONSES), "score", "channel")
+
+    assert table.rows == ["3", "9", "10"]
+    assert table.columns == ["web", "phone", "carrier pigeon"]
+    assert table.counts == [[0, 0, 1], [0, 1, 0], [1, 0, 0]]
+
+
+def test_cross_tab_of_unknown_question_raises():
+    with pytest.raises(KeyError):
+        cross_tab(build_answer_columns(QUESTIONS, RESPONSES), "score", "nope")
+
+
+def test_load_answer_columns_from_survey_answers_matches_the_responses(db, survey):
+    loaded = load_answer_columns(db, survey)
+    built = build_answer_columns(QUESTIONS, [response for response in RESPONSES if response is not None])
+
+    assert loaded.size == built.size == 5
+    assert loaded.categories == built.categories
+    assert distributions(loaded) == distributions(built)
+    assert cross_tab(loaded, "score", "channel") == cross_tab(built, "score", "channel")
+
+
+def test_load_answer_columns_filters_by_answered_at(db, survey):
+    columns = load_answer_columns(db, survey, answered_after=datetime(2026, 10, 1, 13), answered_before=datetime(2026, 10, 1, 15))
+
+    assert columns.size == 2
+    assert distributions(columns)["score"].histogram == {"3": 1, "9": 1}
+    assert sorted(columns.choices["channel"].tolist()) == [1, 2]
+
+
+def test_answers_stored_under_another_question_type_load_as_strings(db, survey):
+    survey.content = [{"id": "score", "type": "choice", "options": ["10.0"]}]
+    db.commit()
+
+    columns = load_answer_columns(db, survey)
+
+    assert sorted(columns.categories["score"]) == ["10.0", "3.0", "9.0"]
+    assert distributions(columns)["score"].counts == {"10.0": 1, "9.0": 1, "3.0": 1}
+
+
+def test_choices_stored_before_the_question_became_a_rating_load_as_nan(db, survey):
+    survey.content = [{"id": "channel", "type": "rating", "max": 10}]
+    db.commit()
+
+    columns = load_answer_columns(db, survey)
+
+    assert np.isnan(columns.ratings["channel"]).all()
+    assert distributions(columns)["channel"].count == 0
@@ -0,0 +1,55 @@
+import uuid
+from types import SimpleNamespace
+
+from service.template_renderer import Recipient, TemplateCache, compile_template, render_many, template_values
+
+
+def test_render_fills_english_and_polish_placeholders():
+    compiled = compile_template("Dzień dobry {{imię}}, {{ company }} thanks {{name}} {{nazwisko}}")
+
+    assert compiled.render(template_values("Jan Maria", "Kowalski", "Acme")) == (
+        "Dzień dobry Jan, Acme thanks Jan Kowalski"
+    )
+
+
+def test_render_leaves_unknown_placeholders_and_blanks_missing_values():
+    compiled = compile_template("{{unknown}} {{name}}{{service}}!")
+
+    assert compiled.statics[0] == "{{unknown}} "
+    assert compiled.render({"name": "Jan"}) == "{{unknown}} Jan!"
+    assert compiled.render({"name": None}) == "{{unknown}} !"
+
+
+def test_render_without_placeholders_returns_text():
+    assert compile_template("plain text").render({"name": "Jan"}) == "plain text"
+
+
+def test_bind_matches_full_render():
+    compiled = compile_template("{{company}}: {{name}} ({{service}}) {{link}}")
+    values = template_values("Jan", "Kowalski", "Acme", "https://x/r", "Haircut")
+
+    bound = compiled.bind({"company": "Acme", "service": "Haircut"})
+
+    assert bound.keys == ("name", "review_url")
+    assert bound.render(values) == compiled.render(values)
+
+
+def test_cache_recompiles_when_template_changes():
+    cache, template_id = TemplateCache(maxsize=2), uuid.uuid4()
+
+    first = cache.get(template_id, None, "{{name}}")
+    assert cache.get(template_id, None, "ignored") is first
+    second = cache.get(template_id, "v2", "Hi {{name}}")
+
+    assert second.render({"name": "Jan"}) == "Hi Jan"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_render_many_builds_review_links():
+    company_id, recipient = uuid.uuid4(), Recipient(uuid.uuid4(), uuid.uuid4(), "Jan Maria", "Kowalski")
+    template = SimpleNamespace(id=uuid.uuid4(), updated_at=None, created_at=None, template="{{name}} {{company}} {{link}}")
+
+    [(_, body)] = render_many(template, [recipient], company_id, "Acme")
+
+    assert body.startswith("Jan Acme ")
+    assert body.endswith(f"/invitations/review/{company_id}/{recipient.client_id}/{recipient.tracking_id}")
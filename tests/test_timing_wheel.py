@@ -0,0 +1,57 @@
+from utils.timing_wheel import TimingWheel
+
+
+def test_advance_returns_entries_once_they_are_due():
+    wheel = TimingWheel(tick=1.0, slots=8, start=0.0)
+    wheel.add("a", 2.5)
+    wheel.add("b", 5.0)
+
+    assert wheel.advance(2.0) == []
+    assert wheel.advance(3.0) == [("a", 2.5)]
+    assert wheel.advance(5.0) == [("b", 5.0)]
+    assert len(wheel) == 0
+
+
+def test_entries_beyond_one_revolution_wait_for_their_due_time():
+    wheel = TimingWheel(tick=1.0, slots=4, start=0.0)
+    wheel.add("later", 9.0)
+
+    assert wheel.advance(3.0) == []
+    assert wheel.advance(7.0) == []
+    assert wheel.advance(9.0) == [("later", 9.0)]
+
+
+def test_overdue_entries_fire_on_the_next_advance():
+    wheel = TimingWheel(tick=1.0, slots=4, start=10.0)
+    wheel.add("overdue", 1.0)
+
+    assert wheel.advance(10.0) == [("overdue", 1.0)]
+
+
+def test_readding_moves_an_entry_and_discard_removes_it():
+    wheel = TimingWheel(tick=1.0, slots=8, start=0.0)
+    wheel.add("a", 1.0)
+    wheel.add("a", 4.0)
+    wheel.add("b", 2.0)
+    wheel.discard("b")
+    wheel.discard("missing")
+
+    assert "b" not in wheel
+    assert wheel.advance(3.0) == []
+    assert wheel.advance(4.0) == [("a", 4.0)]
+
+
+def test_a_long_jump_sweeps_every_slot():
+    wheel = TimingWheel(tick=1.0, slots=4, start=0.0)
+    for i in range(4):
+        wheel.add(i, float(i))
+
+    assert sorted(key for key, _ in wheel.advance(100.0)) == [0, 1, 2, 3]
+
+
+def test_advance_backwards_is_a_no_op():
+    wheel = TimingWheel(tick=1.0, slots=4, start=5.0)
+    wheel.add("a", 5.0)
+
+    assert wheel.advance(4.0) == []
+    assert "a" in wheel
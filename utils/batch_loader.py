@@ -0,0 +1,66 @@
+import uuid
+from typing import Hashable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+BATCH_SIZE = 1000
+
+
+class BatchLoader:
+    """
+    DataLoader-style lookup of one model by primary key. Ids queued with
+    `prime` are resolved together, one IN query per batch, the first time any
+    of them is loaded; results, misses included, are memoized for the loader's
+    lifetime.
+    """
+
+    def __init__(self, db: Session, model, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.model = model
+        self.batch_size = batch_size
+        self._column = model.__mapper__.primary_key[0]
+        self._uuid_keys = getattr(self._column.type, "as_uuid", False)
+        self._cache: dict[Hashable, object] = {}
+        self._pending: dict[Hashable, None] = {}
+
+    def _key(self, key: Hashable) -> Hashable:
+        # Path parameters sometimes arrive as strings; rows come back keyed by UUID.
+        return uuid.UUID(key) if self._uuid_keys and isinstance(key, str) else key
+
+    def prime(self, ids: Iterable[Hashable]) -> "BatchLoader":
+        for key in map(self._key, ids):
+            if key is not None and key not in self._cache:
+                self._pending[key] = None
+        return self
+
+    def load(self, key: Hashable):
+        key = self._key(key)
+        if key is None:
+            return None
+        if key not in self._cache:
+            self.prime([key])
+            self._resolve()
+        return self._cache[key]
+
+    def load_many(self, ids: Iterable[Hashable]) -> list:
+        ids = [self._key(key) for key in ids]
+        self.prime(ids)
+        self._resolve()
+        return [self._cache.get(key) for key in ids]
+
+    def _resolve(self) -> None:
+        pending, self._pending = list(self._pending), {}
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            self._cache.update(dict.fromkeys(chunk))
+            for row in self.db.scalars(select(self.model).where(self._column.in_(chunk))):
+                self._cache[getattr(row, self._column.key)] = row
+
+
+def loader(db: Session, model) -> BatchLoader:
+    """The session's loader for `model`; a request's session lives as long as the request, so this is request-scoped."""
+    loaders = db.info.setdefault("batch_loaders", {})
+    if model not in loaders:
+        loaders[model] = BatchLoader(db, model)
+    return loaders[model]
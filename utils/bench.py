@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import Base
+from service.partitions import ensure_partitions
+
+
+def bench_session_factory(database_url: str | None = None) -> sessionmaker:
+    """
+    Sessions on a scratch schema for the `python -m benchmarks.<name>` scripts: a fresh
+    SQLite file unless `database_url` points at a throwaway database.
+    """
+    import models  # noqa: F401 - registers every table on Base.metadata
+
+    database_url = database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    bind = create_engine(database_url)
+    Base.metadata.create_all(bind=bind)
+    ensure_partitions(bind=bind)
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
+
+def seed_company(db: Session, clients: int = 0):
+    """A company owned by a fresh user, with `clients` clients that have both an email and a phone."""
+    from models import Client, Company, User
+
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    company = Company(id=uuid.uuid4(), name="Benchmark", owner_id=user.id)
+    db.add_all([user, company])
+    db.flush()
+    if clients:
+        db.execute(insert(Client), [
+            dict(
+                id=uuid.uuid4(), name=f"Client {i}", surname="Benchmark", email=f"client{i}@example.com",
+                phone=f"+48{i:09d}", company_id=company.id,
+            )
+            for i in range(clients)
+        ])
+    db.commit()
+    return company
+
+
+@contextmanager
+def timed(label: str, count: int | None = None, unit: str = "rows") -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = f"  ({count / elapsed:,.0f} {unit}/s)" if count and elapsed else ""
+    print(f"  {label:<44} {elapsed:.3f}s{rate}")
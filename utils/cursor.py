@@ -0,0 +1,21 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException
+from starlette import status
+
+
+def encode_cursor(send_at: datetime, message_id: uuid.UUID) -> str:
+    raw = json.dumps([send_at.isoformat(), str(message_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        send_at, message_id = json.loads(raw)
+        return datetime.fromisoformat(send_at), uuid.UUID(message_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -0,0 +1,23 @@
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from starlette import status
+
+from models.message import Message
+from models.message_tracking import MessageTracking
+
+
+def get_review_message_or_404(db: Session, company_id: uuid.UUID, client_id: uuid.UUID, tracking_id: uuid.UUID) -> Message:
+    # Joining on send_at as well lets PostgreSQL prune to the one partition at run time.
+    message = (
+        db.query(Message)
+        .join(MessageTracking, and_(MessageTracking.message_id == Message.id, MessageTracking.send_at == Message.send_at))
+        .filter(MessageTracking.tracking_id == tracking_id)
+        .first()
+    )
+    if not message or message.client_id != client_id or message.company_id != company_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+    return message
+
@@ -0,0 +1,90 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import IDEMPOTENCY_TTL_HOURS
+from database import SessionLocal
+from models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+EVICT_BATCH_SIZE = 5000
+
+
+def find_idempotent_response(db: Session, company_id: uuid.UUID, key: str | None, endpoint: str) -> dict | None:
+    if not key:
+        return None
+    # A plain row, not an ORM instance, so a later insert of the same key is not shadowed by the identity map.
+    stored = db.execute(
+        select(IdempotencyKey.endpoint, IdempotencyKey.response, IdempotencyKey.expires_at)
+        .where(IdempotencyKey.company_id == uuid.UUID(str(company_id)), IdempotencyKey.key == key)
+    ).first()
+    if stored is None or stored.expires_at <= datetime.now():
+        return None
+    if stored.endpoint != endpoint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return stored.response
+
+
+def commit_idempotent(db: Session, company_id: uuid.UUID, key: str | None, endpoint: str, response: BaseModel) -> dict | None:
+    """
+    Commit the pending transaction together with the response it produced.
+    The key is inserted, never overwritten, so if a concurrent request with the
+    same key committed first the primary key rejects this one: roll back and
+    return that request's response instead. Only an expired row is replaced.
+    """
+    if not key:
+        db.commit()
+        return None
+
+    company_id = uuid.UUID(str(company_id))
+    now = datetime.now()
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.company_id == company_id, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    db.add(IdempotencyKey(
+        company_id=company_id,
+        key=key,
+        endpoint=endpoint,
+        response=response.model_dump(mode="json"),
+        expires_at=now + IDEMPOTENCY_TTL,
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        stored = find_idempotent_response(db, company_id, key, endpoint)
+        if stored is None:
+            raise
+        return stored
+    return None
+
+
+def evict_expired_keys(session_factory=SessionLocal) -> int:
+    db = session_factory()
+    evicted = 0
+    try:
+        while True:
+            expired = select(IdempotencyKey.company_id, IdempotencyKey.key).where(IdempotencyKey.expires_at <= datetime.now()).limit(EVICT_BATCH_SIZE)
+            keys = db.execute(expired).all()
+            if not keys:
+                return evicted
+            db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.expires_at <= datetime.now())
+                .where(IdempotencyKey.key.in_([row.key for row in keys]))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            evicted += len(keys)
+    finally:
+        db.close()
@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Hashable
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, amount: int) -> int:
+        """Take up to `amount` whole tokens and return how many were granted."""
+        with self._lock:
+            self._refill()
+            granted = min(amount, int(self._tokens))
+            self._tokens -= granted
+            return granted
+
+    def refund(self, amount: int) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def wait_time(self, amount: int = 1) -> float:
+        with self._lock:
+            self._refill()
+            missing = amount - self._tokens
+            return max(0.0, missing / self.rate) if self.rate > 0 else 0.0
+
+
+class RateLimiter:
+    """Keeps one lazily created TokenBucket per key. A non-positive rate disables limiting."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: Hashable) -> TokenBucket | None:
+        if self.rate <= 0:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            return bucket
+
+    def take(self, key: Hashable, amount: int) -> int:
+        bucket = self.bucket(key)
+        return amount if bucket is None else bucket.take(amount)
+
+    def refund(self, key: Hashable, amount: int) -> None:
+        bucket = self.bucket(key)
+        if bucket is not None and amount > 0:
+            bucket.refund(amount)
@@ -0,0 +1,102 @@
+import fcntl
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+from sqlalchemy import text
+
+from config import SINGLE_FLIGHT_LOCK_DIR
+from database import engine
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+def advisory_key(name: str) -> int:
+    """A stable signed 64-bit key for pg_advisory_lock."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+@contextmanager
+def process_lock(name: str, bind=engine, lock_dir: str = SINGLE_FLIGHT_LOCK_DIR) -> Iterator[None]:
+    """
+    Hold an exclusive lock on `name` across worker processes: a session-level
+    advisory lock on PostgreSQL, otherwise an flock'ed file in `lock_dir`,
+    which only covers processes on the same host.
+    """
+    if bind.dialect.name == "postgresql":
+        key = advisory_key(name)
+        with bind.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    path = os.path.join(lock_dir, hashlib.sha1(name.encode()).hexdigest() + ".lock")
+    with open(path, "a") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    function and everyone who arrives while it is in flight gets its result
+    (or its exception) instead of running it again. With `across_processes`
+    the leader also holds `process_lock`, so leaders in other workers run one
+    after another rather than concurrently; the function should then check
+    whether the work was already done while it waited.
+    """
+
+    def __init__(self, namespace: str, across_processes: bool = False):
+        self.namespace = namespace
+        self.across_processes = across_processes
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.across_processes:
+                with process_lock(f"{self.namespace}:{key}"):
+                    call.result = func()
+            else:
+                call.result = func()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,66 @@
+import math
+import threading
+import time
+from typing import Hashable
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: `slots` buckets of `tick` seconds each. Entries further
+    out than one revolution keep their absolute due time and are skipped until
+    the wheel comes round to them.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512, start: float | None = None):
+        self.tick = tick
+        self.slots = slots
+        self._buckets: list[dict[Hashable, float]] = [dict() for _ in range(slots)]
+        self._slot_of: dict[Hashable, int] = {}
+        self._cursor = self._tick_of(time.time() if start is None else start)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def _tick_of(self, due: float) -> int:
+        return math.floor(due / self.tick)
+
+    def add(self, key: Hashable, due: float) -> None:
+        with self._lock:
+            self._remove(key)
+            slot = max(self._tick_of(due), self._cursor) % self.slots
+            self._buckets[slot][key] = due
+            self._slot_of[key] = slot
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._buckets[slot][key]
+
+    def advance(self, now: float) -> list[tuple[Hashable, float]]:
+        """Return every entry due at or before `now`."""
+        target = self._tick_of(now)
+        expired = []
+        with self._lock:
+            if target < self._cursor:
+                return expired
+            if target - self._cursor >= self.slots:
+                slots = range(self.slots)
+            else:
+                slots = (tick % self.slots for tick in range(self._cursor, target + 1))
+            for slot in slots:
+                bucket = self._buckets[slot]
+                for key, due in list(bucket.items()):
+                    if due <= now:
+                        del bucket[key]
+                        del self._slot_of[key]
+                        expired.append((key, due))
+            self._cursor = target
+        return expired